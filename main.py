@@ -1,22 +1,111 @@
+import argparse
+import io
+import json
+from collections import deque, namedtuple
+import csv
+import ctypes
+import heapq
+from dataclasses import dataclass
 from datetime import datetime
-import msvcrt
+from math import inf, isnan, nan, sqrt
 import os
 import platform
+import re
+import shutil
 import socket
+import struct
 import subprocess
+import sys
+import threading
 import time
-from rich.console import Console
+from typing import Optional
+from rich.cells import cell_len
+from rich.console import Console, Group
 from rich.layout import Layout
-from rich.live import Live
 from rich.panel import Panel
 from rich.progress_bar import ProgressBar
 from rich.table import Table
 from rich.text import Text
 import psutil
 
+try:
+    import msvcrt
+except ImportError:
+    # Not on Windows; keyboard controls are unavailable
+    msvcrt = None
+
+# Hides console windows spawned for Docker commands on Windows
+CREATE_NO_WINDOW = getattr(subprocess, "CREATE_NO_WINDOW", 0)
+
+# Number of samples kept per metric history
+HISTORY_LENGTH = 60
+
+# Seconds between dashboard refreshes
+REFRESH_INTERVAL = 2.0
+
+# Seconds between samples for collectors whose panels are not visible
+BACKGROUND_INTERVAL = 10.0
+
 # Global state for sort mode
 sort_by_memory = False
 
+# Global state for process grouping, cycled with the 'g' key
+GROUP_MODES = ("process", "name", "user", "parent", "container")
+GROUP_LABELS = {
+    "process": "Process",
+    "name": "Name",
+    "user": "User",
+    "parent": "Parent",
+    "container": "Container",
+}
+group_by = "process"
+
+# Global state for tabbed views, switched with 1-5 or Tab, and the
+# panel zoomed with 'z' (None shows the whole view)
+VIEWS = ("overview", "processes", "docker", "network", "disks")
+VIEW_LABELS = {
+    "overview": "Overview",
+    "processes": "Processes",
+    "docker": "Docker",
+    "network": "Network",
+    "disks": "Disks",
+}
+# Panels each view shows; the first gets most of the space
+VIEW_PANELS = {
+    "overview": (
+        "processes", "cpu_ram", "disk", "network", "memory_pressure",
+        "docker", "connections", "alerts", "system_info",
+    ),
+    "processes": ("processes", "cpu_ram", "memory_pressure"),
+    "docker": ("docker", "cpu_ram", "alerts"),
+    "network": ("connections", "network"),
+    "disks": ("disk", "alerts"),
+}
+# Collector each panel renders
+PANEL_COLLECTORS = {
+    "cpu_ram": "cpu_ram",
+    "disk": "disks",
+    "network": "network",
+    "memory_pressure": "memory_pressure",
+    "processes": "processes",
+    "docker": "docker",
+    "connections": "connections",
+}
+current_view = "overview"
+zoomed_panel = None
+
+# Matches Docker container IDs in /proc/<pid>/cgroup lines
+DOCKER_CGROUP_PATTERN = re.compile(r"docker[-/]([0-9a-f]{12,64})")
+
+# Plugin scheduler set up by main(), if any plugins are installed
+plugin_scheduler = None
+
+# Log tailer set up by main() when log sources are given, and its
+# filters; the minimum severity is cycled with the 'l' key
+log_tailer = None
+log_severity = "debug"
+log_keyword = None
+
 
 def make_header() -> Panel:
     """Create a header panel with system uptime."""
@@ -32,20 +121,233 @@ def make_header() -> Panel:
     else:
         uptime_str = f"{hours}h {minutes}m"
 
-    header_text = Text()
+    header_text = Text(no_wrap=True, overflow="ellipsis")
     header_text.append("My Command Center", style="bold magenta")
     header_text.append("  |  ", style="dim")
     header_text.append("Uptime: ", style="dim")
     header_text.append(uptime_str, style="bold cyan")
+    header_text.append("  |  ", style="dim")
+    for number, view in enumerate(VIEWS, 1):
+        label = f" {number} {VIEW_LABELS[view]} "
+        if view == current_view:
+            header_text.append(label, style="bold reverse magenta")
+        else:
+            header_text.append(label, style="dim")
+    if zoomed_panel is not None:
+        header_text.append(f"  [zoom: {zoomed_panel}]", style="yellow")
 
     return Panel(header_text, style="bright_blue")
 
 
+# Percent of one CPU core the dashboard itself may use
+OVERHEAD_BUDGET = 5.0
+
+
+class SelfMonitor:
+    """Account for the dashboard's own resource use.
+
+    Collectors report the CPU time they take through record() and
+    subprocess launches through spawned(). sample() turns process-wide
+    counters into rates over a sliding window and per-frame deltas.
+    """
+
+    def __init__(self, budget=OVERHEAD_BUDGET, window=60.0):
+        self._process = None
+        self.budget = budget
+        self.window = window
+        self.lock = threading.Lock()
+        self.collectors = {}  # name -> [cpu seconds, runs, last seconds]
+        self.spawn_times = deque()
+        self.watched = {}  # pid -> helper process, e.g. the worker
+        self.watched_cpu = {}  # pid -> last CPU seconds seen
+        self.exited_cpu = 0.0
+        self.history = None  # set by reset(), or on the first sample
+        self.last = None
+
+    @property
+    def process(self):
+        """This process, looked up on first use rather than at import."""
+        if self._process is None:
+            self._process = psutil.Process()
+        return self._process
+
+    def reset(self, now=None):
+        """Start accounting afresh, e.g. once startup is done."""
+        if now is None:
+            now = time.monotonic()
+        self.history = deque([(now, self.cpu_seconds(), self.io_ops())])
+        self.start_rss = self.rss()
+        self.last_rss = self.start_rss
+        self.last_blocks = sys.getallocatedblocks()
+        self.last = None
+
+    def record(self, name, seconds):
+        """Add one collector run's CPU time."""
+        with self.lock:
+            totals = self.collectors.get(name)
+            if totals is None:
+                totals = self.collectors[name] = [0.0, 0, 0.0]
+            totals[0] += seconds
+            totals[1] += 1
+            totals[2] = seconds
+
+    def spawned(self, now=None):
+        """Count one subprocess launch."""
+        with self.lock:
+            self.spawn_times.append(
+                time.monotonic() if now is None else now
+            )
+
+    def watch(self, pid):
+        """Include a helper process, such as the collector worker."""
+        if pid not in self.watched:
+            try:
+                self.watched[pid] = psutil.Process(pid)
+            except psutil.Error:
+                pass
+
+    def cpu_seconds(self) -> float:
+        """CPU time used by this process, its reaped children and helpers."""
+        times = self.process.cpu_times()
+        total = (
+            times.user + times.system
+            + getattr(times, "children_user", 0.0)
+            + getattr(times, "children_system", 0.0)
+        )
+        for pid, helper in list(self.watched.items()):
+            try:
+                helper_times = helper.cpu_times()
+                self.watched_cpu[pid] = (
+                    helper_times.user + helper_times.system
+                )
+            except psutil.Error:
+                # Keep what an exited helper used
+                del self.watched[pid]
+                self.exited_cpu += self.watched_cpu.pop(pid, 0.0)
+        return total + self.exited_cpu + sum(self.watched_cpu.values())
+
+    def rss(self) -> int:
+        """Resident memory of this process and its helpers."""
+        total = self.process.memory_info().rss
+        for helper in list(self.watched.values()):
+            try:
+                total += helper.memory_info().rss
+            except psutil.Error:
+                pass
+        return total
+
+    def io_ops(self):
+        """Read and write operation count from the process I/O counters."""
+        try:
+            counters = self.process.io_counters()
+        except (AttributeError, psutil.Error):
+            return None
+        return counters.read_count + counters.write_count
+
+    def sample(self, now=None) -> dict:
+        """Summarise overhead over the window and since the last sample."""
+        if now is None:
+            now = time.monotonic()
+        if self.history is None:
+            self.reset(now)
+        cpu = self.cpu_seconds()
+        io_ops = self.io_ops()
+        history = self.history
+        history.append((now, cpu, io_ops))
+        while len(history) > 2 and now - history[1][0] >= self.window:
+            history.popleft()
+        start, start_cpu, start_io_ops = history[0]
+        elapsed = now - start
+
+        cpu_percent = io_ops_rate = None
+        if elapsed > 0:
+            cpu_percent = (cpu - start_cpu) / elapsed * 100
+            if io_ops is not None and start_io_ops is not None:
+                io_ops_rate = (io_ops - start_io_ops) / elapsed * 60
+
+        with self.lock:
+            while self.spawn_times and now - self.spawn_times[0] > 60:
+                self.spawn_times.popleft()
+            spawns = len(self.spawn_times)
+            collectors = {
+                name: {
+                    "last_ms": last * 1000,
+                    "mean_ms": total / runs * 1000,
+                    "cpu_seconds": total,
+                }
+                for name, (total, runs, last) in self.collectors.items()
+            }
+
+        rss = self.rss()
+        blocks = sys.getallocatedblocks()
+        usage = {
+            "cpu_percent": cpu_percent,
+            "budget": self.budget,
+            "over_budget": (
+                cpu_percent is not None and cpu_percent > self.budget
+            ),
+            "rss": rss,
+            "rss_growth": rss - self.start_rss,
+            "rss_per_frame": rss - self.last_rss,
+            "net_blocks_per_frame": blocks - self.last_blocks,
+            "io_ops_per_min": io_ops_rate,
+            "spawns_per_min": spawns,
+            "collectors": collectors,
+        }
+        self.last_rss = rss
+        self.last_blocks = blocks
+        self.last = usage
+        return usage
+
+
+self_monitor = SelfMonitor()
+
+
+def make_self_status(usage) -> Text:
+    """Create the one-line overhead summary shown in the footer."""
+    status = Text()
+    status.append("Self: ", style="bold")
+    cpu = usage["cpu_percent"]
+    cpu_style = "bold red" if usage["over_budget"] else "green"
+    status.append(
+        "CPU n/a" if cpu is None else f"CPU {cpu:.1f}%", style=cpu_style
+    )
+    status.append(f" / {usage['budget']:g}% budget", style="dim")
+    status.append("  |  ", style="dim")
+    growth = usage["rss_growth"]
+    sign = "+" if growth >= 0 else "-"
+    status.append(
+        f"RSS {format_bytes(usage['rss'])} "
+        f"({sign}{format_bytes(abs(growth))})",
+        style="cyan",
+    )
+    status.append(
+        f"  net blocks {usage['net_blocks_per_frame']:+,}/frame",
+        style="dim",
+    )
+    status.append("  |  ", style="dim")
+    if usage["io_ops_per_min"] is not None:
+        status.append(
+            f"I/O ops {usage['io_ops_per_min']:,.0f}/min  ", style="dim"
+        )
+    status.append(f"spawns {usage['spawns_per_min']}/min", style="dim")
+    if usage["collectors"]:
+        name, costs = max(
+            usage["collectors"].items(), key=lambda item: item[1]["mean_ms"]
+        )
+        status.append("  |  ", style="dim")
+        status.append(
+            f"costliest: {name} {costs['mean_ms']:.0f} ms", style="yellow"
+        )
+    return status
+
+
 def make_footer() -> Panel:
     """Create a footer panel with current time."""
     current_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
     sort_mode = "Memory" if sort_by_memory else "CPU"
-    footer_text = Text()
+    # One row per line: the footer is only as tall as its lines
+    footer_text = Text(no_wrap=True, overflow="ellipsis")
     footer_text.append(f"Current Time: {current_time}", style="bold green")
     footer_text.append("  |  ", style="dim")
     footer_text.append("m", style="bold yellow")
@@ -53,8 +355,26 @@ def make_footer() -> Panel:
         f" sort by Memory/CPU (current: {sort_mode})", style="dim"
     )
     footer_text.append("  |  ", style="dim")
+    footer_text.append("1-5/Tab", style="bold yellow")
+    footer_text.append(" view", style="dim")
+    footer_text.append("  |  ", style="dim")
+    footer_text.append("z", style="bold yellow")
+    footer_text.append(" zoom", style="dim")
+    footer_text.append("  |  ", style="dim")
+    footer_text.append("g", style="bold yellow")
+    footer_text.append(
+        f" group by (current: {GROUP_LABELS[group_by]})", style="dim"
+    )
+    if log_tailer is not None:
+        footer_text.append("  |  ", style="dim")
+        footer_text.append("l", style="bold yellow")
+        footer_text.append(f" log level ({log_severity}+)", style="dim")
+    footer_text.append("  |  ", style="dim")
     footer_text.append("q", style="bold yellow")
     footer_text.append(" quit", style="dim")
+    if self_monitor.last is not None:
+        footer_text.append("\n")
+        footer_text.append_text(make_self_status(self_monitor.last))
     return Panel(footer_text, style="bright_blue")
 
 
@@ -166,11 +486,25 @@ def make_system_info() -> Panel:
     return Panel(table, title="System Info", border_style="bright_blue")
 
 
-def make_cpu_ram_stats() -> Panel:
-    """Create a panel with CPU and RAM usage."""
-    cpu_percent = psutil.cpu_percent(interval=None)
+def collect_cpu_ram() -> dict:
+    """Sample CPU, RAM, temperature and battery readings."""
     memory = psutil.virtual_memory()
-    ram_percent = memory.percent
+    return {
+        "cpu_percent": psutil.cpu_percent(interval=None),
+        "ram_percent": memory.percent,
+        "ram_used": memory.used,
+        "ram_total": memory.total,
+        "cpu_temp": get_cpu_temperature(),
+        "battery": get_battery_status(),
+    }
+
+
+def make_cpu_ram_stats(cpu_ram=None) -> Panel:
+    """Create a panel with CPU and RAM usage."""
+    if cpu_ram is None:
+        cpu_ram = collect_cpu_ram()
+    cpu_percent = cpu_ram["cpu_percent"]
+    ram_percent = cpu_ram["ram_percent"]
 
     # Determine CPU color based on usage
     cpu_color = "red" if cpu_percent > 80 else "green"
@@ -190,7 +524,7 @@ def make_cpu_ram_stats() -> Panel:
     table.add_row("CPU Usage:", cpu_bar, cpu_text)
 
     # Add CPU temperature if available
-    cpu_temp = get_cpu_temperature()
+    cpu_temp = cpu_ram["cpu_temp"]
     if cpu_temp is not None:
         if cpu_temp > 80:
             temp_color = "red"
@@ -205,15 +539,15 @@ def make_cpu_ram_stats() -> Panel:
         table.add_row("CPU Temp:", Text("N/A", style="dim"))
 
     table.add_row("RAM Usage:", ram_bar, ram_text)
-    used_gb = memory.used / (1024**3)
-    total_gb = memory.total / (1024**3)
+    used_gb = cpu_ram["ram_used"] / (1024**3)
+    total_gb = cpu_ram["ram_total"] / (1024**3)
     table.add_row(
         "RAM Used:",
         Text(f"{used_gb:.2f} GB / {total_gb:.2f} GB", style="dim"),
     )
 
     # Add battery status if available
-    battery = get_battery_status()
+    battery = cpu_ram["battery"]
     if battery:
         bat_percent = battery.percent
         if bat_percent < 20:
@@ -249,314 +583,4314 @@ def make_cpu_ram_stats() -> Panel:
     return Panel(table, title="CPU & Memory", border_style="bright_blue")
 
 
-def make_disk_stats() -> Panel:
-    """Create a panel with disk usage."""
-    table = Table.grid(padding=(0, 2), expand=True)
-    table.add_column(justify="right", width=12)
-    table.add_column(justify="left", width=25)
-    table.add_column(justify="right", width=8)
+class StatsBackend:
+    """Source of process and disk samples.
 
-    # Get all disk partitions
-    partitions = psutil.disk_partitions()
-    for partition in partitions:
-        try:
-            usage = psutil.disk_usage(partition.mountpoint)
-            disk_percent = usage.percent
-            disk_color = (
-                "red"
-                if disk_percent > 90
-                else "yellow" if disk_percent > 70 else "green"
-            )
+    processes() returns one dict per process with pid, name, cpu_percent
+    (of one core), memory_percent, username, ppid and io_bytes; disks()
+    returns one dict per partition with device, mountpoint, percent,
+    used, total and free.
+    """
 
-            disk_bar = make_progress_bar(disk_percent, disk_color)
-            disk_style = f"bold {disk_color}"
-            disk_text = Text(f"{disk_percent:5.1f}%", style=disk_style)
+    name = "base"
 
-            free_gb = usage.free / (1024**3)
-            if free_gb < 10:
-                free_color = "red"
-            elif free_gb < 50:
-                free_color = "yellow"
-            else:
-                free_color = "green"
+    def processes(self) -> list:
+        """Sample every running process."""
+        raise NotImplementedError
 
-            table.add_row(f"{partition.device}:", disk_bar, disk_text)
-            used_disk = usage.used / (1024**3)
-            total_disk = usage.total / (1024**3)
-            table.add_row(
-                "  Used:",
-                Text(f"{used_disk:.1f} GB / {total_disk:.1f} GB", style="dim"),
-            )
-            free_style = f"bold {free_color}"
-            table.add_row(
-                "  Free:", Text(f"{free_gb:.1f} GB", style=free_style)
+    def disks(self) -> list:
+        """Sample every mounted partition."""
+        raise NotImplementedError
+
+
+class PsutilBackend(StatsBackend):
+    """Per-process and per-mount queries through psutil."""
+
+    name = "psutil"
+
+    def processes(self) -> list:
+        processes = []
+        proc_attrs = [
+            "pid", "name", "cpu_percent", "memory_percent", "username",
+            "ppid", "io_counters",
+        ]
+        for proc in psutil.process_iter(proc_attrs):
+            try:
+                pinfo = proc.info
+                if pinfo["cpu_percent"] is not None:
+                    io = pinfo.pop("io_counters", None)
+                    pinfo["io_bytes"] = (
+                        io.read_bytes + io.write_bytes if io else None
+                    )
+                    processes.append(pinfo)
+            except (psutil.NoSuchProcess, psutil.AccessDenied,
+                    psutil.ZombieProcess):
+                pass
+        return processes
+
+    def disks(self) -> list:
+        disks = []
+
+        # Get all disk partitions
+        partitions = psutil.disk_partitions()
+        for partition in partitions:
+            try:
+                usage = psutil.disk_usage(partition.mountpoint)
+            except (PermissionError, OSError):
+                continue
+            disks.append({
+                "device": partition.device,
+                "mountpoint": partition.mountpoint,
+                "percent": usage.percent,
+                "used": usage.used,
+                "total": usage.total,
+                "free": usage.free,
+            })
+        return disks
+
+
+class UnicodeString(ctypes.Structure):
+    """UNICODE_STRING from winternl.h; Length is in bytes."""
+
+    _fields_ = [
+        ("Length", ctypes.c_uint16),
+        ("MaximumLength", ctypes.c_uint16),
+        ("Buffer", ctypes.c_void_p),
+    ]
+
+
+class SystemProcessInformation(ctypes.Structure):
+    """SYSTEM_PROCESS_INFORMATION, as laid out on 64-bit Windows."""
+
+    _fields_ = [
+        ("NextEntryOffset", ctypes.c_uint32),
+        ("NumberOfThreads", ctypes.c_uint32),
+        ("WorkingSetPrivateSize", ctypes.c_int64),
+        ("HardFaultCount", ctypes.c_uint32),
+        ("NumberOfThreadsHighWatermark", ctypes.c_uint32),
+        ("CycleTime", ctypes.c_uint64),
+        ("CreateTime", ctypes.c_int64),
+        ("UserTime", ctypes.c_int64),
+        ("KernelTime", ctypes.c_int64),
+        ("ImageName", UnicodeString),
+        ("BasePriority", ctypes.c_int32),
+        ("UniqueProcessId", ctypes.c_void_p),
+        ("InheritedFromUniqueProcessId", ctypes.c_void_p),
+        ("HandleCount", ctypes.c_uint32),
+        ("SessionId", ctypes.c_uint32),
+        ("UniqueProcessKey", ctypes.c_void_p),
+        ("PeakVirtualSize", ctypes.c_size_t),
+        ("VirtualSize", ctypes.c_size_t),
+        ("PageFaultCount", ctypes.c_uint32),
+        ("PeakWorkingSetSize", ctypes.c_size_t),
+        ("WorkingSetSize", ctypes.c_size_t),
+        ("QuotaPeakPagedPoolUsage", ctypes.c_size_t),
+        ("QuotaPagedPoolUsage", ctypes.c_size_t),
+        ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t),
+        ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+        ("PagefileUsage", ctypes.c_size_t),
+        ("PeakPagefileUsage", ctypes.c_size_t),
+        ("PrivatePageCount", ctypes.c_size_t),
+        ("ReadOperationCount", ctypes.c_int64),
+        ("WriteOperationCount", ctypes.c_int64),
+        ("OtherOperationCount", ctypes.c_int64),
+        ("ReadTransferCount", ctypes.c_int64),
+        ("WriteTransferCount", ctypes.c_int64),
+        ("OtherTransferCount", ctypes.c_int64),
+    ]
+
+
+class PerformanceInformation(ctypes.Structure):
+    """PERFORMANCE_INFORMATION from psapi.h; sizes are in pages."""
+
+    _fields_ = [
+        ("cb", ctypes.c_uint32),
+        ("CommitTotal", ctypes.c_size_t),
+        ("CommitLimit", ctypes.c_size_t),
+        ("CommitPeak", ctypes.c_size_t),
+        ("PhysicalTotal", ctypes.c_size_t),
+        ("PhysicalAvailable", ctypes.c_size_t),
+        ("SystemCache", ctypes.c_size_t),
+        ("KernelTotal", ctypes.c_size_t),
+        ("KernelPaged", ctypes.c_size_t),
+        ("KernelNonpaged", ctypes.c_size_t),
+        ("PageSize", ctypes.c_size_t),
+        ("HandleCount", ctypes.c_uint32),
+        ("ProcessCount", ctypes.c_uint32),
+        ("ThreadCount", ctypes.c_uint32),
+    ]
+
+
+# Windows process information structures and drive types used below
+SYSTEM_PROCESS_INFORMATION_CLASS = 5
+STATUS_INFO_LENGTH_MISMATCH = 0xC0000004
+DRIVE_REMOVABLE = 2
+DRIVE_FIXED = 3
+
+ProcessEntry = namedtuple(
+    "ProcessEntry", "pid ppid name create_time cpu_time working_set io_bytes"
+)
+
+
+def parse_process_information(buffer) -> list:
+    """Walk the SYSTEM_PROCESS_INFORMATION entries in a query buffer.
+
+    cpu_time is user plus kernel time in 100 ns units.
+    """
+    entries = []
+    offset = 0
+    while True:
+        info = SystemProcessInformation.from_buffer(buffer, offset)
+        image = info.ImageName
+        name = (
+            ctypes.string_at(image.Buffer, image.Length).decode(
+                "utf-16-le", "replace"
             )
-        except (PermissionError, OSError):
-            continue
+            if image.Buffer else "System Idle Process"
+        )
+        entries.append(ProcessEntry(
+            pid=info.UniqueProcessId or 0,
+            ppid=info.InheritedFromUniqueProcessId or 0,
+            name=name,
+            create_time=info.CreateTime,
+            cpu_time=info.UserTime + info.KernelTime,
+            working_set=info.WorkingSetSize,
+            io_bytes=info.ReadTransferCount + info.WriteTransferCount,
+        ))
+        if not info.NextEntryOffset:
+            return entries
+        offset += info.NextEntryOffset
 
-    return Panel(table, title="Disk Usage", border_style="bright_blue")
 
+class NtQueryBackend(StatsBackend):
+    """Windows bulk backend: one system-wide query per tick.
 
-def make_network_stats() -> Panel:
-    """Create a panel with network statistics."""
-    net_io = psutil.net_io_counters()
+    NtQuerySystemInformation returns every process's CPU times, working
+    set and IO counts in one call, instead of opening each process.
+    Only usernames need a per-process lookup, done once per new process.
+    """
 
-    table = Table.grid(padding=(0, 2))
-    table.add_column(justify="right")
-    table.add_column(justify="left")
+    name = "windows"
+
+    def __init__(self, buffer_size=1 << 20):
+        self.ntdll = ctypes.windll.ntdll
+        self.kernel32 = ctypes.windll.kernel32
+        self.buffer = ctypes.create_string_buffer(buffer_size)
+        self.total_memory = psutil.virtual_memory().total
+        self.cpu_times = {}  # (pid, create time) -> cpu time
+        self.users = {}  # (pid, create time) -> username
+        self.last_time = None
+
+    def query(self) -> list:
+        """Fetch and parse every process in one call."""
+        needed = ctypes.c_uint32()
+        while True:
+            status = self.ntdll.NtQuerySystemInformation(
+                SYSTEM_PROCESS_INFORMATION_CLASS,
+                self.buffer,
+                len(self.buffer),
+                ctypes.byref(needed),
+            ) & 0xFFFFFFFF
+            if status == STATUS_INFO_LENGTH_MISMATCH:
+                # Processes started since the size was reported
+                self.buffer = ctypes.create_string_buffer(
+                    needed.value + (1 << 16)
+                )
+                continue
+            if status:
+                raise OSError(
+                    f"NtQuerySystemInformation failed: 0x{status:08X}"
+                )
+            return parse_process_information(self.buffer)
 
-    bytes_sent = net_io.bytes_sent
-    bytes_recv = net_io.bytes_recv
+    def username(self, key):
+        """Look a process's username up once and cache it."""
+        if key not in self.users:
+            try:
+                self.users[key] = psutil.Process(key[0]).username()
+            except psutil.Error:
+                self.users[key] = None
+        return self.users[key]
 
-    # Format bytes to appropriate unit
-    def format_bytes(b):
-        for unit in ["B", "KB", "MB", "GB", "TB"]:
-            if b < 1024:
-                return f"{b:.2f} {unit}"
-            b /= 1024
-        return f"{b:.2f} PB"
+    def processes(self) -> list:
+        entries = self.query()
+        now = sample_time()
+        elapsed = (
+            now - self.last_time if self.last_time is not None else 0.0
+        )
+        self.last_time = now
 
-    sent_text = Text(format_bytes(bytes_sent), style="bold yellow")
-    recv_text = Text(format_bytes(bytes_recv), style="bold cyan")
+        processes = []
+        cpu_times = {}
+        for entry in entries:
+            # The idle pseudo-process only accounts for idle CPU
+            if entry.pid == 0:
+                continue
+            key = (entry.pid, entry.create_time)
+            cpu_times[key] = entry.cpu_time
+            cpu_percent = 0.0
+            previous = self.cpu_times.get(key)
+            if previous is not None and elapsed > 0:
+                cpu_percent = (
+                    (entry.cpu_time - previous) / 1e7 / elapsed * 100
+                )
+            processes.append({
+                "pid": entry.pid,
+                "name": entry.name,
+                "cpu_percent": cpu_percent,
+                "memory_percent": (
+                    entry.working_set / self.total_memory * 100
+                ),
+                "username": self.username(key),
+                "ppid": entry.ppid,
+                "io_bytes": entry.io_bytes,
+            })
+        self.cpu_times = cpu_times
+        for key in set(self.users) - set(cpu_times):
+            del self.users[key]
+        return processes
 
-    table.add_row("Bytes Sent:", sent_text)
-    table.add_row("Bytes Received:", recv_text)
-    table.add_row("Packets Sent:", f"{net_io.packets_sent:,}")
-    table.add_row("Packets Received:", f"{net_io.packets_recv:,}")
+    def disks(self) -> list:
+        size = self.kernel32.GetLogicalDriveStringsW(0, None)
+        names = ctypes.create_unicode_buffer(size)
+        self.kernel32.GetLogicalDriveStringsW(size, names)
+        disks = []
+        for root in names[:size].split("\0"):
+            if not root or self.kernel32.GetDriveTypeW(root) not in (
+                DRIVE_REMOVABLE, DRIVE_FIXED
+            ):
+                continue
+            free = ctypes.c_uint64()
+            total = ctypes.c_uint64()
+            total_free = ctypes.c_uint64()
+            if not self.kernel32.GetDiskFreeSpaceExW(
+                root, ctypes.byref(free), ctypes.byref(total),
+                ctypes.byref(total_free),
+            ) or not total.value:
+                # No media in a removable drive, or access denied
+                continue
+            used = total.value - total_free.value
+            disks.append({
+                "device": root,
+                "mountpoint": root,
+                "percent": round(used / total.value * 100, 1),
+                "used": used,
+                "total": total.value,
+                "free": free.value,
+            })
+        return disks
 
-    return Panel(table, title="Network Stats", border_style="bright_blue")
 
+class FixtureBackend(StatsBackend):
+    """Replay processes and disks recorded with the snapshot command.
 
-def make_top_processes() -> Panel:
-    """Create a panel showing top 5 processes by CPU or memory usage."""
-    sort_key = "memory_percent" if sort_by_memory else "cpu_percent"
-    sort_label = "Memory" if sort_by_memory else "CPU"
+    Reads JSON or NDJSON written by `snapshot --collectors
+    processes,disks` and cycles through the recorded snapshots.
+    """
 
-    table = Table(expand=True, box=None, padding=(0, 1))
-    table.add_column("PID", justify="right", style="cyan", width=7)
-    table.add_column("Name", justify="left", style="white", no_wrap=True)
-    table.add_column("CPU %", justify="right", width=7)
-    table.add_column("Mem %", justify="right", width=7)
+    name = "fixture"
+
+    def __init__(self, path):
+        with open(path) as f:
+            text = f.read()
+        try:
+            data = json.loads(text)
+            frames = data if isinstance(data, list) else [data]
+        except json.JSONDecodeError:
+            frames = [json.loads(line) for line in text.splitlines()
+                      if line.strip()]
+        if not frames:
+            raise ValueError(f"No snapshots in {path}")
+        self.frames = frames
+        self.positions = {"processes": 0, "disks": 0}
+
+    def _next(self, section) -> list:
+        position = self.positions[section]
+        self.positions[section] = position + 1
+        records = self.frames[position % len(self.frames)].get(section)
+        return [dict(record) for record in records or []]
+
+    def processes(self) -> list:
+        return self._next("processes")
 
-    processes = []
-    proc_attrs = ["pid", "name", "cpu_percent", "memory_percent"]
-    for proc in psutil.process_iter(proc_attrs):
+    def disks(self) -> list:
+        return self._next("disks")
+
+
+BACKENDS = ("auto", "psutil", "windows", "fixture")
+
+
+def select_stats_backend(name="auto", fixture=None) -> StatsBackend:
+    """Create a stats backend; auto prefers the bulk query on Windows."""
+    if name == "fixture" or (name == "auto" and fixture):
+        return FixtureBackend(fixture)
+    if name == "windows":
+        return NtQueryBackend()
+    if name == "auto" and platform.system() == "Windows":
         try:
-            pinfo = proc.info
-            if pinfo["cpu_percent"] is not None:
-                processes.append(pinfo)
-        except (psutil.NoSuchProcess, psutil.AccessDenied,
-                psutil.ZombieProcess):
+            backend = NtQueryBackend()
+            backend.query()
+            return backend
+        except (AttributeError, OSError):
             pass
+    return PsutilBackend()
 
-    # Sort by selected metric descending and get top 5
-    sorted_procs = sorted(
-        processes, key=lambda x: x[sort_key] or 0, reverse=True
-    )
-    top_processes = sorted_procs[:5]
 
-    for proc in top_processes:
-        cpu = proc["cpu_percent"] or 0
-        mem = proc["memory_percent"] or 0
-        cpu_color = "red" if cpu > 50 else "yellow" if cpu > 20 else "green"
-        mem_color = "red" if mem > 50 else "yellow" if mem > 20 else "cyan"
+stats_backend = PsutilBackend()
 
-        table.add_row(
-            str(proc["pid"]),
-            proc["name"][:20] if proc["name"] else "N/A",
-            Text(f"{cpu:.1f}%", style=f"bold {cpu_color}"),
-            Text(f"{mem:.1f}%", style=f"bold {mem_color}"),
-        )
 
-    title = f"Top Processes (by {sort_label})"
-    return Panel(table, title=title, border_style="bright_blue")
+def collect_disks() -> list:
+    """Sample usage for every mounted disk partition."""
+    return stats_backend.disks()
 
 
-def make_docker_stats() -> Panel:
-    """Create a panel showing Docker container stats."""
-    table = Table(expand=True, box=None, padding=(0, 1))
-    table.add_column("Container", justify="left", style="cyan", no_wrap=True)
-    table.add_column("Image", justify="left", style="dim", no_wrap=True)
-    table.add_column("Status", justify="left", width=12)
-    table.add_column("CPU %", justify="right", width=8)
-    table.add_column("Mem Usage", justify="right", width=18)
+def format_duration(seconds) -> str:
+    """Format a duration as days/hours/minutes."""
+    minutes, _ = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    days, hours = divmod(hours, 24)
+    if days > 0:
+        return f"{days}d {hours}h"
+    if hours > 0:
+        return f"{hours}h {minutes}m"
+    return f"{minutes}m"
 
-    try:
-        # Get running containers
-        result = subprocess.run(
-            ["docker", "ps", "--format",
-             "{{.Names}}\t{{.Image}}\t{{.Status}}"],
-            capture_output=True,
-            text=True,
-            timeout=5,
-            creationflags=subprocess.CREATE_NO_WINDOW,
-        )
 
-        if result.returncode != 0:
-            return Panel(
-                Text("Docker not available or not running", style="dim"),
-                title="Docker Containers",
-                border_style="bright_blue",
-            )
+class DiskTrend:
+    """Rolling least-squares fit of used bytes over time for one disk.
 
-        containers = result.stdout.strip().split("\n")
-        if not containers or containers == [""]:
-            return Panel(
-                Text("No running containers", style="dim"),
-                title="Docker Containers",
-                border_style="bright_blue",
-            )
+    Keeps running sums so adding a point and evicting the oldest are
+    both O(1). Times and sizes are stored relative to the first point to
+    keep the sums well conditioned.
+    """
 
-        # Get stats for running containers
-        stats_result = subprocess.run(
-            [
-                "docker",
-                "stats",
-                "--no-stream",
-                "--format",
-                "{{.Name}}\t{{.CPUPerc}}\t{{.MemUsage}}",
-            ],
-            capture_output=True,
-            text=True,
-            timeout=10,
-            creationflags=subprocess.CREATE_NO_WINDOW,
+    __slots__ = ("points", "t0", "y0", "sx", "sy", "sxx", "sxy",
+                 "last_time")
+
+    def __init__(self, window):
+        self.points = deque(maxlen=window)
+        self.t0 = None
+        self.y0 = None
+        self.sx = self.sy = self.sxx = self.sxy = 0.0
+        self.last_time = None
+
+    def add(self, t, used):
+        """Add one (time, used bytes) point, evicting the oldest."""
+        if self.t0 is None:
+            self.t0 = t
+            self.y0 = used
+        x = t - self.t0
+        y = float(used - self.y0)
+        if len(self.points) == self.points.maxlen:
+            old_x, old_y = self.points[0]
+            self.sx -= old_x
+            self.sy -= old_y
+            self.sxx -= old_x * old_x
+            self.sxy -= old_x * old_y
+        self.points.append((x, y))
+        self.sx += x
+        self.sy += y
+        self.sxx += x * x
+        self.sxy += x * y
+        self.last_time = t
+
+    def slope(self, min_points=2) -> Optional[float]:
+        """Growth in bytes per second, or None without enough points."""
+        n = len(self.points)
+        if n < min_points:
+            return None
+        denominator = n * self.sxx - self.sx * self.sx
+        if denominator <= 0:
+            return None
+        return (n * self.sxy - self.sx * self.sy) / denominator
+
+    @property
+    def span(self) -> float:
+        """Seconds between the oldest and newest point."""
+        if not self.points:
+            return 0.0
+        return self.points[-1][0] - self.points[0][0]
+
+
+class DiskForecaster:
+    """Estimate when each partition fills up from its recent growth.
+
+    An ETA is shown after min_points samples, but alerts wait until the
+    fit covers min_span seconds (by default half the window), so a
+    burst of writes at startup doesn't raise one.
+    """
+
+    def __init__(self, spacing=10.0, window=360, min_points=6,
+                 alert_eta=24 * 3600, min_span=None):
+        self.spacing = spacing
+        self.window = window
+        self.min_points = min_points
+        self.alert_eta = alert_eta
+        self.min_span = (
+            spacing * window / 2 if min_span is None else min_span
         )
+        self.trends = {}
+        self.free = {}
 
-        stats_dict = {}
-        if stats_result.returncode == 0:
-            for line in stats_result.stdout.strip().split("\n"):
-                if line:
-                    parts = line.split("\t")
-                    if len(parts) >= 3:
-                        stats_dict[parts[0]] = {
-                            "cpu": parts[1], "mem": parts[2]
-                        }
-
-        for container in containers:
-            if not container:
+    def observe(self, disks, now=None):
+        """Record disk usage, at most one point per spacing seconds."""
+        if now is None:
+            now = time.monotonic()
+        seen = set()
+        for disk in disks:
+            mount = disk["mountpoint"]
+            seen.add(mount)
+            self.free[mount] = disk["free"]
+            trend = self.trends.get(mount)
+            if trend is None:
+                trend = self.trends[mount] = DiskTrend(self.window)
+            if (trend.last_time is None
+                    or now - trend.last_time >= self.spacing):
+                trend.add(now, disk["used"])
+        for mount in set(self.trends) - seen:
+            del self.trends[mount]
+            del self.free[mount]
+
+    def eta(self, mount) -> Optional[float]:
+        """Seconds until the partition is full; inf if it is not growing."""
+        trend = self.trends.get(mount)
+        if trend is None:
+            return None
+        slope = trend.slope(self.min_points)
+        if slope is None:
+            return None
+        if slope <= 0:
+            return inf
+        return self.free[mount] / slope
+
+    def alerts(self) -> list:
+        """Return an Anomaly for every partition filling within alert_eta."""
+        found = []
+        for mount, trend in self.trends.items():
+            if trend.span < self.min_span:
                 continue
-            parts = container.split("\t")
-            if len(parts) >= 3:
-                name = parts[0][:15]
-                image = parts[1][:20]
-                status = parts[2].split()[0] if parts[2] else "Unknown"
-
-                # Color status
-                status_color = "green" if "Up" in parts[2] else "red"
-                status_text = Text(status, style=f"bold {status_color}")
-
-                # Get stats
-                stats = stats_dict.get(parts[0], {})
-                cpu = stats.get("cpu", "N/A")
-                mem = stats.get("mem", "N/A")
-
-                # Color CPU
-                if cpu != "N/A" and "%" in cpu:
-                    cpu_val = float(cpu.replace("%", ""))
-                else:
-                    cpu_val = 0
-                if cpu_val > 80:
-                    cpu_color = "red"
-                elif cpu_val > 50:
-                    cpu_color = "yellow"
-                else:
-                    cpu_color = "green"
-                cpu_text = (
-                    Text(cpu, style=f"bold {cpu_color}")
-                    if cpu != "N/A"
-                    else Text("N/A", style="dim")
-                )
+            eta = self.eta(mount)
+            if eta is not None and eta <= self.alert_eta:
+                found.append(Anomaly(
+                    f"disk:{mount}", "full", eta, self.free[mount],
+                    self.alert_eta / max(eta, 1.0),
+                ))
+        return found
 
-                table.add_row(name, image, status_text, cpu_text, mem)
 
-    except FileNotFoundError:
-        return Panel(
-            Text("Docker is not installed", style="dim"),
-            title="Docker Containers",
-            border_style="bright_blue",
+disk_forecaster = DiskForecaster()
+
+
+def make_disk_stats(disks=None) -> Panel:
+    """Create a panel with disk usage."""
+    if disks is None:
+        disks = collect_disks()
+
+    table = Table.grid(padding=(0, 2), expand=True)
+    table.add_column(justify="right", width=12)
+    table.add_column(justify="left", width=25)
+    table.add_column(justify="right", width=8)
+
+    for disk in disks:
+        disk_percent = disk["percent"]
+        disk_color = (
+            "red"
+            if disk_percent > 90
+            else "yellow" if disk_percent > 70 else "green"
         )
-    except subprocess.TimeoutExpired:
-        return Panel(
-            Text("Docker command timed out", style="dim"),
-            title="Docker Containers",
-            border_style="bright_blue",
+
+        disk_bar = make_progress_bar(disk_percent, disk_color)
+        disk_style = f"bold {disk_color}"
+        disk_text = Text(f"{disk_percent:5.1f}%", style=disk_style)
+
+        free_gb = disk["free"] / (1024**3)
+        if free_gb < 10:
+            free_color = "red"
+        elif free_gb < 50:
+            free_color = "yellow"
+        else:
+            free_color = "green"
+
+        table.add_row(f"{disk['device']}:", disk_bar, disk_text)
+        used_disk = disk["used"] / (1024**3)
+        total_disk = disk["total"] / (1024**3)
+        table.add_row(
+            "  Used:",
+            Text(f"{used_disk:.1f} GB / {total_disk:.1f} GB", style="dim"),
         )
-    except Exception as e:
-        return Panel(
-            Text(f"Error: {str(e)[:30]}", style="red"),
-            title="Docker Containers",
-            border_style="bright_blue",
+        free_style = f"bold {free_color}"
+        table.add_row(
+            "  Free:", Text(f"{free_gb:.1f} GB", style=free_style)
         )
 
-    return Panel(table, title="Docker Containers", border_style="bright_blue")
+        eta = disk_forecaster.eta(disk["mountpoint"])
+        if eta is not None:
+            if eta == inf:
+                eta_text = Text("not growing", style="dim")
+            else:
+                if eta < disk_forecaster.alert_eta:
+                    eta_color = "red"
+                elif eta < 7 * 24 * 3600:
+                    eta_color = "yellow"
+                else:
+                    eta_color = "green"
+                eta_text = Text(
+                    format_duration(eta), style=f"bold {eta_color}"
+                )
+            table.add_row("  Full in:", eta_text)
 
+    return Panel(table, title="Disk Usage", border_style="bright_blue")
 
-def make_layout() -> Layout:
-    """Create and populate the layout."""
-    layout = Layout()
 
-    # Split into header, body, docker, and footer
-    layout.split(
-        Layout(name="header", size=3),
-        Layout(name="body", ratio=1),
-        Layout(name="docker", size=10),
-        Layout(name="footer", size=3),
-    )
+def format_bytes(b) -> str:
+    """Format bytes to appropriate unit."""
+    for unit in ["B", "KB", "MB", "GB", "TB"]:
+        if b < 1024:
+            return f"{b:.2f} {unit}"
+        b /= 1024
+    return f"{b:.2f} PB"
 
-    # Split body into left and right columns
-    layout["body"].split_row(
-        Layout(name="left"),
-        Layout(name="right"),
-    )
 
-    # Split left column into System Info, CPU/RAM and Disk
-    layout["left"].split_column(
-        Layout(name="system_info", size=11),
-        Layout(name="cpu_ram"),
-        Layout(name="disk"),
-    )
+def collect_network() -> dict:
+    """Sample system-wide network IO counters."""
+    net_io = psutil.net_io_counters()
+    return {
+        "bytes_sent": net_io.bytes_sent,
+        "bytes_recv": net_io.bytes_recv,
+        "packets_sent": net_io.packets_sent,
+        "packets_recv": net_io.packets_recv,
+    }
 
-    # Split right column for network stats and top processes
-    layout["right"].split_column(
-        Layout(name="network"),
-        Layout(name="processes"),
-    )
 
-    # Assign content to each section
-    layout["header"].update(make_header())
-    layout["system_info"].update(make_system_info())
-    layout["cpu_ram"].update(make_cpu_ram_stats())
-    layout["disk"].update(make_disk_stats())
-    layout["network"].update(make_network_stats())
-    layout["processes"].update(make_top_processes())
-    layout["docker"].update(make_docker_stats())
-    layout["footer"].update(make_footer())
+def make_network_stats(network=None, rates=None) -> Panel:
+    """Create a panel with network statistics.
 
-    return layout
+    rates, from a frame's derived metrics, adds bytes per second.
+    """
+    if network is None:
+        network = collect_network()
 
+    table = Table.grid(padding=(0, 2))
+    table.add_column(justify="right")
+    table.add_column(justify="left")
 
-def main():
-    global sort_by_memory
-    console = Console()
+    bytes_sent = network["bytes_sent"]
+    bytes_recv = network["bytes_recv"]
 
-    # Initial CPU reading to avoid 0% on first call
-    psutil.cpu_percent(interval=None)
+    sent_text = Text(format_bytes(bytes_sent), style="bold yellow")
+    recv_text = Text(format_bytes(bytes_recv), style="bold cyan")
+    if rates and rates["bytes_sent"] is not None:
+        sent_text.append(f" ({format_rate(rates['bytes_sent'])})", "dim")
+        recv_text.append(f" ({format_rate(rates['bytes_recv'])})", "dim")
 
-    # Use Live to auto-refresh every 2 seconds
-    with Live(
-        make_layout(), console=console, refresh_per_second=0.5, screen=True
-    ) as live:
-        while True:
-            # Check for keyboard input
-            if msvcrt.kbhit():
-                key = msvcrt.getch().decode("utf-8", errors="ignore").lower()
-                if key == "q":
-                    break
-                elif key == "m":
-                    sort_by_memory = not sort_by_memory
-            live.update(make_layout())
+    table.add_row("Bytes Sent:", sent_text)
+    table.add_row("Bytes Received:", recv_text)
+    table.add_row("Packets Sent:", f"{network['packets_sent']:,}")
+    table.add_row("Packets Received:", f"{network['packets_recv']:,}")
+
+    return Panel(table, title="Network Stats", border_style="bright_blue")
+
+
+# Seconds between connection table samples; net_connections() walks
+# every socket on the host, so it runs slower than the other collectors
+CONNECTION_INTERVAL = 10.0
+
+# TIME_WAIT count above which the state is highlighted as a storm
+TIME_WAIT_STORM = 1000
+
+
+class ConnectionTracker:
+    """Aggregate psutil.net_connections() between slower samples.
+
+    Each sample is diffed against the previous one, and only added and
+    removed sockets update the per-remote, per-state and per-process
+    counts and the listening port inventory.
+    """
+
+    def __init__(self, interval=CONNECTION_INTERVAL, kind="inet"):
+        self.interval = interval
+        self.kind = kind
+        self.connections = set()
+        self.remotes = {}  # (host, port, status) -> count
+        self.states = {}  # status -> count
+        self.by_pid = {}  # pid -> count
+        self.listening = {}  # (proto, host, port, pid) -> count
+        self.names = {}  # pid -> process name
+        self.added = 0
+        self.removed = 0
+        self.error = None
+        self.next_sample = 0.0
+        self.last = None
+
+    @staticmethod
+    def _key(conn):
+        proto = "udp" if conn.type == socket.SOCK_DGRAM else "tcp"
+        return (
+            proto,
+            tuple(conn.laddr) if conn.laddr else None,
+            tuple(conn.raddr) if conn.raddr else None,
+            conn.status,
+            conn.pid,
+        )
+
+    @staticmethod
+    def _bump(counts, key, delta):
+        count = counts.get(key, 0) + delta
+        if count:
+            counts[key] = count
+        else:
+            del counts[key]
+
+    def _apply(self, key, delta):
+        proto, laddr, raddr, status, pid = key
+        self._bump(self.states, status, delta)
+        if raddr:
+            self._bump(self.remotes, (raddr[0], raddr[1], status), delta)
+        elif laddr and (status == psutil.CONN_LISTEN or proto == "udp"):
+            self._bump(self.listening, (proto, laddr[0], laddr[1], pid),
+                       delta)
+        if pid is not None:
+            self._bump(self.by_pid, pid, delta)
+
+    def update(self, connections):
+        """Fold a fresh connection list into the aggregates."""
+        current = {self._key(conn) for conn in connections}
+        added = current - self.connections
+        removed = self.connections - current
+        for key in removed:
+            self._apply(key, -1)
+        for key in added:
+            self._apply(key, 1)
+        self.connections = current
+        self.added = len(added)
+        self.removed = len(removed)
+        for pid in set(self.names) - set(self.by_pid):
+            del self.names[pid]
+
+    def process_name(self, pid) -> str:
+        """Return a cached name for a socket's owning process."""
+        if pid is None:
+            return "-"
+        name = self.names.get(pid)
+        if name is None:
+            try:
+                name = psutil.Process(pid).name()
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                name = str(pid)
+            self.names[pid] = name
+        return name
+
+    def summary(self, top=20) -> dict:
+        """Return the aggregates as plain data for a snapshot."""
+        remotes = sorted(
+            self.remotes.items(), key=lambda item: item[1], reverse=True
+        )[:top]
+        owners = {}
+        for _, _, raddr, status, pid in self.connections:
+            if raddr:
+                owners.setdefault((raddr[0], raddr[1], status), set()).add(
+                    pid
+                )
+        return {
+            "total": len(self.connections),
+            "states": dict(self.states),
+            "remotes": [
+                {
+                    "host": host,
+                    "port": port,
+                    "status": status,
+                    "count": count,
+                    "processes": sorted(
+                        self.process_name(pid)
+                        for pid in owners.get((host, port, status), ())
+                    ),
+                }
+                for (host, port, status), count in remotes
+            ],
+            "listening": [
+                {
+                    "proto": proto,
+                    "host": host,
+                    "port": port,
+                    "process": self.process_name(pid),
+                }
+                for proto, host, port, pid in sorted(
+                    self.listening, key=lambda key: (key[2], key[0])
+                )
+            ],
+            "added": self.added,
+            "removed": self.removed,
+            "error": self.error,
+        }
+
+    def sample(self, now=None) -> dict:
+        """Resample when the interval has passed; else return the last."""
+        if now is None:
+            now = sample_time()
+        if self.last is not None and now < self.next_sample:
+            return self.last
+        self.next_sample = now + self.interval
+        try:
+            self.update(psutil.net_connections(kind=self.kind))
+            self.error = None
+        except psutil.AccessDenied:
+            # macOS needs root to list other processes' sockets
+            self.error = "Access denied (run as administrator)"
+        except OSError as e:
+            self.error = str(e)[:50]
+        self.last = self.summary()
+        return self.last
+
+
+connection_tracker = ConnectionTracker()
+
+
+def collect_connections() -> dict:
+    """Sample the connection table with the shared tracker."""
+    return connection_tracker.sample()
+
+
+def format_endpoint(host, port) -> str:
+    """Format an address and port, bracketing IPv6 hosts."""
+    if ":" in host:
+        return f"[{host}]:{port}"
+    return f"{host}:{port}"
+
+
+def make_connections(connections=None, limit=5) -> Panel:
+    """Create a panel with connection states, top remotes and listeners."""
+    if connections is None:
+        connections = collect_connections()
+
+    states = Text()
+    for status, count in sorted(
+        connections["states"].items(), key=lambda item: -item[1]
+    ):
+        style = "cyan"
+        if status == psutil.CONN_TIME_WAIT and count > TIME_WAIT_STORM:
+            style = "bold red"
+        if status == psutil.CONN_NONE:
+            status = "UDP"
+        states.append(f"{status} ", style="dim")
+        states.append(f"{count:,}  ", style=style)
+
+    table = Table(expand=True, box=None, padding=(0, 1))
+    table.add_column("Remote", style="cyan", no_wrap=True)
+    table.add_column("State", style="dim", no_wrap=True)
+    table.add_column("Conns", justify="right", style="green", min_width=5)
+    table.add_column("Process", style="white", no_wrap=True, ratio=1)
+    for remote in connections["remotes"][:limit]:
+        table.add_row(
+            format_endpoint(remote["host"], remote["port"]),
+            remote["status"],
+            str(remote["count"]),
+            ", ".join(remote["processes"]) or "-",
+        )
+
+    listening = Text("Listening: ", style="dim")
+    ports = {}
+    for listener in connections["listening"]:
+        label = f"{listener['port']}/{listener['proto']}"
+        ports.setdefault(label, listener["process"])
+    listening.append(
+        " ".join(f"{label} {name}" for label, name in ports.items())
+        or "none",
+        style="yellow",
+    )
+
+    rows = [states, table, listening]
+    if connections["error"]:
+        rows.append(Text(connections["error"], style="red"))
+
+    title = (
+        f"Connections ({connections['total']:,}, "
+        f"+{connections['added']}/-{connections['removed']})"
+    )
+    return Panel(Group(*rows), title=title, border_style="bright_blue")
+
+
+# Fields produced by MemoryPressureCollector; None when unavailable
+MEMORY_PRESSURE_FIELDS = (
+    "swap_percent",
+    "swap_used",
+    "swap_total",
+    "swap_in_rate",
+    "swap_out_rate",
+    "major_fault_rate",
+    "psi_cpu_some",
+    "psi_memory_some",
+    "psi_memory_full",
+    "psi_io_some",
+    "psi_io_full",
+    "commit_total",
+    "commit_limit",
+)
+
+
+def read_psi(resource, root="/proc/pressure"):
+    """Read avg10 'some' and 'full' stall percentages from Linux PSI."""
+    result = {"some": None, "full": None}
+    try:
+        with open(os.path.join(root, resource)) as f:
+            for line in f:
+                kind, _, rest = line.partition(" ")
+                for field in rest.split():
+                    key, _, value = field.partition("=")
+                    if key == "avg10" and kind in result:
+                        result[kind] = float(value)
+    except (OSError, ValueError):
+        pass
+    return result
+
+
+def read_major_faults(path="/proc/vmstat"):
+    """Read the cumulative major page fault count on Linux."""
+    try:
+        with open(path) as f:
+            for line in f:
+                if line.startswith("pgmajfault "):
+                    return int(line.split()[1])
+    except (OSError, ValueError):
+        pass
+    return None
+
+
+def get_commit_charge():
+    """Get (commit total, commit limit) in bytes on Windows."""
+    if platform.system() != "Windows":
+        return None, None
+    try:
+        info = PerformanceInformation()
+        info.cb = ctypes.sizeof(info)
+        if not ctypes.windll.psapi.GetPerformanceInfo(
+            ctypes.byref(info), info.cb
+        ):
+            return None, None
+        return (
+            info.CommitTotal * info.PageSize,
+            info.CommitLimit * info.PageSize,
+        )
+    except Exception:
+        return None, None
+
+
+class MemoryPressureCollector:
+    """Track swap traffic, major faults and stall pressure over time."""
+
+    def __init__(self, psi_root="/proc/pressure", vmstat="/proc/vmstat"):
+        self.psi_root = psi_root
+        self.vmstat = vmstat
+        self.previous = None  # (timestamp, swap in, swap out, faults)
+        self.history = deque(maxlen=HISTORY_LENGTH)
+
+    def sample(self, now=None) -> dict:
+        """Sample memory pressure; rates need two samples to appear."""
+        if now is None:
+            now = sample_time()
+
+        swap = psutil.swap_memory()
+        faults = read_major_faults(self.vmstat)
+        pressure = dict.fromkeys(MEMORY_PRESSURE_FIELDS)
+        pressure["swap_percent"] = swap.percent
+        pressure["swap_used"] = swap.used
+        pressure["swap_total"] = swap.total
+
+        # Rates from the deltas between this sample and the previous one
+        if self.previous is not None:
+            elapsed = now - self.previous[0]
+            if elapsed > 0:
+                pressure["swap_in_rate"] = (
+                    max(swap.sin - self.previous[1], 0) / elapsed
+                )
+                pressure["swap_out_rate"] = (
+                    max(swap.sout - self.previous[2], 0) / elapsed
+                )
+                if faults is not None and self.previous[3] is not None:
+                    pressure["major_fault_rate"] = (
+                        max(faults - self.previous[3], 0) / elapsed
+                    )
+        self.previous = (now, swap.sin, swap.sout, faults)
+
+        for resource in ("cpu", "memory", "io"):
+            psi = read_psi(resource, self.psi_root)
+            pressure[f"psi_{resource}_some"] = psi["some"]
+            if resource != "cpu":
+                pressure[f"psi_{resource}_full"] = psi["full"]
+
+        commit_total, commit_limit = get_commit_charge()
+        pressure["commit_total"] = commit_total
+        pressure["commit_limit"] = commit_limit
+
+        self.history.append((now, pressure))
+        return pressure
+
+
+memory_pressure_collector = MemoryPressureCollector()
+
+
+def collect_memory_pressure() -> dict:
+    """Sample memory pressure with the shared collector."""
+    return memory_pressure_collector.sample()
+
+
+def format_rate(value) -> str:
+    """Format a bytes-per-second rate."""
+    return f"{format_bytes(value)}/s"
+
+
+def make_memory_pressure(pressure=None) -> Panel:
+    """Create a panel with swap, page fault and stall pressure."""
+    if pressure is None:
+        pressure = collect_memory_pressure()
+
+    table = Table.grid(padding=(0, 2), expand=True)
+    table.add_column(justify="right", width=12)
+    table.add_column(justify="left")
+
+    swap_percent = pressure["swap_percent"]
+    if pressure["swap_total"]:
+        swap_color = "red" if swap_percent > 80 else "cyan"
+        used_gb = pressure["swap_used"] / (1024**3)
+        total_gb = pressure["swap_total"] / (1024**3)
+        table.add_row(
+            "Swap:",
+            Text(
+                f"{swap_percent:5.1f}%  "
+                f"({used_gb:.2f} GB / {total_gb:.2f} GB)",
+                style=f"bold {swap_color}",
+            ),
+        )
+    else:
+        table.add_row("Swap:", Text("None", style="dim"))
+
+    swap_in = pressure["swap_in_rate"]
+    swap_out = pressure["swap_out_rate"]
+    if swap_in is None or swap_out is None:
+        table.add_row("Swap In/Out:", Text("N/A", style="dim"))
+    else:
+        # Sustained swap-out is what makes a machine thrash
+        swap_color = (
+            "red" if swap_out > 1024**2
+            else "yellow" if swap_out > 0 else "green"
+        )
+        table.add_row(
+            "Swap In/Out:",
+            Text(
+                f"{format_rate(swap_in)} / {format_rate(swap_out)}",
+                style=f"bold {swap_color}",
+            ),
+        )
+
+    fault_rate = pressure["major_fault_rate"]
+    if fault_rate is not None:
+        fault_color = (
+            "red" if fault_rate > 1000
+            else "yellow" if fault_rate > 100 else "green"
+        )
+        table.add_row(
+            "Major Faults:",
+            Text(f"{fault_rate:,.0f}/s", style=f"bold {fault_color}"),
+        )
+
+    for resource, label in (("cpu", "CPU"), ("memory", "Memory"),
+                            ("io", "IO")):
+        some = pressure[f"psi_{resource}_some"]
+        if some is None:
+            continue
+        full = pressure.get(f"psi_{resource}_full")
+        worst = max(some, full or 0)
+        psi_color = (
+            "red" if worst > 25 else "yellow" if worst > 10 else "green"
+        )
+        psi_text = f"some {some:.1f}%"
+        if full is not None:
+            psi_text += f"  full {full:.1f}%"
+        table.add_row(
+            f"PSI {label}:", Text(psi_text, style=f"bold {psi_color}")
+        )
+
+    if pressure["commit_total"] is not None and pressure["commit_limit"]:
+        commit_ratio = pressure["commit_total"] / pressure["commit_limit"]
+        commit_color = "red" if commit_ratio > 0.9 else "cyan"
+        table.add_row(
+            "Commit:",
+            Text(
+                f"{pressure['commit_total'] / 1024**3:.2f} GB / "
+                f"{pressure['commit_limit'] / 1024**3:.2f} GB",
+                style=f"bold {commit_color}",
+            ),
+        )
+
+    return Panel(table, title="Memory Pressure", border_style="bright_blue")
+
+
+def collect_processes() -> list:
+    """Sample CPU, memory and IO usage for every running process."""
+    return stats_backend.processes()
+
+
+def get_process_container(pid, root="/proc"):
+    """Get the short Docker container ID a process runs in, if any."""
+    try:
+        with open(os.path.join(root, str(pid), "cgroup")) as f:
+            for line in f:
+                match = DOCKER_CGROUP_PATTERN.search(line)
+                if match:
+                    return match.group(1)[:12]
+    except OSError:
+        pass
+    return None
+
+
+class ProcessGroups:
+    """Sum process CPU, memory and IO per group, updated incrementally.
+
+    Each sample only adjusts the groups of processes that started,
+    exited or changed, instead of re-summing every group.
+    """
+
+    def __init__(self, key="name", proc_root="/proc"):
+        self.key = key
+        self.proc_root = proc_root
+        self.members = {}  # pid -> (group, cpu, mem, io rate, io total)
+        self.groups = {}  # group -> [count, cpu, mem, io rate]
+        self.containers = {}  # pid -> container ID, looked up once
+        self.last_sample = None
+        self.last_time = None
+
+    def set_key(self, key):
+        """Switch what processes are grouped by, starting afresh."""
+        if key != self.key:
+            self.key = key
+            self.members.clear()
+            self.groups.clear()
+            self.last_sample = None
+
+    def group_of(self, proc, names):
+        """Return the group a process belongs to under the current key."""
+        if self.key == "user":
+            return proc.get("username") or "N/A"
+        if self.key == "parent":
+            return names.get(proc.get("ppid")) or "N/A"
+        if self.key == "container":
+            pid = proc["pid"]
+            if pid not in self.containers:
+                self.containers[pid] = get_process_container(
+                    pid, self.proc_root
+                )
+            return self.containers[pid] or "host"
+        return proc["name"] or "N/A"
+
+    def _apply(self, group, sign, cpu, mem, io_rate):
+        totals = self.groups.get(group)
+        if totals is None:
+            totals = self.groups[group] = [0, 0.0, 0.0, 0.0]
+        totals[0] += sign
+        totals[1] += sign * cpu
+        totals[2] += sign * mem
+        totals[3] += sign * io_rate
+        if totals[0] <= 0:
+            del self.groups[group]
+
+    def update(self, processes, now=None):
+        """Fold one process sample into the group totals."""
+        if processes is self.last_sample:
+            return
+        self.last_sample = processes
+        if now is None:
+            now = time.monotonic()
+        elapsed = now - self.last_time if self.last_time is not None else 0
+        self.last_time = now
+
+        names = (
+            {proc["pid"]: proc["name"] for proc in processes}
+            if self.key == "parent" else {}
+        )
+        seen = set()
+        for proc in processes:
+            pid = proc["pid"]
+            seen.add(pid)
+            cpu = proc["cpu_percent"] or 0.0
+            mem = proc["memory_percent"] or 0.0
+            io_total = proc.get("io_bytes")
+            old = self.members.get(pid)
+
+            io_rate = 0.0
+            if (old is not None and io_total is not None
+                    and old[4] is not None and elapsed > 0):
+                io_rate = max(io_total - old[4], 0) / elapsed
+
+            group = self.group_of(proc, names)
+            new = (group, cpu, mem, io_rate, io_total)
+            if old == new:
+                continue
+            if old is not None:
+                self._apply(old[0], -1, *old[1:4])
+            self._apply(group, 1, cpu, mem, io_rate)
+            self.members[pid] = new
+
+        for pid in set(self.members) - seen:
+            old = self.members.pop(pid)
+            self._apply(old[0], -1, *old[1:4])
+            self.containers.pop(pid, None)
+
+    def top(self, by_memory=False, n=5):
+        """Return the n largest groups as (group, count, cpu, mem, io)."""
+        index = 2 if by_memory else 1
+        ranked = sorted(
+            self.groups.items(), key=lambda item: item[1][index],
+            reverse=True,
+        )
+        return [(group, *totals) for group, totals in ranked[:n]]
+
+
+process_groups = ProcessGroups()
+
+
+def make_process_groups(processes, limit=5) -> Panel:
+    """Create a panel showing the top process groups."""
+    sort_label = "Memory" if sort_by_memory else "CPU"
+    process_groups.set_key(group_by)
+    process_groups.update(processes)
+
+    table = Table(expand=True, box=None, padding=(0, 1))
+    table.add_column(
+        GROUP_LABELS[group_by], justify="left", style="white", no_wrap=True
+    )
+    table.add_column("Procs", justify="right", style="cyan", width=5)
+    table.add_column("CPU %", justify="right", width=7)
+    table.add_column("Mem %", justify="right", width=7)
+    table.add_column("IO/s", justify="right", width=11)
+
+    for group, count, cpu, mem, io_rate in process_groups.top(
+        sort_by_memory, limit
+    ):
+        cpu_color = "red" if cpu > 50 else "yellow" if cpu > 20 else "green"
+        mem_color = "red" if mem > 50 else "yellow" if mem > 20 else "cyan"
+        table.add_row(
+            str(group)[:20],
+            str(count),
+            Text(f"{cpu:.1f}%", style=f"bold {cpu_color}"),
+            Text(f"{mem:.1f}%", style=f"bold {mem_color}"),
+            Text(format_bytes(io_rate), style="dim"),
+        )
+
+    title = (
+        f"Top Processes (by {GROUP_LABELS[group_by]}, {sort_label})"
+    )
+    return Panel(table, title=title, border_style="bright_blue")
+
+
+def make_top_processes(processes=None, limit=5) -> Panel:
+    """Create a panel showing top processes by CPU or memory usage."""
+    if processes is None:
+        processes = collect_processes()
+    if group_by != "process":
+        return make_process_groups(processes, limit)
+
+    sort_key = "memory_percent" if sort_by_memory else "cpu_percent"
+    sort_label = "Memory" if sort_by_memory else "CPU"
+
+    table = Table(expand=True, box=None, padding=(0, 1))
+    table.add_column("PID", justify="right", style="cyan", width=7)
+    table.add_column("Name", justify="left", style="white", no_wrap=True)
+    table.add_column("CPU %", justify="right", width=7)
+    table.add_column("Mem %", justify="right", width=7)
+
+    # Sort by selected metric descending and get the top ones
+    sorted_procs = sorted(
+        processes, key=lambda x: x[sort_key] or 0, reverse=True
+    )
+    top_processes = sorted_procs[:limit]
+
+    for proc in top_processes:
+        cpu = proc["cpu_percent"] or 0
+        mem = proc["memory_percent"] or 0
+        cpu_color = "red" if cpu > 50 else "yellow" if cpu > 20 else "green"
+        mem_color = "red" if mem > 50 else "yellow" if mem > 20 else "cyan"
+
+        table.add_row(
+            str(proc["pid"]),
+            proc["name"][:20] if proc["name"] else "N/A",
+            Text(f"{cpu:.1f}%", style=f"bold {cpu_color}"),
+            Text(f"{mem:.1f}%", style=f"bold {mem_color}"),
+        )
+
+    title = f"Top Processes (by {sort_label})"
+    return Panel(table, title=title, border_style="bright_blue")
+
+
+class CgroupCollector:
+    """Read container stats straight from cgroup v2 files on Linux.
+
+    Figures match `docker stats`: memory excludes inactive page cache,
+    and network IO is read from the namespace of a process in the
+    container.
+    """
+
+    def __init__(self, root="/sys/fs/cgroup", proc_root="/proc"):
+        self.root = root
+        self.proc_root = proc_root
+        self.paths = {}  # container id -> cgroup directory
+        self.fds = {}  # (cgroup directory, file name) -> open fd
+        self.previous = {}  # container id -> (timestamp, usage_usec)
+        self.history = {}  # container id -> deque of samples
+
+    def available(self) -> bool:
+        """Check whether a unified (v2) cgroup hierarchy is mounted."""
+        return os.path.exists(os.path.join(self.root, "cgroup.controllers"))
+
+    def resolve(self, container_id):
+        """Map a (possibly short) container ID to its cgroup directory."""
+        if container_id in self.paths:
+            return self.paths[container_id]
+
+        # systemd cgroup driver, then cgroupfs driver
+        candidates = [
+            (os.path.join(self.root, "system.slice"), "docker-", ".scope"),
+            (os.path.join(self.root, "docker"), "", ""),
+        ]
+        for parent, prefix, suffix in candidates:
+            try:
+                entries = os.listdir(parent)
+            except OSError:
+                continue
+            for entry in entries:
+                if not (entry.startswith(prefix) and entry.endswith(suffix)):
+                    continue
+                full_id = entry[len(prefix):len(entry) - len(suffix)]
+                if full_id.startswith(container_id):
+                    path = os.path.join(parent, entry)
+                    self.paths[container_id] = path
+                    return path
+        return None
+
+    def _read(self, path, name):
+        """Read a cgroup file through a cached file descriptor."""
+        key = (path, name)
+        fd = self.fds.get(key)
+        if fd is None:
+            fd = os.open(os.path.join(path, name), os.O_RDONLY)
+            self.fds[key] = fd
+        chunks = []
+        offset = 0
+        while True:
+            chunk = os.pread(fd, 1 << 16, offset)
+            if not chunk:
+                break
+            chunks.append(chunk)
+            offset += len(chunk)
+        return b"".join(chunks).decode("ascii", errors="ignore")
+
+    def read_net(self, path):
+        """Sum (rx, tx) bytes over a container's non-loopback interfaces.
+
+        Returns (None, None) when the cgroup has no process to read the
+        network namespace through.
+        """
+        try:
+            pid = self._read(path, "cgroup.procs").split()[0]
+            with open(os.path.join(self.proc_root, pid, "net", "dev")) as f:
+                lines = f.readlines()[2:]
+        except (OSError, IndexError):
+            return None, None
+        rx = tx = 0
+        for line in lines:
+            interface, _, counters = line.partition(":")
+            fields = counters.split()
+            if interface.strip() == "lo" or len(fields) < 9:
+                continue
+            rx += int(fields[0])
+            tx += int(fields[8])
+        return rx, tx
+
+    def read_stats(self, path):
+        """Read raw CPU, memory and IO counters from a cgroup directory."""
+        usage_usec = 0
+        for line in self._read(path, "cpu.stat").splitlines():
+            key, _, value = line.partition(" ")
+            if key == "usage_usec":
+                usage_usec = int(value)
+                break
+
+        memory = int(self._read(path, "memory.current").strip() or 0)
+        try:
+            memory_stat = self._read(path, "memory.stat")
+        except OSError:
+            memory_stat = ""
+        for line in memory_stat.splitlines():
+            key, _, value = line.partition(" ")
+            if key == "inactive_file":
+                # `docker stats` leaves out reclaimable page cache
+                memory = max(memory - int(value), 0)
+                break
+
+        try:
+            limit_text = self._read(path, "memory.max").strip()
+        except OSError:
+            limit_text = "max"
+        limit = int(limit_text) if limit_text.isdigit() else None
+
+        read_bytes = write_bytes = 0
+        try:
+            io_text = self._read(path, "io.stat")
+        except OSError:
+            io_text = ""
+        for line in io_text.splitlines():
+            for field in line.split()[1:]:
+                key, _, value = field.partition("=")
+                if key == "rbytes":
+                    read_bytes += int(value)
+                elif key == "wbytes":
+                    write_bytes += int(value)
+
+        net_rx, net_tx = self.read_net(path)
+
+        return {
+            "usage_usec": usage_usec,
+            "memory": memory,
+            "memory_limit": limit,
+            "net_rx": net_rx,
+            "net_tx": net_tx,
+            "read_bytes": read_bytes,
+            "write_bytes": write_bytes,
+        }
+
+    def forget(self, container_id):
+        """Drop cached state and close descriptors for a container."""
+        path = self.paths.pop(container_id, None)
+        self.previous.pop(container_id, None)
+        self.history.pop(container_id, None)
+        for key in [k for k in self.fds if k[0] == path]:
+            os.close(self.fds.pop(key))
+
+    def sample(self, container_ids, now=None):
+        """Sample the given containers and return stats keyed by ID."""
+        if now is None:
+            now = sample_time()
+
+        for stale in set(self.previous) - set(container_ids):
+            self.forget(stale)
+
+        results = {}
+        for container_id in container_ids:
+            path = self.resolve(container_id)
+            if path is None:
+                continue
+            try:
+                stats = self.read_stats(path)
+            except (OSError, ValueError):
+                # Container went away between listing and reading
+                self.forget(container_id)
+                continue
+
+            # CPU% from the usage delta, like `docker stats` (100% = 1 core)
+            cpu_percent = None
+            previous = self.previous.get(container_id)
+            if previous is not None:
+                elapsed_usec = (now - previous[0]) * 1_000_000
+                if elapsed_usec > 0:
+                    used_usec = stats["usage_usec"] - previous[1]
+                    cpu_percent = max(used_usec, 0) / elapsed_usec * 100
+            self.previous[container_id] = (now, stats["usage_usec"])
+            stats["cpu_percent"] = cpu_percent
+
+            history = self.history.setdefault(
+                container_id, deque(maxlen=HISTORY_LENGTH)
+            )
+            history.append((now, cpu_percent, stats["memory"]))
+            results[container_id] = stats
+
+        return results
+
+    def close(self):
+        """Close all cached file descriptors."""
+        for fd in self.fds.values():
+            os.close(fd)
+        self.fds.clear()
+
+
+cgroup_collector = CgroupCollector()
+
+
+# Multipliers for the size suffixes printed by `docker stats`
+SIZE_UNITS = {
+    "B": 1,
+    "kB": 1000,
+    "KB": 1000,
+    "MB": 1000**2,
+    "GB": 1000**3,
+    "TB": 1000**4,
+    "KiB": 1024,
+    "MiB": 1024**2,
+    "GiB": 1024**3,
+    "TiB": 1024**4,
+}
+
+
+def parse_size(text) -> Optional[int]:
+    """Parse a Docker size string such as '200MiB' or '1.5kB' to bytes."""
+    text = text.strip()
+    number = text.rstrip("BKMGTikb")
+    unit = text[len(number):]
+    if unit not in SIZE_UNITS:
+        return None
+    try:
+        return int(float(number) * SIZE_UNITS[unit])
+    except ValueError:
+        return None
+
+
+def parse_size_pair(text):
+    """Parse a Docker 'used / total' pair into two byte counts."""
+    first, _, second = text.partition("/")
+    return parse_size(first), parse_size(second) if second else None
+
+
+def parse_percent(text) -> Optional[float]:
+    """Parse a Docker percentage string such as '12.5%'."""
+    try:
+        return float(text.strip().rstrip("%"))
+    except ValueError:
+        return None
+
+
+@dataclass
+class ContainerStats:
+    """One sample of a running container's resource usage."""
+
+    __slots__ = (
+        "name", "image", "status", "cpu_percent", "mem_usage", "mem_limit",
+        "net_rx", "net_tx", "block_read", "block_write",
+    )
+
+    name: str
+    image: str
+    status: str
+    cpu_percent: Optional[float]
+    mem_usage: Optional[int]
+    mem_limit: Optional[int]
+    net_rx: Optional[int]
+    net_tx: Optional[int]
+    block_read: Optional[int]
+    block_write: Optional[int]
+
+
+# Numeric ContainerStats fields that can be sorted and summed
+CONTAINER_NUMERIC_FIELDS = (
+    "cpu_percent", "mem_usage", "mem_limit",
+    "net_rx", "net_tx", "block_read", "block_write",
+)
+
+
+def parse_docker_stats_line(line, image="", status=""):
+    """Parse one line of `docker stats` output into ContainerStats."""
+    parts = line.split("\t")
+    if len(parts) < 3:
+        return None
+    mem_usage, mem_limit = parse_size_pair(parts[2])
+    net_rx = net_tx = block_read = block_write = None
+    if len(parts) > 3:
+        net_rx, net_tx = parse_size_pair(parts[3])
+    if len(parts) > 4:
+        block_read, block_write = parse_size_pair(parts[4])
+    return ContainerStats(
+        name=parts[0],
+        image=image,
+        status=status,
+        cpu_percent=parse_percent(parts[1]),
+        mem_usage=mem_usage,
+        mem_limit=mem_limit,
+        net_rx=net_rx,
+        net_tx=net_tx,
+        block_read=block_read,
+        block_write=block_write,
+    )
+
+
+def top_containers(containers, field="cpu_percent", n=None):
+    """Sort containers by a field descending, unknown values last."""
+    ranked = sorted(
+        containers,
+        key=lambda c: (getattr(c, field) is not None, getattr(c, field) or 0),
+        reverse=True,
+    )
+    return ranked if n is None else ranked[:n]
+
+
+def container_totals(containers) -> dict:
+    """Sum every numeric field across containers, skipping unknowns."""
+    totals = dict.fromkeys(CONTAINER_NUMERIC_FIELDS, 0)
+    for container in containers:
+        for field in CONTAINER_NUMERIC_FIELDS:
+            value = getattr(container, field)
+            if value is not None:
+                totals[field] += value
+    return totals
+
+
+def collect_docker_stats():
+    """Sample running containers once.
+
+    Returns None when Docker is not available, otherwise a list of
+    ContainerStats. Docker CLI errors propagate to the caller.
+    """
+    # Get running containers
+    self_monitor.spawned()
+    result = subprocess.run(
+        ["docker", "ps", "--format",
+         "{{.Names}}\t{{.Image}}\t{{.Status}}\t{{.ID}}"],
+        capture_output=True,
+        text=True,
+        timeout=5,
+        creationflags=CREATE_NO_WINDOW,
+    )
+    if result.returncode != 0:
+        return None
+
+    listed = {}
+    ids = {}
+    for line in result.stdout.strip().split("\n"):
+        parts = line.split("\t")
+        if len(parts) >= 3:
+            listed[parts[0]] = (parts[1], parts[2])
+            if len(parts) >= 4:
+                ids[parts[3]] = parts[0]
+    if not listed:
+        return []
+
+    stats = {}
+
+    # Prefer reading cgroup files directly over spawning `docker stats`
+    if cgroup_collector.available():
+        sampled = cgroup_collector.sample(list(ids))
+        for container_id, raw in sampled.items():
+            name = ids[container_id]
+            image, status = listed[name]
+            stats[name] = ContainerStats(
+                name=name,
+                image=image,
+                status=status,
+                cpu_percent=raw["cpu_percent"],
+                mem_usage=raw["memory"],
+                mem_limit=raw["memory_limit"],
+                net_rx=raw["net_rx"],
+                net_tx=raw["net_tx"],
+                block_read=raw["read_bytes"],
+                block_write=raw["write_bytes"],
+            )
+
+    # Get stats for running containers
+    if len(stats) < len(listed):
+        self_monitor.spawned()
+        stats_result = subprocess.run(
+            [
+                "docker",
+                "stats",
+                "--no-stream",
+                "--format",
+                "{{.Name}}\t{{.CPUPerc}}\t{{.MemUsage}}"
+                "\t{{.NetIO}}\t{{.BlockIO}}",
+            ],
+            capture_output=True,
+            text=True,
+            timeout=10,
+            creationflags=CREATE_NO_WINDOW,
+        )
+        if stats_result.returncode == 0:
+            for line in stats_result.stdout.strip().split("\n"):
+                name = line.split("\t", 1)[0]
+                if name in listed and name not in stats:
+                    parsed = parse_docker_stats_line(line, *listed[name])
+                    if parsed is not None:
+                        stats[name] = parsed
+
+    containers = []
+    for name, (image, status) in listed.items():
+        containers.append(stats.get(name) or ContainerStats(
+            name, image, status, None, None, None, None, None, None, None
+        ))
+    return containers
+
+
+def collect_docker() -> dict:
+    """Sample Docker, turning CLI failures into a status message."""
+    try:
+        containers = collect_docker_stats()
+    except FileNotFoundError:
+        return {"containers": None, "message": "Docker is not installed"}
+    except subprocess.TimeoutExpired:
+        return {"containers": None, "message": "Docker command timed out"}
+    except Exception as e:
+        return {
+            "containers": None,
+            "message": f"Error: {str(e)[:30]}",
+            "style": "red",
+        }
+
+    if containers is None:
+        return {
+            "containers": None,
+            "message": "Docker not available or not running",
+        }
+    if not containers:
+        return {"containers": [], "message": "No running containers"}
+    return {"containers": containers, "message": None}
+
+
+def make_docker_stats(docker=None, totals=None) -> Panel:
+    """Create a panel showing Docker container stats.
+
+    totals, from a frame's derived metrics, saves summing containers.
+    """
+    if docker is None:
+        docker = collect_docker()
+
+    if docker["message"]:
+        return Panel(
+            Text(docker["message"], style=docker.get("style", "dim")),
+            title="Docker Containers",
+            border_style="bright_blue",
+        )
+    containers = docker["containers"]
+
+    table = Table(expand=True, box=None, padding=(0, 1))
+    table.add_column("Container", justify="left", style="cyan", no_wrap=True)
+    table.add_column("Image", justify="left", style="dim", no_wrap=True)
+    table.add_column("Status", justify="left", width=12)
+    table.add_column("CPU %", justify="right", width=8)
+    table.add_column("Mem Usage", justify="right", width=22)
+
+    sort_key = "mem_usage" if sort_by_memory else "cpu_percent"
+    for container in top_containers(containers, sort_key):
+        status = container.status.split()[0] if container.status else "Unknown"
+
+        # Color status
+        status_color = "green" if "Up" in container.status else "red"
+        status_text = Text(status, style=f"bold {status_color}")
+
+        # Color CPU
+        cpu_val = container.cpu_percent
+        if cpu_val is None:
+            cpu_text = Text("N/A", style="dim")
+        else:
+            if cpu_val > 80:
+                cpu_color = "red"
+            elif cpu_val > 50:
+                cpu_color = "yellow"
+            else:
+                cpu_color = "green"
+            cpu_text = Text(f"{cpu_val:.2f}%", style=f"bold {cpu_color}")
+
+        if container.mem_usage is None:
+            mem = "N/A"
+        elif container.mem_limit is None:
+            mem = format_bytes(container.mem_usage)
+        else:
+            mem = (
+                f"{format_bytes(container.mem_usage)} / "
+                f"{format_bytes(container.mem_limit)}"
+            )
+
+        table.add_row(
+            container.name[:15], container.image[:20], status_text,
+            cpu_text, mem,
+        )
+
+    if len(containers) > 1:
+        if totals is None:
+            totals = container_totals(containers)
+        table.add_row(
+            Text("Total", style="bold"), "", "",
+            Text(f"{totals['cpu_percent']:.2f}%", style="bold"),
+            Text(format_bytes(totals["mem_usage"]), style="bold"),
+        )
+
+    return Panel(table, title="Docker Containers", border_style="bright_blue")
+
+
+# Entry point group third-party packages register plugins under
+PLUGIN_ENTRY_POINT_GROUP = "my_dashboard.plugins"
+
+
+class CollectorPlugin:
+    """Base class for third-party collectors.
+
+    Subclasses set a name, how often to sample (interval), how long one
+    sample may take (budget), the fields they return (schema, field name
+    to type) and implement collect().
+    """
+
+    name = "plugin"
+    interval = 5.0
+    budget = 1.0
+    schema = {}
+
+    def collect(self) -> dict:
+        """Return one sample as a dict matching schema."""
+        raise NotImplementedError
+
+
+class PanelPlugin:
+    """Base class for third-party panels.
+
+    fields lists the "<collector>.<field>" values the panel shows, from
+    plugin collectors or the core snapshot sections (for example
+    "cpu_ram.cpu_percent"); render() receives them as a dict.
+    """
+
+    title = "Plugin"
+    fields = ()
+
+    def render(self, values):
+        """Render the panel body; defaults to a two-column table."""
+        table = Table.grid(padding=(0, 2))
+        table.add_column(justify="right", style="dim")
+        table.add_column(justify="left")
+        for field in self.fields:
+            value = values.get(field)
+            table.add_row(
+                f"{field.split('.', 1)[-1]}:",
+                Text("N/A", style="dim") if value is None else str(value),
+            )
+        return table
+
+
+def load_plugins(group=PLUGIN_ENTRY_POINT_GROUP):
+    """Load plugins registered as entry points.
+
+    Returns (plugins, errors). Entry points may name a plugin class or
+    an instance; ones that fail to load are reported, not raised.
+    """
+    # Imported here to keep it off the snapshot command's startup path
+    from importlib.metadata import entry_points
+
+    eps = entry_points()
+    if hasattr(eps, "select"):
+        eps = eps.select(group=group)
+    else:
+        eps = eps.get(group, [])
+
+    plugins = []
+    errors = []
+    for ep in eps:
+        try:
+            plugin = ep.load()
+            if isinstance(plugin, type):
+                plugin = plugin()
+        except Exception as e:
+            errors.append(f"{ep.name}: {str(e)[:50]}")
+            continue
+        if isinstance(plugin, (CollectorPlugin, PanelPlugin)):
+            plugins.append(plugin)
+        else:
+            errors.append(f"{ep.name}: not a collector or panel plugin")
+    return plugins, errors
+
+
+class PluginScheduler:
+    """Run plugin collectors on their own cadence within their budgets.
+
+    Each sample runs on its own daemon thread. A sample that takes longer
+    than the plugin's budget, raises or breaks its schema counts as an
+    overrun; after max_overruns in a row the plugin is disabled. Threads
+    cannot be killed, so a hung sample is abandoned rather than waited
+    for and the plugin is not scheduled again until it returns; every
+    interval it stays hung past its budget counts as another overrun.
+    Plugins that failed to load are listed as disabled from the start.
+    """
+
+    def __init__(self, plugins, max_overruns=3, errors=()):
+        self.collectors = [
+            p for p in plugins if isinstance(p, CollectorPlugin)
+        ]
+        self.panels = [p for p in plugins if isinstance(p, PanelPlugin)]
+        self.max_overruns = max_overruns
+        self.next_run = {p.name: 0.0 for p in self.collectors}
+        self.running = {}  # name -> (future, started, timeouts counted)
+        self.overruns = dict.fromkeys(self.next_run, 0)
+        self.disabled = {}  # name -> reason
+        for error in errors:
+            # load_plugins() reports "<entry point>: <reason>"
+            name, _, reason = error.partition(": ")
+            self.disabled[name] = reason
+        self.results = {}  # name -> last valid sample
+
+    def _overrun(self, plugin, reason):
+        self.overruns[plugin.name] += 1
+        if self.overruns[plugin.name] >= self.max_overruns:
+            self.disabled[plugin.name] = reason
+            self.results.pop(plugin.name, None)
+
+    @staticmethod
+    def _run(plugin):
+        started = time.perf_counter()
+        sample = plugin.collect()
+        return sample, time.perf_counter() - started
+
+    def _start(self, plugin):
+        """Run one sample on its own daemon thread; return its Future.
+
+        A hung sample then can't hold up exit or starve other plugins.
+        """
+        from concurrent.futures import Future
+
+        future = Future()
+
+        def run():
+            future.set_running_or_notify_cancel()
+            try:
+                future.set_result(self._run(plugin))
+            except Exception as e:
+                future.set_exception(e)
+
+        threading.Thread(
+            target=run, name=f"plugin-{plugin.name}", daemon=True
+        ).start()
+        return future
+
+    def _finish(self, plugin, future):
+        try:
+            sample, elapsed = future.result()
+        except Exception as e:
+            self._overrun(plugin, f"error: {str(e)[:40]}")
+            return
+        if not isinstance(sample, dict) or set(sample) != set(plugin.schema):
+            self._overrun(plugin, "output does not match schema")
+            return
+        self.results[plugin.name] = sample
+        if elapsed > plugin.budget:
+            self._overrun(plugin, f"over budget ({elapsed:.2f}s)")
+        else:
+            self.overruns[plugin.name] = 0
+
+    def tick(self, now=None):
+        """Collect finished samples and start the ones that are due."""
+        if now is None:
+            now = time.monotonic()
+        for plugin in self.collectors:
+            if plugin.name in self.disabled:
+                continue
+            running = self.running.get(plugin.name)
+            if running is not None:
+                future, started, counted = running
+                if not future.done():
+                    overdue = now - started - plugin.budget
+                    if overdue > 0:
+                        # One overrun per interval missed while hung
+                        missed = 1 + int(overdue // plugin.interval)
+                        self.running[plugin.name] = (future, started, missed)
+                        for _ in range(missed - counted):
+                            if plugin.name not in self.disabled:
+                                self._overrun(plugin, "timed out")
+                    continue
+                del self.running[plugin.name]
+                if not counted:
+                    self._finish(plugin, future)
+            if plugin.name in self.disabled:
+                continue
+            if now >= self.next_run[plugin.name]:
+                self.next_run[plugin.name] = now + plugin.interval
+                self.running[plugin.name] = (
+                    self._start(plugin), now, 0
+                )
+
+    def values(self) -> dict:
+        """Return the latest samples as "<collector>.<field>" values."""
+        values = {}
+        for name, sample in self.results.items():
+            for field, value in sample.items():
+                values[f"{name}.{field}"] = value
+        return values
+
+    def shutdown(self):
+        """Stop tracking samples; daemon threads die with the process."""
+        self.collectors = []
+        self.running.clear()
+
+
+def snapshot_values(snapshot) -> dict:
+    """Return a snapshot's scalar fields as "<section>.<field>" values."""
+    values = {}
+    for name in COLLECTORS:
+        section = snapshot.get(name)
+        if isinstance(section, dict):
+            for field, value in section.items():
+                if not isinstance(value, (dict, list)):
+                    values[f"{name}.{field}"] = value
+    return values
+
+
+def make_plugin_panel(panel, values) -> Panel:
+    """Render a plugin panel, containing any error it raises."""
+    try:
+        body = panel.render(
+            {field: values.get(field) for field in panel.fields}
+        )
+    except Exception as e:
+        body = Text(f"Error: {str(e)[:30]}", style="red")
+    return Panel(body, title=panel.title, border_style="bright_blue")
+
+
+def make_plugin_status(scheduler) -> Panel:
+    """Create a panel listing plugins that were disabled."""
+    table = Table.grid(padding=(0, 2))
+    table.add_column(justify="right", style="cyan")
+    table.add_column(justify="left", style="red")
+    for name, reason in scheduler.disabled.items():
+        table.add_row(f"{name}:", reason)
+    return Panel(table, title="Disabled Plugins", border_style="red")
+
+
+class RunningStats:
+    """Streaming mean and variance (Welford's algorithm)."""
+
+    __slots__ = ("count", "mean", "m2")
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    def update(self, value):
+        """Add one value."""
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+
+    @property
+    def std(self) -> float:
+        """Sample standard deviation."""
+        return sqrt(self.m2 / (self.count - 1)) if self.count > 1 else 0.0
+
+
+class EwmaBaseline:
+    """Exponentially weighted moving mean and variance."""
+
+    __slots__ = ("alpha", "mean", "variance", "count")
+
+    def __init__(self, alpha=0.1):
+        self.alpha = alpha
+        self.mean = 0.0
+        self.variance = 0.0
+        self.count = 0
+
+    def update(self, value):
+        """Add one value."""
+        self.count += 1
+        if self.count == 1:
+            self.mean = value
+            return
+        diff = value - self.mean
+        increment = self.alpha * diff
+        self.mean += increment
+        self.variance = (1 - self.alpha) * (self.variance + diff * increment)
+
+    @property
+    def std(self) -> float:
+        """Exponentially weighted standard deviation."""
+        return sqrt(self.variance)
+
+
+Anomaly = namedtuple("Anomaly", ["key", "kind", "value", "baseline", "score"])
+
+
+class SeriesState:
+    """Per-series baselines kept by AnomalyDetector."""
+
+    __slots__ = ("level", "diffs", "slope", "season", "seasonal", "last",
+                 "last_tick")
+
+    def __init__(self, alpha, season_length):
+        self.level = EwmaBaseline(alpha)
+        self.diffs = RunningStats()
+        self.slope = EwmaBaseline(alpha)
+        self.season = deque(maxlen=season_length) if season_length else None
+        self.seasonal = RunningStats()
+        self.last = None
+        self.last_tick = 0
+
+
+def anomaly_section(key) -> str:
+    """Return the snapshot section an AnomalyDetector series comes from."""
+    if key.startswith("host:swap"):
+        return "memory_pressure"
+    if key.startswith("host:"):
+        return "cpu_ram"
+    if key.startswith("container:"):
+        return "docker"
+    return "processes"
+
+
+class AnomalyDetector:
+    """Flag metric values that break from their own history.
+
+    Every series keeps an EWMA baseline (spikes), an EWMA of its first
+    differences (trends) and, with a season length, the spread of the
+    change against one season ago (seasonal). Processes whose RSS keeps
+    growing are flagged as leaks. Each update is O(1) per series.
+    """
+
+    def __init__(self, threshold=4.0, warmup=30, alpha=0.1,
+                 season_length=1800, leak_samples=30, leak_growth=0.2,
+                 stale_ticks=100):
+        self.threshold = threshold
+        self.warmup = warmup
+        self.alpha = alpha
+        self.season_length = season_length
+        self.leak_samples = leak_samples
+        self.leak_growth = leak_growth
+        self.stale_ticks = stale_ticks
+        self.series = {}
+        self.leaks = {}  # pid -> [name, start rss, last rss, growth streak]
+        self.tick = 0
+        self.active = []
+
+    def observe(self, key, value, floor=0.0):
+        """Update one series and return any anomalies it shows.
+
+        floor is the smallest absolute deviation worth reporting, so
+        near-constant series do not alert on tiny wobbles.
+        """
+        state = self.series.get(key)
+        if state is None:
+            state = self.series[key] = SeriesState(
+                self.alpha, self.season_length
+            )
+        state.last_tick = self.tick
+        found = []
+
+        level = state.level
+        if level.count >= self.warmup:
+            deviation = value - level.mean
+            std = max(level.std, floor / self.threshold, 1e-9)
+            score = deviation / std
+            if abs(score) > self.threshold and abs(deviation) >= floor:
+                found.append(Anomaly(key, "spike", value, level.mean, score))
+
+        if state.last is not None:
+            diff = value - state.last
+            state.diffs.update(diff)
+            state.slope.update(diff)
+            # Standard error of an EWMA over noise with the diffs' spread
+            error = state.diffs.std * sqrt(self.alpha / (2 - self.alpha))
+            if state.slope.count >= self.warmup and error > 0:
+                score = state.slope.mean / error
+                moved = abs(state.slope.mean) * self.warmup
+                if abs(score) > self.threshold and moved >= floor:
+                    found.append(
+                        Anomaly(key, "trend", value, level.mean, score)
+                    )
+
+        season = state.season
+        if season is not None:
+            if len(season) == season.maxlen:
+                change = value - season[0]
+                seasonal = state.seasonal
+                if seasonal.count >= self.warmup:
+                    deviation = change - seasonal.mean
+                    std = max(seasonal.std, floor / self.threshold, 1e-9)
+                    score = deviation / std
+                    if (abs(score) > self.threshold
+                            and abs(deviation) >= floor):
+                        found.append(Anomaly(
+                            key, "seasonal", value, season[0], score
+                        ))
+                seasonal.update(change)
+            season.append(value)
+
+        level.update(value)
+        state.last = value
+        return found
+
+    def observe_rss(self, pid, name, rss):
+        """Track one process's RSS; return an Anomaly if it is leaking."""
+        leak = self.leaks.get(pid)
+        if leak is None or leak[0] != name:
+            self.leaks[pid] = [name, rss, rss, 0]
+            return None
+        if rss > leak[2]:
+            leak[3] += 1
+        elif rss < leak[2]:
+            # Any shrink restarts the streak from here
+            leak[1] = rss
+            leak[3] = 0
+        leak[2] = rss
+        if leak[3] >= self.leak_samples and leak[1] > 0:
+            growth = (rss - leak[1]) / leak[1]
+            if growth >= self.leak_growth:
+                return Anomaly(f"process:{pid}:{name}", "leak", rss,
+                               leak[1], growth)
+        return None
+
+    def observe_snapshot(self, snapshot) -> list:
+        """Feed every metric in a snapshot; return the active anomalies.
+
+        Anomalies from sections the snapshot leaves out stay active
+        until that section is fed again.
+        """
+        self.tick += 1
+        found = [
+            anomaly for anomaly in self.active
+            if anomaly_section(anomaly.key) not in snapshot
+        ]
+
+        cpu_ram = snapshot.get("cpu_ram")
+        if cpu_ram:
+            found += self.observe("host:cpu", cpu_ram["cpu_percent"], 10.0)
+            found += self.observe("host:ram", cpu_ram["ram_percent"], 5.0)
+
+        pressure = snapshot.get("memory_pressure") or {}
+        if pressure.get("swap_out_rate") is not None:
+            found += self.observe(
+                "host:swap_out", pressure["swap_out_rate"], 1024**2
+            )
+
+        docker = snapshot.get("docker") or {}
+        for container in docker.get("containers") or []:
+            key = f"container:{container.name}"
+            if container.cpu_percent is not None:
+                found += self.observe(
+                    f"{key}:cpu", container.cpu_percent, 10.0
+                )
+            if container.mem_usage is not None:
+                found += self.observe(
+                    f"{key}:mem", container.mem_usage, 50 * 1024**2
+                )
+
+        processes = snapshot.get("processes")
+        if processes is not None and cpu_ram:
+            seen = set()
+            for proc in processes:
+                seen.add(proc["pid"])
+                # psutil's memory_percent is RSS over total RAM
+                rss = (proc["memory_percent"] or 0) / 100 * cpu_ram[
+                    "ram_total"
+                ]
+                leak = self.observe_rss(proc["pid"], proc["name"], rss)
+                if leak is not None:
+                    found.append(leak)
+            for pid in set(self.leaks) - seen:
+                del self.leaks[pid]
+
+        # Drop series (e.g. removed containers) that stopped reporting
+        if self.tick % self.stale_ticks == 0:
+            for key in [k for k, state in self.series.items()
+                        if self.tick - state.last_tick > self.stale_ticks]:
+                del self.series[key]
+
+        self.active = found
+        return found
+
+
+anomaly_detector = AnomalyDetector()
+
+
+def describe_anomaly(anomaly) -> str:
+    """Describe an anomaly in one short line."""
+    kind = anomaly.kind
+    if kind == "full":
+        return (
+            f"{anomaly.key.split(':', 1)[1]} full in "
+            f"{format_duration(anomaly.value)}"
+        )
+    if kind == "leak":
+        return (
+            f"{anomaly.key.split(':', 2)[-1]} (PID "
+            f"{anomaly.key.split(':')[1]}) RSS up {anomaly.score:.0%} "
+            f"to {format_bytes(anomaly.value)}"
+        )
+    direction = "above" if anomaly.score > 0 else "below"
+    if kind == "trend":
+        direction = "rising" if anomaly.score > 0 else "falling"
+        return f"{anomaly.key} {direction} steadily"
+    return (
+        f"{anomaly.key} {direction} {kind} baseline "
+        f"({anomaly.score:+.1f}σ)"
+    )
+
+
+def make_alerts(anomalies=None) -> Panel:
+    """Create a panel listing current anomalies."""
+    if anomalies is None:
+        anomalies = anomaly_detector.active + disk_forecaster.alerts()
+
+    if not anomalies:
+        return Panel(
+            Text("No anomalies", style="dim"),
+            title="Alerts",
+            border_style="bright_blue",
+        )
+
+    table = Table.grid(padding=(0, 1))
+    table.add_column(justify="left", style="bold yellow", width=8)
+    table.add_column(justify="left", no_wrap=True)
+    ranked = sorted(anomalies, key=lambda a: abs(a.score), reverse=True)
+    for anomaly in ranked[:5]:
+        color = "red" if anomaly.kind in ("leak", "full") else "yellow"
+        table.add_row(
+            Text(anomaly.kind, style=f"bold {color}"),
+            describe_anomaly(anomaly),
+        )
+    return Panel(table, title=f"Alerts ({len(anomalies)})", border_style="red")
+
+
+# Log severities from least to most severe
+LOG_SEVERITIES = ("debug", "info", "warning", "error")
+LOG_MAX_LINE = 64 * 1024  # longer log lines are split
+LOG_SEVERITY_WORDS = {
+    "trace": "debug",
+    "debug": "debug",
+    "info": "info",
+    "warn": "warning",
+    "warning": "warning",
+    "err": "error",
+    "error": "error",
+    "crit": "error",
+    "critical": "error",
+    "fatal": "error",
+}
+LOG_SEVERITY_PATTERN = re.compile(
+    r"\b(" + "|".join(LOG_SEVERITY_WORDS) + r")\b", re.IGNORECASE
+)
+LOG_TOKEN_PATTERN = re.compile(r"[a-z0-9_.-]{3,}")
+
+
+def detect_severity(text) -> str:
+    """Guess a log line's severity from the first level word in it."""
+    match = LOG_SEVERITY_PATTERN.search(text, 0, 200)
+    if match:
+        return LOG_SEVERITY_WORDS[match.group(1).lower()]
+    return "info"
+
+
+def journal_severity(priority) -> str:
+    """Map a syslog/journald PRIORITY (0-7) to a severity."""
+    try:
+        level = int(priority)
+    except (TypeError, ValueError):
+        return "info"
+    if level <= 3:
+        return "error"
+    if level == 4:
+        return "warning"
+    return "info" if level <= 6 else "debug"
+
+
+def split_log_lines(buf):
+    """Split complete lines off buf as (lines, rest).
+
+    Lines longer than LOG_MAX_LINE are cut into pieces, and so is the
+    unterminated rest, so a writer that never sends a newline can't
+    grow the buffer without limit.
+    """
+    *lines, rest = buf.split(b"\n")
+    pieces = [
+        line[start:start + LOG_MAX_LINE]
+        for line in lines
+        for start in range(0, len(line), LOG_MAX_LINE)
+    ]
+    while len(rest) > LOG_MAX_LINE:
+        pieces.append(rest[:LOG_MAX_LINE])
+        rest = rest[LOG_MAX_LINE:]
+    return pieces, rest
+
+
+def parse_journal_export(buf):
+    """Parse complete records from journald export format bytes.
+
+    Returns (records, rest) where rest holds a trailing partial record
+    to be parsed again once more data arrives.
+    """
+    records = []
+    fields = {}
+    pos = record_start = 0
+    while True:
+        newline = buf.find(b"\n", pos)
+        if newline < 0:
+            break
+        line = buf[pos:newline]
+        if not line:
+            if fields:
+                records.append(fields)
+            fields = {}
+            pos = record_start = newline + 1
+            continue
+        name, sep, value = line.partition(b"=")
+        if sep:
+            fields[name.decode("ascii", "replace")] = value
+            pos = newline + 1
+            continue
+        # Binary field: name, newline, 64-bit little-endian size, data
+        if newline + 9 > len(buf):
+            break
+        size = struct.unpack_from("<Q", buf, newline + 1)[0]
+        end = newline + 9 + size
+        if end + 1 > len(buf):
+            break
+        fields[name.decode("ascii", "replace")] = buf[newline + 9:end]
+        pos = end + 1
+    return records, buf[record_start:]
+
+
+class LogIndex:
+    """Bounded log buffer with inverted indexes on severity and keywords.
+
+    Entries get increasing sequence numbers; each index maps a severity
+    or keyword to a deque of sequence numbers. Because entries are
+    evicted oldest first, evicting one only pops from the left of the
+    deques it appears in.
+    """
+
+    def __init__(self, capacity=10000, max_tokens=32):
+        self.capacity = capacity
+        self.max_tokens = max_tokens
+        self.entries = deque()  # (seq, time, source, severity, text, tokens)
+        self.next_seq = 0
+        self.by_severity = {severity: deque() for severity in LOG_SEVERITIES}
+        self.by_token = {}
+        self.counts = deque(maxlen=HISTORY_LENGTH)  # (second, lines)
+
+    def add(self, source, severity, text, now=None):
+        """Add one line, evicting the oldest when full."""
+        if now is None:
+            now = time.time()
+        if len(self.entries) >= self.capacity:
+            self._evict()
+        seq = self.next_seq
+        self.next_seq += 1
+        tokens = tuple(
+            dict.fromkeys(LOG_TOKEN_PATTERN.findall(text.lower()))
+        )[:self.max_tokens]
+        self.entries.append((seq, now, source, severity, text, tokens))
+        self.by_severity[severity].append(seq)
+        for token in tokens:
+            postings = self.by_token.get(token)
+            if postings is None:
+                postings = self.by_token[token] = deque()
+            postings.append(seq)
+
+        second = int(now)
+        if self.counts and self.counts[-1][0] == second:
+            self.counts[-1][1] += 1
+        else:
+            self.counts.append([second, 1])
+
+    def _evict(self):
+        seq, _, _, severity, _, tokens = self.entries.popleft()
+        self.by_severity[severity].popleft()
+        for token in tokens:
+            postings = self.by_token[token]
+            postings.popleft()
+            if not postings:
+                del self.by_token[token]
+
+    def get(self, seq):
+        """Return the entry with a sequence number, if still buffered."""
+        if not self.entries:
+            return None
+        index = seq - self.entries[0][0]
+        return self.entries[index] if 0 <= index < len(self.entries) else None
+
+    def query(self, min_severity="debug", keyword=None, limit=20):
+        """Return up to limit newest entries matching the filters."""
+        levels = LOG_SEVERITIES[LOG_SEVERITIES.index(min_severity):]
+        if keyword:
+            postings = self.by_token.get(keyword.lower(), ())
+            allowed = set(levels)
+            found = []
+            for seq in reversed(postings):
+                entry = self.get(seq)
+                if entry[3] in allowed:
+                    found.append(entry)
+                    if len(found) >= limit:
+                        break
+            return found[::-1]
+        if len(levels) == len(LOG_SEVERITIES):
+            return list(self.entries)[-limit:]
+        # Newest sequence numbers across the wanted severities
+        newest = heapq.nlargest(
+            limit,
+            heapq.merge(*(
+                list(self.by_severity[level])[-limit:] for level in levels
+            )),
+        )
+        return [self.get(seq) for seq in sorted(newest)]
+
+    def rate(self, seconds=10, now=None) -> float:
+        """Average lines per second over the last few seconds."""
+        if now is None:
+            now = time.time()
+        start = int(now) - seconds
+        total = sum(count for second, count in self.counts
+                    if second > start)
+        return total / seconds
+
+
+class LogTailer:
+    """Tail log sources on a background asyncio loop into a LogIndex.
+
+    Sources push lines into a bounded queue, so a flood of lines makes
+    readers wait (backpressure) rather than growing memory. The consumer
+    indexes lines in batches under a lock the renderer takes only
+    briefly to query.
+    """
+
+    def __init__(self, capacity=10000, queue_size=5000, batch_size=1000,
+                 poll_interval=0.2):
+        self.index = LogIndex(capacity)
+        self.lock = threading.Lock()
+        self.queue_size = queue_size
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.sources = []
+        self.errors = {}
+        self.loop = None
+        self.thread = None
+
+    def add_file(self, path):
+        """Tail a plain-text log file."""
+        self.sources.append(("file", path))
+
+    def add_docker(self, container):
+        """Follow a container's `docker logs -f` output."""
+        self.sources.append(("docker", container))
+
+    def add_journal_export(self, path):
+        """Tail a file written in journald export format."""
+        self.sources.append(("journal", path))
+
+    def start(self):
+        """Start the background loop and every source."""
+        # asyncio is imported where used to keep it off the startup path
+        import asyncio
+
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(
+            target=self.loop.run_until_complete,
+            args=(self._run(),),
+            name="log-tailer",
+            daemon=True,
+        )
+        self.thread.start()
+
+    def stop(self):
+        """Stop the background loop."""
+        if self.loop is None:
+            return
+        if self.loop.is_running():
+            self.loop.call_soon_threadsafe(self._cancel)
+            self.thread.join(2)
+        if not self.thread.is_alive() and not self.loop.is_closed():
+            self.loop.close()
+
+    def _cancel(self):
+        import asyncio
+
+        for task in asyncio.all_tasks(self.loop):
+            task.cancel()
+
+    async def _run(self):
+        import asyncio
+
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        readers = {
+            "file": self._tail_file,
+            "docker": self._tail_docker,
+            "journal": self._tail_journal,
+        }
+        tasks = [
+            asyncio.ensure_future(
+                self._source(readers[kind], target, queue)
+            )
+            for kind, target in self.sources
+        ]
+        tasks.append(asyncio.ensure_future(self._consume(queue)))
+        try:
+            await asyncio.gather(*tasks)
+        except asyncio.CancelledError:
+            pass
+
+    async def _source(self, reader, target, queue):
+        """Run one source; a crash is reported without stopping others."""
+        try:
+            await reader(target, queue)
+        except Exception as e:
+            self.errors[target] = f"stopped: {str(e)[:40]}"
+
+    async def _consume(self, queue):
+        while True:
+            batch = [await queue.get()]
+            while len(batch) < self.batch_size and not queue.empty():
+                batch.append(queue.get_nowait())
+            now = time.time()
+            with self.lock:
+                for source, severity, text in batch:
+                    self.index.add(source, severity, text, now)
+
+    async def _tail_file(self, path, queue, parse=None):
+        """Follow a file from its end, reopening it after rotation."""
+        import asyncio
+
+        source = os.path.basename(path)
+        handle = None
+        buf = b""
+        try:
+            while True:
+                try:
+                    if handle is None:
+                        handle = open(path, "rb")
+                        handle.seek(0, os.SEEK_END)
+                        inode = os.fstat(handle.fileno()).st_ino
+                    chunk = handle.read(1 << 16)
+                    if not chunk:
+                        stat = os.stat(path)
+                        rotated = stat.st_ino != inode
+                        if rotated or stat.st_size < handle.tell():
+                            # Rotated or truncated: start over on the new file
+                            handle.close()
+                            handle = open(path, "rb")
+                            inode = os.fstat(handle.fileno()).st_ino
+                            buf = b""
+                            continue
+                        await asyncio.sleep(self.poll_interval)
+                        continue
+                    self.errors.pop(path, None)
+                except OSError as e:
+                    self.errors[path] = str(e)[:50]
+                    if handle is not None:
+                        handle.close()
+                        handle = None
+                    await asyncio.sleep(self.poll_interval * 5)
+                    continue
+
+                buf += chunk
+                if parse is not None:
+                    records, buf = parse(buf)
+                    for record in records:
+                        await queue.put(self._journal_line(record, source))
+                else:
+                    lines, buf = split_log_lines(buf)
+                    for line in lines:
+                        text = line.decode("utf-8", "replace").rstrip("\r")
+                        if text:
+                            await queue.put(
+                                (source, detect_severity(text), text)
+                            )
+        finally:
+            if handle is not None:
+                handle.close()
+
+    async def _tail_journal(self, path, queue):
+        await self._tail_file(path, queue, parse_journal_export)
+
+    @staticmethod
+    def _journal_line(record, default_source):
+        source = (
+            record.get("SYSLOG_IDENTIFIER")
+            or record.get("_SYSTEMD_UNIT")
+            or default_source.encode()
+        )
+        return (
+            source.decode("utf-8", "replace"),
+            journal_severity(record.get("PRIORITY", b"6").decode()),
+            record.get("MESSAGE", b"").decode("utf-8", "replace"),
+        )
+
+    async def _tail_docker(self, container, queue):
+        """Follow `docker logs -f`; stderr lines default to warnings."""
+        import asyncio
+
+        self_monitor.spawned()
+        try:
+            process = await asyncio.create_subprocess_exec(
+                "docker", "logs", "-f", "--tail", "0", container,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+                creationflags=CREATE_NO_WINDOW,
+            )
+        except OSError as e:
+            self.errors[container] = str(e)[:50]
+            return
+
+        try:
+            await asyncio.gather(
+                self._pump(container, process.stdout, "info", queue),
+                self._pump(container, process.stderr, "warning", queue),
+            )
+        finally:
+            if process.returncode is None:
+                process.kill()
+
+    async def _pump(self, source, stream, default, queue):
+        """Queue lines from a stream, splitting ones over LOG_MAX_LINE.
+
+        Reads in chunks rather than with readline(), whose buffer limit
+        raises on a single long line.
+        """
+        buf = b""
+        while True:
+            chunk = await stream.read(1 << 16)
+            lines, buf = split_log_lines(buf + chunk)
+            if not chunk:
+                lines.append(buf)
+            for line in lines:
+                text = line.decode("utf-8", "replace").rstrip()
+                if not text:
+                    continue
+                severity = detect_severity(text)
+                if severity == "info":
+                    severity = default
+                await queue.put((source, severity, text))
+            if not chunk:
+                return
+
+    def query(self, min_severity="debug", keyword=None, limit=20):
+        """Query the index from another thread."""
+        with self.lock:
+            return self.index.query(min_severity, keyword, limit)
+
+    def rate(self) -> float:
+        """Lines per second over the last few seconds."""
+        with self.lock:
+            return self.index.rate()
+
+
+def make_log_panel(tailer, min_severity="debug", keyword=None,
+                   limit=8) -> Panel:
+    """Create a panel with the newest matching log lines."""
+    table = Table.grid(padding=(0, 1), expand=True)
+    table.add_column(style="dim", width=8)
+    table.add_column(style="cyan", width=12, no_wrap=True)
+    table.add_column(no_wrap=True)
+
+    severity_colors = {
+        "debug": "dim", "info": "white", "warning": "yellow", "error": "red",
+    }
+    for _, stamp, source, severity, text, _ in tailer.query(
+        min_severity, keyword, limit
+    ):
+        table.add_row(
+            datetime.fromtimestamp(stamp).strftime("%H:%M:%S"),
+            source[:12],
+            Text(text, style=severity_colors[severity]),
+        )
+    for source, error in tailer.errors.items():
+        table.add_row("", source[:12], Text(error, style="red"))
+
+    title = f"Logs ({tailer.rate():,.0f}/s, {min_severity}+"
+    if keyword:
+        title += f", '{keyword}'"
+    return Panel(table, title=title + ")", border_style="bright_blue")
+
+
+# Snapshot sections and the collectors that fill them
+COLLECTORS = {
+    "cpu_ram": collect_cpu_ram,
+    "disks": collect_disks,
+    "network": collect_network,
+    "memory_pressure": collect_memory_pressure,
+    "processes": collect_processes,
+    "docker": collect_docker,
+    "connections": collect_connections,
+}
+
+
+# Monotonic timestamp of the tick being sampled. Collectors that turn
+# counters into rates read it through sample_time(), so every value in
+# a snapshot shares one timestamp.
+tick_time = None
+
+
+def sample_time() -> float:
+    """Return the current tick's timestamp, or the clock between ticks."""
+    return time.monotonic() if tick_time is None else tick_time
+
+
+def collect_snapshot(now=None, names=None) -> dict:
+    """Run every collector (or the named ones) once off one tick."""
+    global tick_time
+    tick_time = time.monotonic() if now is None else now
+    snapshot = {}
+    try:
+        for name, collector in COLLECTORS.items():
+            if names is not None and name not in names:
+                continue
+            started = time.thread_time()
+            snapshot[name] = collector()
+            self_monitor.record(name, time.thread_time() - started)
+    finally:
+        tick_time = None
+    return snapshot
+
+
+class Frame:
+    """One tick's snapshot with its timestamp and derived metrics.
+
+    timestamp is the monotonic time the tick was sampled at and interval
+    the seconds since the previous frame. sampled holds when each
+    section was last collected, which is earlier than timestamp for
+    sections carried over from a background tick. get() mirrors a
+    snapshot dict, so panels accept either.
+    """
+
+    __slots__ = (
+        "seq", "timestamp", "interval", "sections", "derived", "sampled",
+    )
+
+    def __init__(self, seq, timestamp, interval, sections, derived=None,
+                 sampled=None):
+        self.seq = seq
+        self.timestamp = timestamp
+        self.interval = interval
+        self.sections = sections
+        self.derived = derived if derived is not None else {}
+        self.sampled = (
+            sampled if sampled is not None
+            else dict.fromkeys(sections, timestamp)
+        )
+
+    def get(self, section, default=None):
+        """Return one collector's section."""
+        return self.sections.get(section, default)
+
+    def fresh_sections(self) -> dict:
+        """Return the sections sampled on this frame's own tick."""
+        return {
+            name: section for name, section in self.sections.items()
+            if self.sampled.get(name) == self.timestamp
+        }
+
+
+def derive_metrics(frame, previous=None) -> dict:
+    """Compute rates, totals and shares once for a frame.
+
+    Rates use the span between the two samples of a section, which is
+    the frame interval unless the section was carried over.
+    """
+    derived = {}
+    cpus = psutil.cpu_count() or 1
+
+    network = frame.get("network")
+    if isinstance(network, dict) and "bytes_sent" in network:
+        rates = dict.fromkeys(("bytes_sent", "bytes_recv"))
+        before = previous.get("network") if previous is not None else None
+        if isinstance(before, dict) and "bytes_sent" in before:
+            elapsed = (
+                frame.sampled.get("network", frame.timestamp)
+                - previous.sampled.get("network", previous.timestamp)
+            )
+            if elapsed > 0:
+                for key in rates:
+                    rates[key] = max(network[key] - before[key], 0) / elapsed
+            else:
+                # Not resampled this tick; keep the last rates
+                rates = previous.derived.get("network_rates", rates)
+        derived["network_rates"] = rates
+
+    processes = frame.get("processes")
+    if isinstance(processes, list):
+        # psutil reports per-process CPU against one core
+        derived["process_cpu"] = sum(
+            proc.get("cpu_percent") or 0 for proc in processes
+        ) / cpus
+        if group_by != "process":
+            process_groups.set_key(group_by)
+            process_groups.update(processes, frame.timestamp)
+
+    docker = frame.get("docker")
+    containers = docker.get("containers") if isinstance(docker, dict) else None
+    if containers:
+        totals = container_totals(containers)
+        derived["container_totals"] = totals
+        derived["container_cpu_share"] = totals["cpu_percent"] / cpus
+
+    disks = frame.get("disks")
+    if isinstance(disks, list):
+        derived["disk_used"] = sum(disk["used"] for disk in disks)
+        derived["disk_total"] = sum(disk["total"] for disk in disks)
+    return derived
+
+
+class SamplingCoordinator:
+    """Drive collectors off one shared tick and build Frames.
+
+    Collectors outside the active set (those behind hidden views) only
+    run every background_interval seconds; in between their last
+    section is carried into each frame.
+    """
+
+    def __init__(self, background_interval=BACKGROUND_INTERVAL):
+        self.background_interval = background_interval
+        self.previous = None
+        self.seq = 0
+
+    def frame(self, sections, now=None, sampled=None) -> Frame:
+        """Wrap sections sampled at now in a Frame with derived metrics."""
+        if now is None:
+            now = time.monotonic()
+        interval = (
+            now - self.previous.timestamp if self.previous is not None
+            else 0.0
+        )
+        self.seq += 1
+        frame = Frame(self.seq, now, interval, sections, sampled=sampled)
+        frame.derived = derive_metrics(frame, self.previous)
+        self.previous = frame
+        return frame
+
+    def due(self, now, active=None) -> list:
+        """Return the collectors to run this tick."""
+        sampled = self.previous.sampled if self.previous is not None else {}
+        return [
+            name for name in COLLECTORS
+            if active is None or name in active
+            or now - sampled.get(name, -inf) >= self.background_interval
+        ]
+
+    def tick(self, now=None, active=None) -> Frame:
+        """Sample due collectors once and return the frame.
+
+        active names the collectors to run at full rate; None runs all.
+        """
+        if now is None:
+            now = time.monotonic()
+        names = self.due(now, active)
+        sections, sampled = {}, {}
+        if self.previous is not None:
+            sections.update(self.previous.sections)
+            sampled.update(self.previous.sampled)
+        sections.update(collect_snapshot(now, names))
+        sampled.update(dict.fromkeys(names, now))
+        return self.frame(sections, now, sampled)
+
+
+# Fixed layout of the shared-memory snapshot buffer
+SHM_SEQ_FORMAT = "<Q"
+SHM_HEADER_FORMAT = "<QI"  # sequence number, process table capacity
+SHM_SCALAR_FIELDS = (
+    ("cpu_percent", "d"),
+    ("ram_percent", "d"),
+    ("ram_used", "q"),
+    ("ram_total", "q"),
+    ("cpu_temp", "d"),
+    ("battery_percent", "d"),
+    ("battery_secsleft", "q"),
+    ("battery_plugged", "b"),
+    ("bytes_sent", "Q"),
+    ("bytes_recv", "Q"),
+    ("packets_sent", "Q"),
+    ("packets_recv", "Q"),
+    *((field, "d") for field in MEMORY_PRESSURE_FIELDS),
+    ("docker_available", "b"),
+    ("docker_message", "i"),
+    ("docker_style", "i"),
+    ("conn_total", "I"),
+    ("conn_added", "I"),
+    ("conn_removed", "I"),
+    ("conn_error", "i"),
+    ("sampled_at", "d"),
+    ("n_disks", "I"),
+    ("n_processes", "I"),
+    ("n_containers", "I"),
+    ("n_conn_states", "I"),
+    ("n_remotes", "I"),
+    ("n_listeners", "I"),
+    ("n_strings", "I"),
+)
+SHM_SCALAR_FORMAT = "<" + "".join(kind for _, kind in SHM_SCALAR_FIELDS)
+SHM_DISK_FORMAT = "<iidqqq"  # device, mountpoint, percent, used/total/free
+SHM_PROCESS_FORMAT = "<qiddqiq"  # pid, name, cpu/mem %, ppid, user, IO
+SHM_CONTAINER_FORMAT = "<iiid6q"  # name, image, status, cpu %, byte fields
+SHM_STATE_FORMAT = "<iI"  # connection status, count
+SHM_REMOTE_FORMAT = "<iHiIi"  # host, port, status, count, process names
+SHM_LISTENER_FORMAT = "<iiHi"  # proto, host, port, process
+SHM_STRING_FORMAT = "<II"  # offset, length into the string blob
+SHM_MAX_DISKS = 32
+SHM_MIN_PROCESSES = 2048
+SHM_MAX_CONTAINERS = 128
+SHM_MAX_CONN_STATES = 16
+SHM_MAX_REMOTES = 32
+SHM_MAX_LISTENERS = 256
+SHM_MAX_STRINGS = 4096  # plus one per process table slot
+SHM_STRING_BYTES = 256 * 1024  # plus SHM_PROCESS_STRING_BYTES per slot
+SHM_PROCESS_STRING_BYTES = 64
+
+Battery = namedtuple("Battery", ["percent", "secsleft", "power_plugged"])
+
+
+def attach_shared_memory(name):
+    """Attach to an existing shared memory block without owning it.
+
+    Before Python 3.13 the attach is registered with the resource
+    tracker, but the worker is spawned from the creator and shares its
+    tracker, so that only repeats the creator's own registration.
+    Unregistering here would drop the creator's entry instead.
+    """
+    from multiprocessing import shared_memory
+
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        return shared_memory.SharedMemory(name=name)
+
+
+def shm_process_capacity():
+    """Process table size for a new buffer, with room to double."""
+    try:
+        live = len(psutil.pids())
+    except (psutil.Error, OSError):
+        live = 0
+    return max(SHM_MIN_PROCESSES, 2 * live)
+
+
+class SnapshotBuffer:
+    """Snapshot frames in shared memory, versioned with a seqlock.
+
+    The writer bumps the sequence number to odd, writes the frame and
+    bumps it back to even. Readers retry while the number is odd or
+    changed underneath them, so neither side ever takes a lock.
+
+    Readers decode each new frame once into the same dicts
+    collect_snapshot() returns, cached by sequence number, since every
+    panel works on those; the packed records are not read in place.
+    """
+
+    header_size = struct.calcsize(SHM_HEADER_FORMAT)
+    scalar_size = struct.calcsize(SHM_SCALAR_FORMAT)
+    disk_size = struct.calcsize(SHM_DISK_FORMAT)
+    process_size = struct.calcsize(SHM_PROCESS_FORMAT)
+    container_size = struct.calcsize(SHM_CONTAINER_FORMAT)
+    state_size = struct.calcsize(SHM_STATE_FORMAT)
+    remote_size = struct.calcsize(SHM_REMOTE_FORMAT)
+    listener_size = struct.calcsize(SHM_LISTENER_FORMAT)
+    string_size = struct.calcsize(SHM_STRING_FORMAT)
+
+    def __init__(self, name=None, create=False, max_processes=None):
+        """Create a buffer, or attach to the one called name.
+
+        The process table is sized by the creator (by default from the
+        live process count) and recorded in the header for readers.
+        """
+        if create:
+            from multiprocessing import shared_memory
+
+            self.place(max_processes or shm_process_capacity())
+            self.shm = shared_memory.SharedMemory(
+                name=name, create=True, size=self.total_size
+            )
+            struct.pack_into(
+                SHM_HEADER_FORMAT, self.shm.buf, 0, 0, self.max_processes
+            )
+        else:
+            self.shm = attach_shared_memory(name)
+            self.place(
+                struct.unpack_from(SHM_HEADER_FORMAT, self.shm.buf, 0)[1]
+            )
+        self.owner = create
+        self.name = self.shm.name
+        self.cached_seq = None
+        self.cached = None
+        self.cached_time = None
+
+    def place(self, max_processes):
+        """Work out table offsets for a process table of this size."""
+        self.max_processes = max_processes
+        self.max_strings = SHM_MAX_STRINGS + max_processes
+        self.string_bytes = (
+            SHM_STRING_BYTES + SHM_PROCESS_STRING_BYTES * max_processes
+        )
+        self.scalar_offset = self.header_size
+        self.disk_offset = self.scalar_offset + self.scalar_size
+        self.process_offset = (
+            self.disk_offset + self.disk_size * SHM_MAX_DISKS
+        )
+        self.container_offset = (
+            self.process_offset + self.process_size * max_processes
+        )
+        self.state_offset = (
+            self.container_offset
+            + self.container_size * SHM_MAX_CONTAINERS
+        )
+        self.remote_offset = (
+            self.state_offset + self.state_size * SHM_MAX_CONN_STATES
+        )
+        self.listener_offset = (
+            self.remote_offset + self.remote_size * SHM_MAX_REMOTES
+        )
+        self.string_offset = (
+            self.listener_offset + self.listener_size * SHM_MAX_LISTENERS
+        )
+        self.blob_offset = (
+            self.string_offset + self.string_size * self.max_strings
+        )
+        self.total_size = self.blob_offset + self.string_bytes
+
+    def fit_processes(self, processes):
+        """Pick the processes to publish when there are too many.
+
+        The worker can't see which column the UI sorts by, so keep the
+        busiest half by CPU and fill the rest by memory.
+        """
+        if len(processes) <= self.max_processes:
+            return processes
+        kept = heapq.nlargest(
+            self.max_processes // 2, processes,
+            key=lambda proc: proc["cpu_percent"] or 0,
+        )
+        pids = {proc["pid"] for proc in kept}
+        kept.extend(
+            proc for proc in heapq.nlargest(
+                self.max_processes, processes,
+                key=lambda proc: proc["memory_percent"] or 0,
+            )
+            if proc["pid"] not in pids
+        )
+        return kept[:self.max_processes]
+
+    @property
+    def seq(self) -> int:
+        """Current sequence number; odd while a write is in progress."""
+        return struct.unpack_from(SHM_SEQ_FORMAT, self.shm.buf, 0)[0]
+
+    def write(self, snapshot, sampled_at=nan):
+        """Publish a snapshot from collect_snapshot() as the latest frame.
+
+        sampled_at is the monotonic tick it was collected on; read()
+        leaves it in cached_time.
+        """
+        buf = self.shm.buf
+        strings = {}
+
+        def intern(text):
+            if text is None:
+                return -1
+            index = strings.get(text)
+            if index is None:
+                if len(strings) >= self.max_strings:
+                    return -1
+                index = strings[text] = len(strings)
+            return index
+
+        # A writer that died mid-frame leaves the number odd; skip past it
+        seq = self.seq
+        seq += 1 if seq % 2 == 0 else 2
+        struct.pack_into(SHM_SEQ_FORMAT, buf, 0, seq)
+
+        disks = snapshot.get("disks") or []
+        for i, disk in enumerate(disks[:SHM_MAX_DISKS]):
+            struct.pack_into(
+                SHM_DISK_FORMAT, buf, self.disk_offset + i * self.disk_size,
+                intern(disk["device"]), intern(disk["mountpoint"]),
+                disk["percent"], disk["used"], disk["total"], disk["free"],
+            )
+
+        processes = self.fit_processes(snapshot.get("processes") or [])
+        for i, proc in enumerate(processes):
+            struct.pack_into(
+                SHM_PROCESS_FORMAT, buf,
+                self.process_offset + i * self.process_size,
+                proc["pid"], intern(proc["name"]),
+                proc["cpu_percent"] or 0.0, proc["memory_percent"] or 0.0,
+                -1 if proc.get("ppid") is None else proc["ppid"],
+                intern(proc.get("username")),
+                -1 if proc.get("io_bytes") is None else proc["io_bytes"],
+            )
+
+        docker = snapshot.get("docker") or {
+            "containers": None, "message": None
+        }
+        containers = docker["containers"] or []
+        for i, c in enumerate(containers[:SHM_MAX_CONTAINERS]):
+            struct.pack_into(
+                SHM_CONTAINER_FORMAT, buf,
+                self.container_offset + i * self.container_size,
+                intern(c.name), intern(c.image), intern(c.status),
+                nan if c.cpu_percent is None else c.cpu_percent,
+                *(
+                    -1 if getattr(c, field) is None else getattr(c, field)
+                    for field in CONTAINER_NUMERIC_FIELDS[1:]
+                ),
+            )
+
+        connections = snapshot.get("connections") or {}
+        states = list((connections.get("states") or {}).items())
+        states = states[:SHM_MAX_CONN_STATES]
+        for i, (status, count) in enumerate(states):
+            struct.pack_into(
+                SHM_STATE_FORMAT, buf, self.state_offset + i * self.state_size,
+                intern(status), count,
+            )
+        remotes = (connections.get("remotes") or [])[:SHM_MAX_REMOTES]
+        for i, remote in enumerate(remotes):
+            struct.pack_into(
+                SHM_REMOTE_FORMAT, buf,
+                self.remote_offset + i * self.remote_size,
+                intern(remote["host"]), remote["port"],
+                intern(remote["status"]), remote["count"],
+                # Process names travel as one newline-joined string
+                intern("\n".join(remote["processes"]) or None),
+            )
+        listening = connections.get("listening") or []
+        listening = listening[:SHM_MAX_LISTENERS]
+        for i, listener in enumerate(listening):
+            struct.pack_into(
+                SHM_LISTENER_FORMAT, buf,
+                self.listener_offset + i * self.listener_size,
+                intern(listener["proto"]), intern(listener["host"]),
+                listener["port"], intern(listener["process"]),
+            )
+
+        cpu_ram = snapshot.get("cpu_ram") or {}
+        network = snapshot.get("network") or {}
+        pressure = snapshot.get("memory_pressure") or {}
+        battery = cpu_ram.get("battery")
+        cpu_temp = cpu_ram.get("cpu_temp")
+        docker_message = intern(docker["message"])
+        docker_style = intern(docker.get("style"))
+        conn_error = intern(connections.get("error"))
+
+        # Copy the string table last, once every string is interned
+        blob = self.blob_offset
+        end = self.blob_offset + self.string_bytes
+        for text, index in strings.items():
+            data = text.encode("utf-8")
+            if blob + len(data) > end:
+                data = b""
+            buf[blob:blob + len(data)] = data
+            struct.pack_into(
+                SHM_STRING_FORMAT, buf,
+                self.string_offset + index * self.string_size,
+                blob - self.blob_offset, len(data),
+            )
+            blob += len(data)
+
+        struct.pack_into(
+            SHM_SCALAR_FORMAT, buf, self.scalar_offset,
+            cpu_ram.get("cpu_percent", 0.0),
+            cpu_ram.get("ram_percent", 0.0),
+            cpu_ram.get("ram_used", 0),
+            cpu_ram.get("ram_total", 0),
+            nan if cpu_temp is None else cpu_temp,
+            nan if battery is None else battery.percent,
+            0 if battery is None else int(battery.secsleft),
+            -1 if battery is None else int(bool(battery.power_plugged)),
+            network.get("bytes_sent", 0),
+            network.get("bytes_recv", 0),
+            network.get("packets_sent", 0),
+            network.get("packets_recv", 0),
+            *(
+                nan if pressure.get(field) is None else pressure[field]
+                for field in MEMORY_PRESSURE_FIELDS
+            ),
+            int(docker["containers"] is not None),
+            docker_message,
+            docker_style,
+            connections.get("total", 0),
+            connections.get("added", 0),
+            connections.get("removed", 0),
+            conn_error,
+            sampled_at,
+            min(len(disks), SHM_MAX_DISKS),
+            len(processes),
+            min(len(containers), SHM_MAX_CONTAINERS),
+            len(states),
+            len(remotes),
+            len(listening),
+            len(strings),
+        )
+
+        struct.pack_into(SHM_SEQ_FORMAT, buf, 0, seq + 1)
+        return seq + 1
+
+    def _decode(self):
+        """Decode the frame in the buffer as (sampled_at, snapshot)."""
+        buf = self.shm.buf
+        scalars = dict(zip(
+            (name for name, _ in SHM_SCALAR_FIELDS),
+            struct.unpack_from(SHM_SCALAR_FORMAT, buf, self.scalar_offset),
+        ))
+        blob = buf[self.blob_offset:self.blob_offset + self.string_bytes]
+        strings = []
+        for offset, length in struct.iter_unpack(
+            SHM_STRING_FORMAT,
+            buf[self.string_offset:
+                self.string_offset + scalars["n_strings"] * self.string_size],
+        ):
+            strings.append(str(blob[offset:offset + length], "utf-8"))
+        blob.release()
+
+        def lookup(index):
+            return strings[index] if 0 <= index < len(strings) else None
+
+        def records(fmt, offset, size, count):
+            return struct.iter_unpack(fmt, buf[offset:offset + size * count])
+
+        disks = [
+            {
+                "device": lookup(device), "mountpoint": lookup(mountpoint),
+                "percent": percent, "used": used, "total": total,
+                "free": free,
+            }
+            for device, mountpoint, percent, used, total, free in records(
+                SHM_DISK_FORMAT, self.disk_offset, self.disk_size,
+                scalars["n_disks"],
+            )
+        ]
+        processes = [
+            {
+                "pid": pid, "name": lookup(name),
+                "cpu_percent": cpu, "memory_percent": mem,
+                "username": lookup(username),
+                "ppid": None if ppid < 0 else ppid,
+                "io_bytes": None if io_bytes < 0 else io_bytes,
+            }
+            for pid, name, cpu, mem, ppid, username, io_bytes in records(
+                SHM_PROCESS_FORMAT, self.process_offset, self.process_size,
+                scalars["n_processes"],
+            )
+        ]
+        containers = []
+        for name, image, status, cpu, *sizes in records(
+            SHM_CONTAINER_FORMAT, self.container_offset,
+            self.container_size, scalars["n_containers"],
+        ):
+            containers.append(ContainerStats(
+                lookup(name) or "", lookup(image) or "", lookup(status) or "",
+                None if isnan(cpu) else cpu,
+                *(None if size < 0 else size for size in sizes),
+            ))
+
+        connections = {
+            "total": scalars["conn_total"],
+            "states": {
+                lookup(status): count
+                for status, count in records(
+                    SHM_STATE_FORMAT, self.state_offset, self.state_size,
+                    scalars["n_conn_states"],
+                )
+            },
+            "remotes": [
+                {
+                    "host": lookup(host), "port": port,
+                    "status": lookup(status), "count": count,
+                    "processes": [
+                        name for name in (lookup(names) or "").split("\n")
+                        if name
+                    ],
+                }
+                for host, port, status, count, names in records(
+                    SHM_REMOTE_FORMAT, self.remote_offset, self.remote_size,
+                    scalars["n_remotes"],
+                )
+            ],
+            "listening": [
+                {
+                    "proto": lookup(proto), "host": lookup(host),
+                    "port": port, "process": lookup(process),
+                }
+                for proto, host, port, process in records(
+                    SHM_LISTENER_FORMAT, self.listener_offset,
+                    self.listener_size, scalars["n_listeners"],
+                )
+            ],
+            "added": scalars["conn_added"],
+            "removed": scalars["conn_removed"],
+            "error": lookup(scalars["conn_error"]),
+        }
+
+        battery = None
+        if scalars["battery_plugged"] >= 0:
+            battery = Battery(
+                scalars["battery_percent"],
+                scalars["battery_secsleft"],
+                bool(scalars["battery_plugged"]),
+            )
+        docker = {
+            "containers": (
+                containers if scalars["docker_available"] else None
+            ),
+            "message": lookup(scalars["docker_message"]),
+        }
+        if scalars["docker_style"] >= 0:
+            docker["style"] = lookup(scalars["docker_style"])
+
+        sampled_at = scalars["sampled_at"]
+        return None if isnan(sampled_at) else sampled_at, {
+            "cpu_ram": {
+                "cpu_percent": scalars["cpu_percent"],
+                "ram_percent": scalars["ram_percent"],
+                "ram_used": scalars["ram_used"],
+                "ram_total": scalars["ram_total"],
+                "cpu_temp": (
+                    None if isnan(scalars["cpu_temp"])
+                    else scalars["cpu_temp"]
+                ),
+                "battery": battery,
+            },
+            "disks": disks,
+            "network": {
+                key: scalars[key] for key in (
+                    "bytes_sent", "bytes_recv",
+                    "packets_sent", "packets_recv",
+                )
+            },
+            "memory_pressure": {
+                field: (
+                    None if isnan(scalars[field]) else scalars[field]
+                )
+                for field in MEMORY_PRESSURE_FIELDS
+            },
+            "processes": processes,
+            "docker": docker,
+            "connections": connections,
+        }
+
+    def read(self, retries=100):
+        """Return the latest complete frame, or None if none was written.
+
+        Frames are only decoded when the sequence number has moved on.
+        """
+        for _ in range(retries):
+            before = self.seq
+            if before == 0:
+                return None
+            if before % 2:
+                continue
+            if before == self.cached_seq:
+                return self.cached
+            try:
+                sampled_at, snapshot = self._decode()
+            except (struct.error, UnicodeDecodeError, IndexError):
+                # Torn read; the sequence check below rejects it anyway
+                snapshot = None
+            if self.seq == before and snapshot is not None:
+                self.cached_seq = before
+                self.cached = snapshot
+                self.cached_time = sampled_at
+                return snapshot
+        return self.cached
+
+    def close(self):
+        """Detach from the buffer, removing it if this side created it."""
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+def collector_worker(conn, interval, buffer_name=None, backend=None):
+    """Worker process loop: sample every interval and send snapshots.
+
+    Each message is (tick time, snapshot). With a shared memory buffer
+    only the new sequence number goes down the pipe in its place; the
+    snapshot and tick time are written into the buffer. backend is a
+    (name, fixture) pair for select_stats_backend().
+    """
+    global stats_backend
+    buffer = SnapshotBuffer(buffer_name) if buffer_name else None
+    if backend is not None:
+        stats_backend = select_stats_backend(*backend)
+
+    # Initial CPU reading to avoid 0% on first call
+    psutil.cpu_percent(interval=None)
+    while True:
+        started = time.monotonic()
+        snapshot = collect_snapshot(started)
+        try:
+            if buffer is not None:
+                conn.send((started, buffer.write(snapshot, started)))
+            else:
+                conn.send((started, snapshot))
+        except (BrokenPipeError, EOFError, OSError):
+            # UI process went away
+            return
+        time.sleep(max(interval - (time.monotonic() - started), 0))
+
+
+class CollectorWorker:
+    """Run collectors in a child process, restarting it when it hangs."""
+
+    def __init__(self, interval=2.0, deadline=10.0, shared=False,
+                 backend=None):
+        self.interval = interval
+        self.deadline = deadline
+        self.backend = backend
+        self.buffer = SnapshotBuffer(create=True) if shared else None
+        self.process = None
+        self.conn = None
+        self.latest = None
+        self.sampled_at = None  # the latest snapshot's tick time
+        self.last_seen = 0.0
+        self.restarts = 0
+
+    def start(self):
+        """Start the collector process."""
+        import multiprocessing
+
+        # spawn is the only start method on Windows; use it everywhere
+        ctx = multiprocessing.get_context("spawn")
+        self.conn, child_conn = ctx.Pipe(duplex=False)
+        self.process = ctx.Process(
+            target=collector_worker,
+            args=(
+                child_conn,
+                self.interval,
+                self.buffer.name if self.buffer is not None else None,
+                self.backend,
+            ),
+            daemon=True,
+        )
+        self.process.start()
+        child_conn.close()
+        self.last_seen = time.monotonic()
+
+    def stop(self):
+        """Stop the collector process, killing it if it will not exit."""
+        if self.process is not None:
+            self.process.terminate()
+            self.process.join(1)
+            if self.process.is_alive():
+                self.process.kill()
+                self.process.join(1)
+            self.process = None
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+
+    def close(self):
+        """Stop the worker and release the shared memory buffer."""
+        self.stop()
+        if self.buffer is not None:
+            self.buffer.close()
+            self.buffer = None
+
+    def restart(self):
+        """Replace a hung or dead collector process."""
+        self.restarts += 1
+        self.stop()
+        self.start()
+
+    def poll(self, timeout=0.0):
+        """Return the newest snapshot, restarting the worker if overdue."""
+        try:
+            while self.conn.poll(timeout):
+                sampled_at, message = self.conn.recv()
+                self.last_seen = time.monotonic()
+                timeout = 0.0
+                if self.buffer is None:
+                    self.sampled_at, self.latest = sampled_at, message
+            if self.buffer is not None:
+                self.latest = self.buffer.read()
+                self.sampled_at = self.buffer.cached_time
+        except (EOFError, OSError):
+            # Worker died; let the watchdog below replace it
+            self.last_seen = 0.0
+
+        if time.monotonic() - self.last_seen > self.deadline:
+            self.restart()
+        return self.latest
+
+
+def visible_collectors():
+    """Collectors behind the visible panels, or None for all of them."""
+    if current_view == "overview" and zoomed_panel is None:
+        return None
+    panels = (
+        (zoomed_panel,) if zoomed_panel is not None
+        else VIEW_PANELS[current_view]
+    )
+    return {PANEL_COLLECTORS[panel] for panel in panels
+            if panel in PANEL_COLLECTORS}
+
+
+def make_panel(name, snapshot, derived, limit=5) -> Panel:
+    """Render one named panel; limit caps the rows of list panels."""
+    if name == "system_info":
+        return make_system_info()
+    if name == "cpu_ram":
+        return make_cpu_ram_stats(snapshot.get("cpu_ram"))
+    if name == "disk":
+        return make_disk_stats(snapshot.get("disks"))
+    if name == "network":
+        return make_network_stats(
+            snapshot.get("network"), derived.get("network_rates")
+        )
+    if name == "memory_pressure":
+        return make_memory_pressure(snapshot.get("memory_pressure"))
+    if name == "processes":
+        return make_top_processes(snapshot.get("processes"), limit)
+    if name == "docker":
+        return make_docker_stats(
+            snapshot.get("docker"), derived.get("container_totals")
+        )
+    if name == "connections":
+        return make_connections(snapshot.get("connections"), limit)
+    if name == "alerts":
+        return make_alerts()
+    raise ValueError(f"Unknown panel: {name}")
+
+
+def make_view_layout(snapshot, derived, rows=None) -> Layout:
+    """Lay out the current view, or just the zoomed panel.
+
+    The first panel of a view takes two thirds of the width and lists
+    as many rows as the terminal can show.
+    """
+    limit = max(rows - 10, 5) if rows else 40
+    layout = Layout()
+    layout.split(
+        Layout(make_header(), name="header", size=3),
+        Layout(name="body", ratio=1),
+        Layout(
+            make_footer(), name="footer",
+            size=3 if self_monitor.last is None else 4,
+        ),
+    )
+    if zoomed_panel is not None:
+        layout["body"].update(
+            make_panel(zoomed_panel, snapshot, derived, limit)
+        )
+        return layout
+
+    primary, *others = VIEW_PANELS[current_view]
+    main_panel = Layout(make_panel(primary, snapshot, derived, limit),
+                        ratio=2)
+    if not others:
+        layout["body"].update(main_panel)
+        return layout
+    side = Layout(ratio=1)
+    side.split_column(*(
+        Layout(make_panel(name, snapshot, derived)) for name in others
+    ))
+    layout["body"].split_row(main_panel, side)
+    return layout
+
+
+def make_waiting_layout(restarts=0) -> Layout:
+    """Layout shown in isolated mode until the worker's first snapshot.
+
+    Nothing is sampled in this process, so a hung collector can't
+    freeze the UI before the worker has ever delivered.
+    """
+    message = Text("Waiting for the collector process...", style="yellow")
+    if restarts:
+        message.append(f"  (restarted {restarts}x)", style="dim")
+    layout = Layout()
+    layout.split(
+        Layout(make_header(), name="header", size=3),
+        Layout(
+            Panel(message, title="Collector", border_style="bright_blue"),
+            name="body", ratio=1,
+        ),
+        Layout(make_footer(), name="footer", size=3),
+    )
+    return layout
+
+
+def make_layout(snapshot=None, rows=None) -> Layout:
+    """Create and populate the layout.
+
+    With a Frame (or a bare snapshot from collect_snapshot()) the panels
+    only render, using the frame's derived metrics where they can;
+    without one each panel samples its own data. Views other than the
+    overview, and zoomed panels, are laid out to fill rows lines.
+    """
+    if snapshot is None:
+        snapshot = {}
+    derived = getattr(snapshot, "derived", {})
+    if current_view != "overview" or zoomed_panel is not None:
+        return make_view_layout(snapshot, derived, rows)
+
+    layout = Layout()
+
+    # Split into header, body, docker, and footer
+    sections = [
+        Layout(name="header", size=3),
+        Layout(name="body", ratio=1),
+        Layout(name="docker", size=10),
+        Layout(name="footer", size=3 if self_monitor.last is None else 4),
+    ]
+
+    # Plugin panels share one row above the footer
+    plugin_panels = []
+    if plugin_scheduler is not None:
+        values = {**snapshot_values(snapshot), **plugin_scheduler.values()}
+        plugin_panels = [
+            Layout(make_plugin_panel(panel, values))
+            for panel in plugin_scheduler.panels
+        ]
+        if plugin_scheduler.disabled:
+            plugin_panels.append(
+                Layout(make_plugin_status(plugin_scheduler))
+            )
+    if plugin_panels:
+        sections.insert(3, Layout(name="plugins", size=8))
+    if log_tailer is not None:
+        sections.insert(-1, Layout(
+            make_log_panel(log_tailer, log_severity, log_keyword),
+            name="logs",
+            size=10,
+        ))
+
+    layout.split(*sections)
+    if plugin_panels:
+        layout["plugins"].split_row(*plugin_panels)
+
+    # Split body into left and right columns
+    layout["body"].split_row(
+        Layout(name="left"),
+        Layout(name="right"),
+    )
+
+    # Split left column into System Info, CPU/RAM and Disk
+    layout["left"].split_column(
+        Layout(name="system_info", size=11),
+        Layout(name="cpu_ram"),
+        Layout(name="disk"),
+    )
+
+    # Split right column for network stats, memory pressure and processes
+    layout["right"].split_column(
+        Layout(name="network", size=6),
+        Layout(name="memory_pressure", size=10),
+        Layout(name="processes"),
+        Layout(name="alerts", size=7),
+    )
+
+    # Assign content to each section
+    layout["header"].update(make_header())
+    for name in (
+        "system_info", "cpu_ram", "disk", "network", "memory_pressure",
+        "processes", "alerts",
+    ):
+        layout[name].update(make_panel(name, snapshot, derived))
+    layout["docker"].split_row(
+        Layout(make_panel("docker", snapshot, derived), ratio=3),
+        Layout(make_panel("connections", snapshot, derived), ratio=2),
+    )
+    layout["footer"].update(make_footer())
+
+    return layout
+
+
+class LineDiffRenderer:
+    """Repaint only the cells that changed since the previous frame.
+
+    Meant for slow SSH or serial links, where a full-screen repaint per
+    frame saturates the connection. Bytes written are counted so the
+    cost per frame can be measured.
+    """
+
+    def __init__(self, file=None, width=None, height=None, max_fps=2.0,
+                 monochrome=False):
+        self.file = file or sys.stdout
+        self.width = width
+        self.height = height
+        self.min_interval = 1.0 / max_fps if max_fps else 0.0
+        self.color_system = None if monochrome else "standard"
+        self.console = Console(
+            file=io.StringIO(),
+            force_terminal=True,
+            color_system=self.color_system,
+            legacy_windows=False,
+        )
+        self.previous = []
+        self.previous_size = None
+        self.last_draw = None
+        self.frames = 0
+        self.bytes_written = 0
+        self.last_frame_bytes = 0
+
+    def __enter__(self):
+        # Alternate screen, hidden cursor
+        self._write("\x1b[?1049h\x1b[?25l\x1b[2J")
+        return self
+
+    def __exit__(self, *exc_info):
+        self._write("\x1b[0m\x1b[?25h\x1b[?1049l")
+
+    def _write(self, data):
+        self.file.write(data)
+        self.file.flush()
+        encoded = len(data.encode("utf-8"))
+        self.bytes_written += encoded
+        return encoded
+
+    def size(self):
+        """Return the (width, height) to render at."""
+        terminal = shutil.get_terminal_size()
+        return self.width or terminal.columns, self.height or terminal.lines
+
+    def due(self, now=None) -> bool:
+        """Check whether the frame-rate cap allows another frame."""
+        if now is None:
+            now = time.monotonic()
+        return (
+            self.last_draw is None
+            or now - self.last_draw >= self.min_interval
+        )
+
+    def render_cells(self, renderable, width, height):
+        """Render to a list of lines, each a list of (char, style) cells."""
+        options = self.console.options.update(
+            width=width, height=height, max_width=width
+        )
+        lines = self.console.render_lines(renderable, options, pad=True)
+        cells = []
+        for line in lines[:height]:
+            row = []
+            for segment in line:
+                if segment.control:
+                    continue
+                style = segment.style
+                for char in segment.text:
+                    row.append((char, style))
+                    # Pad wide characters so indexes stay column-aligned
+                    if cell_len(char) == 2:
+                        row.append(("", style))
+            cells.append(row)
+        return cells
+
+    def encode(self, cells):
+        """Turn a run of cells into text with the minimum style changes."""
+        out = []
+        run = []
+        run_style = None
+        for char, style in cells:
+            if style != run_style and run:
+                out.append(self.style_text("".join(run), run_style))
+                run = []
+            run_style = style
+            run.append(char)
+        if run:
+            out.append(self.style_text("".join(run), run_style))
+        return "".join(out)
+
+    def style_text(self, text, style):
+        """Wrap text in the escapes for its style, if colour is enabled."""
+        if style is None or self.color_system is None:
+            return text
+        return style.render(text, color_system=self.console._color_system)
+
+    def draw(self, renderable, force=False, now=None) -> bool:
+        """Emit the changes needed to show renderable.
+
+        Returns False when the frame was skipped by the frame-rate cap.
+        """
+        if now is None:
+            now = time.monotonic()
+        if not force and not self.due(now):
+            return False
+        self.last_draw = now
+
+        width, height = self.size()
+        cells = self.render_cells(renderable, width, height)
+
+        out = []
+        if (width, height) != self.previous_size:
+            # Resized: nothing on screen can be reused
+            out.append("\x1b[2J")
+            self.previous = []
+            self.previous_size = (width, height)
+
+        for row, line in enumerate(cells):
+            old = self.previous[row] if row < len(self.previous) else None
+            if old == line:
+                continue
+            start = 0
+            end = len(line)
+            if old is not None and len(old) == len(line):
+                while start < end and old[start] == line[start]:
+                    start += 1
+                while end > start and old[end - 1] == line[end - 1]:
+                    end -= 1
+                # Never start or stop inside a wide character
+                while start > 0 and line[start][0] == "":
+                    start -= 1
+                while end < len(line) and line[end][0] == "":
+                    end += 1
+            out.append(f"\x1b[{row + 1};{start + 1}H")
+            out.append(self.encode(line[start:end]))
+
+        self.previous = cells
+        self.frames += 1
+        self.last_frame_bytes = self._write("".join(out)) if out else 0
+        return True
+
+
+def collect_snapshot_parallel(names=None, deadline=5.0) -> dict:
+    """Run collectors concurrently, giving up on them after deadline.
+
+    Collectors that miss the deadline are left running on daemon threads
+    (so they cannot hold up exit) and listed under "missing".
+    """
+    global tick_time
+    names = list(names or COLLECTORS)
+    results = {}
+    tick_time = time.monotonic()
+
+    def run(name):
+        started = time.thread_time()
+        try:
+            results[name] = COLLECTORS[name]()
+        except Exception as e:
+            results[name] = {"error": str(e)[:100]}
+        self_monitor.record(name, time.thread_time() - started)
+
+    threads = [
+        threading.Thread(target=run, args=(name,), daemon=True)
+        for name in names
+    ]
+    give_up = time.monotonic() + deadline
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(max(give_up - time.monotonic(), 0))
+    tick_time = None
+
+    snapshot = {name: results[name] for name in names if name in results}
+    missing = [name for name in names if name not in snapshot]
+    if missing:
+        snapshot["missing"] = missing
+    return snapshot
+
+
+def to_jsonable(value):
+    """Convert snapshot values (records, named tuples) to JSON types."""
+    if isinstance(value, ContainerStats):
+        return {field: getattr(value, field) for field in value.__slots__}
+    if isinstance(value, tuple) and hasattr(value, "_asdict"):
+        return to_jsonable(value._asdict())
+    if isinstance(value, dict):
+        return {key: to_jsonable(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [to_jsonable(item) for item in value]
+    return value
+
+
+def flatten_snapshot(snapshot) -> dict:
+    """Flatten a snapshot into one row of scalar columns for CSV.
+
+    Per-process rows are summarised as a count; disks and containers get
+    one column group each, and a failed collector one error column.
+    """
+    row = {}
+    for section, value in snapshot.items():
+        if isinstance(value, dict) and set(value) == {"error"}:
+            # A collector that raised; see collect_snapshot_parallel()
+            row[f"{section}.error"] = value["error"]
+        elif section == "disks":
+            for disk in value:
+                for key in ("percent", "used", "total", "free"):
+                    row[f"disk.{disk['mountpoint']}.{key}"] = disk[key]
+        elif section == "processes":
+            row["processes.count"] = len(value)
+        elif section == "docker":
+            containers = value.get("containers") or []
+            row["docker.count"] = len(containers)
+            for key, total in container_totals(containers).items():
+                row[f"docker.{key}"] = total
+            for container in containers:
+                for key in CONTAINER_NUMERIC_FIELDS:
+                    row[f"container.{container.name}.{key}"] = getattr(
+                        container, key
+                    )
+        elif section == "connections":
+            row["connections.total"] = value["total"]
+            row["connections.listening"] = len(value["listening"])
+            for status, count in value["states"].items():
+                row[f"connections.{status}"] = count
+        elif section == "self":
+            for key, item in value.items():
+                if key == "collectors":
+                    for name, costs in item.items():
+                        row[f"self.{name}.mean_ms"] = costs["mean_ms"]
+                else:
+                    row[f"self.{key}"] = item
+        elif section == "missing":
+            row["missing"] = " ".join(value)
+        elif isinstance(value, dict):
+            for key, item in to_jsonable(value).items():
+                if isinstance(item, dict):
+                    for sub_key, sub_item in item.items():
+                        row[f"{section}.{key}.{sub_key}"] = sub_item
+                else:
+                    row[f"{section}.{key}"] = item
+        else:
+            row[section] = value
+    return row
+
+
+def prime_counters(window, names=None):
+    """Take baseline CPU readings so the first sample is not all zeros.
+
+    Per-process CPU is only primed when processes are collected.
+    """
+    psutil.cpu_percent(interval=None)
+    if names is None or "processes" in names:
+        for proc in psutil.process_iter(["cpu_percent"]):
+            pass
+    time.sleep(window)
+
+
+def run_snapshot(args, out=None) -> int:
+    """Write one or more snapshots to stdout for scripts and cron."""
+    out = out or sys.stdout
+    names = args.collectors.split(",") if args.collectors else None
+    unknown = [name for name in names or [] if name not in COLLECTORS]
+    if unknown:
+        print(f"Unknown collector: {', '.join(unknown)}", file=sys.stderr)
+        return 2
+
+    # The self section covers the whole run, priming included
+    self_monitor.reset()
+    if args.window > 0 and (
+        names is None or {"cpu_ram", "processes"} & set(names)
+    ):
+        prime_counters(args.window, names)
+
+    coordinator = SamplingCoordinator()
+    writer = None
+    for i in range(args.count):
+        if i:
+            time.sleep(args.interval)
+        snapshot = {
+            "timestamp": datetime.now().isoformat(),
+            "backend": stats_backend.name,
+        }
+        snapshot.update(collect_snapshot_parallel(
+            names, args.snapshot_deadline
+        ))
+        frame = coordinator.frame(snapshot)
+        snapshot["interval"] = frame.interval
+        snapshot["derived"] = frame.derived
+        snapshot["self"] = self_monitor.sample()
+
+        if args.format == "csv":
+            row = flatten_snapshot(snapshot)
+            if writer is None:
+                # Later rows keep the first row's columns
+                writer = csv.DictWriter(
+                    out, fieldnames=list(row), extrasaction="ignore"
+                )
+                writer.writeheader()
+            writer.writerow(row)
+        elif args.format == "ndjson":
+            out.write(json.dumps(to_jsonable(snapshot)) + "\n")
+        elif args.count == 1:
+            out.write(json.dumps(to_jsonable(snapshot), indent=2) + "\n")
+        else:
+            # Stream a JSON array one element at a time
+            out.write("[\n" if i == 0 else ",\n")
+            out.write(json.dumps(to_jsonable(snapshot)))
+            if i == args.count - 1:
+                out.write("\n]\n")
+        out.flush()
+    return 0
+
+
+def parse_args(argv=None):
+    """Parse command line options."""
+    parser = argparse.ArgumentParser(description="My Command Center")
+    parser.add_argument(
+        "--isolated",
+        action="store_true",
+        help="run collectors in a separate process with a watchdog",
+    )
+    parser.add_argument(
+        "--shared-memory",
+        action="store_true",
+        help="with --isolated, hand snapshots over through shared memory",
+    )
+    parser.add_argument(
+        "--diff-render",
+        action="store_true",
+        help="repaint only changed cells, for slow SSH or serial links",
+    )
+    parser.add_argument(
+        "--max-fps",
+        type=float,
+        default=2.0,
+        help="frame-rate cap for --diff-render",
+    )
+    parser.add_argument(
+        "--mono",
+        action="store_true",
+        help="with --diff-render, emit no colour escapes",
+    )
+    parser.add_argument(
+        "--no-plugins",
+        action="store_true",
+        help=f"do not load {PLUGIN_ENTRY_POINT_GROUP} entry points",
+    )
+    parser.add_argument(
+        "--deadline",
+        type=float,
+        default=10.0,
+        help="seconds without a snapshot before the collector is restarted",
+    )
+    parser.add_argument(
+        "--backend",
+        choices=BACKENDS,
+        default="auto",
+        help="process and disk stats source (auto: bulk query on Windows)",
+    )
+    parser.add_argument(
+        "--fixture",
+        metavar="PATH",
+        help="replay processes and disks from a recorded snapshot file",
+    )
+    parser.add_argument(
+        "--overhead-budget",
+        type=float,
+        default=OVERHEAD_BUDGET,
+        metavar="PERCENT",
+        help="CPU the dashboard itself may use, in percent of one core",
+    )
+    parser.add_argument(
+        "--log-file",
+        action="append",
+        default=[],
+        metavar="PATH",
+        help="tail a log file in a Logs panel (repeatable)",
+    )
+    parser.add_argument(
+        "--log-docker",
+        action="append",
+        default=[],
+        metavar="CONTAINER",
+        help="follow a container's docker logs (repeatable)",
+    )
+    parser.add_argument(
+        "--journal-export",
+        action="append",
+        default=[],
+        metavar="PATH",
+        help="tail a journald export-format file (repeatable)",
+    )
+    parser.add_argument(
+        "--log-grep",
+        metavar="WORD",
+        help="only show log lines containing this word",
+    )
+
+    subparsers = parser.add_subparsers(dest="command")
+    snapshot = subparsers.add_parser(
+        "snapshot", help="print metrics once (or --count times) and exit"
+    )
+    snapshot.add_argument(
+        "--format",
+        choices=["json", "csv", "ndjson"],
+        default="json",
+        help="output format",
+    )
+    snapshot.add_argument(
+        "--count", type=int, default=1, help="number of snapshots to write"
+    )
+    snapshot.add_argument(
+        "--interval",
+        type=float,
+        default=REFRESH_INTERVAL,
+        help="seconds between snapshots",
+    )
+    snapshot.add_argument(
+        "--deadline",
+        dest="snapshot_deadline",
+        type=float,
+        default=5.0,
+        help="seconds to wait for all collectors in one snapshot",
+    )
+    snapshot.add_argument(
+        "--window",
+        type=float,
+        default=0.25,
+        help="CPU measurement window before the first snapshot (0 skips)",
+    )
+    snapshot.add_argument(
+        "--collectors",
+        help=f"comma-separated subset of: {', '.join(COLLECTORS)}",
+    )
+    return parser.parse_args(argv)
+
+
+def handle_key() -> bool:
+    """Process a pending key press; return True when asked to quit."""
+    global sort_by_memory, group_by, log_severity
+    global current_view, zoomed_panel
+    # Check for keyboard input
+    if msvcrt is not None and msvcrt.kbhit():
+        key = msvcrt.getch().decode("utf-8", errors="ignore").lower()
+        if key == "q":
+            return True
+        elif key == "m":
+            sort_by_memory = not sort_by_memory
+        elif key == "g":
+            next_mode = GROUP_MODES.index(group_by) + 1
+            group_by = GROUP_MODES[next_mode % len(GROUP_MODES)]
+        elif key in ("1", "2", "3", "4", "5"):
+            current_view = VIEWS[int(key) - 1]
+            zoomed_panel = None
+        elif key == "\t":
+            current_view = VIEWS[(VIEWS.index(current_view) + 1) % len(VIEWS)]
+            zoomed_panel = None
+        elif key == "z":
+            # Zoom each of the view's panels in turn, then unzoom
+            panels = VIEW_PANELS[current_view]
+            if zoomed_panel is None:
+                zoomed_panel = panels[0]
+            elif panels.index(zoomed_panel) + 1 < len(panels):
+                zoomed_panel = panels[panels.index(zoomed_panel) + 1]
+            else:
+                zoomed_panel = None
+        elif key == "l":
+            next_level = LOG_SEVERITIES.index(log_severity) + 1
+            log_severity = LOG_SEVERITIES[next_level % len(LOG_SEVERITIES)]
+    return False
+
+
+def ui_state() -> tuple:
+    """Everything handle_key() can change, to spot when to redraw."""
+    return (
+        sort_by_memory, group_by, log_severity, current_view, zoomed_panel
+    )
+
+
+def main(argv=None):
+    global plugin_scheduler, log_tailer, log_keyword, stats_backend
+    args = parse_args(argv)
+    self_monitor.budget = args.overhead_budget
+    try:
+        stats_backend = select_stats_backend(args.backend, args.fixture)
+    except (AttributeError, OSError, ValueError) as e:
+        # windll is missing off Windows; fixtures may be unreadable
+        print(f"Cannot use the {args.backend} backend: {e}",
+              file=sys.stderr)
+        return 2
+    if args.command == "snapshot":
+        return run_snapshot(args)
+    console = Console()
+
+    if not args.no_plugins:
+        plugins, errors = load_plugins()
+        if plugins or errors:
+            plugin_scheduler = PluginScheduler(plugins, errors=errors)
+
+    if args.log_file or args.log_docker or args.journal_export:
+        log_tailer = LogTailer()
+        for path in args.log_file:
+            log_tailer.add_file(path)
+        for container in args.log_docker:
+            log_tailer.add_docker(container)
+        for path in args.journal_export:
+            log_tailer.add_journal_export(path)
+        log_keyword = args.log_grep
+        log_tailer.start()
+
+    worker = None
+    try:
+        if args.isolated:
+            worker = CollectorWorker(
+                deadline=args.deadline,
+                shared=args.shared_memory,
+                backend=(args.backend, args.fixture),
+            )
+            # No waiting here: run_ui shows a placeholder until it delivers
+            worker.start()
+        else:
+            # Initial CPU reading to avoid 0% on first call
+            psutil.cpu_percent(interval=None)
+        run_ui(args, console, worker)
+    finally:
+        if worker is not None:
+            worker.close()
+        if plugin_scheduler is not None:
+            plugin_scheduler.shutdown()
+        if log_tailer is not None:
+            log_tailer.stop()
+
+
+def run_ui(args, console, worker=None):
+    """Run the refresh loop until the user quits.
+
+    With a worker, panels only render what it delivers; until its first
+    snapshot a placeholder is shown instead of sampling here. Sampling
+    runs every REFRESH_INTERVAL in both output modes; --max-fps only
+    caps how often the line-diff renderer draws.
+    """
+    if args.diff_render:
+        output = LineDiffRenderer(max_fps=args.max_fps, monochrome=args.mono)
+    else:
+        from rich.live import Live
+
+        output = Live(
+            console=console, auto_refresh=False, screen=True
+        )
+
+    coordinator = SamplingCoordinator()
+    frame = None
+    snapshot = None
+    next_frame = 0.0
+    redraw = False
+    shown = ui_state()
+    # Account for steady-state overhead, not startup
+    self_monitor.reset()
+    with output:
+        while not handle_key():
+            if worker is not None:
+                snapshot = worker.poll()
+                if worker.process is not None:
+                    self_monitor.watch(worker.process.pid)
+            if plugin_scheduler is not None:
+                plugin_scheduler.tick()
+
+            # Any key toggle redraws at once from the last frame; hidden
+            # sections were kept fresh on the background cadence
+            redraw = redraw or ui_state() != shown
+            shown = ui_state()
+
+            # Only sample and lay out frames that will be shown
+            now = time.monotonic()
+            if now >= next_frame:
+                next_frame = now + REFRESH_INTERVAL
+                redraw = True
+                if worker is None:
+                    frame = coordinator.tick(now, visible_collectors())
+                    fresh = True
+                else:
+                    fresh = snapshot is not None and (
+                        frame is None or snapshot is not frame.sections
+                    )
+                    if fresh:
+                        # Stamped with the worker's tick, not on arrival
+                        sampled_at = worker.sampled_at
+                        frame = coordinator.frame(
+                            snapshot, now if sampled_at is None else sampled_at
+                        )
+                if fresh:
+                    self_monitor.sample(now)
+                    # Carried sections were already fed when sampled
+                    sections = frame.fresh_sections()
+                    anomaly_detector.observe_snapshot(sections)
+                    if "disks" in sections:
+                        disk_forecaster.observe(
+                            sections["disks"] or [], frame.sampled["disks"]
+                        )
+            # The line-diff renderer's cap also holds back key redraws
+            if redraw and (not args.diff_render or output.due(now)):
+                redraw = False
+                if frame is None and worker is not None:
+                    layout = make_waiting_layout(worker.restarts)
+                else:
+                    layout = make_layout(
+                        frame, shutil.get_terminal_size().lines
+                    )
+                if args.diff_render:
+                    output.draw(layout, now=now)
+                else:
+                    output.update(layout, refresh=True)
             time.sleep(0.1)  # Small delay to reduce CPU usage
 
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
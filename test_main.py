@@ -257,6 +257,192 @@ class TestMakeDiskStats:
             assert panel.title == "Disk Usage"
 
 
+class TestDiskForecaster:
+    """Tests for disk time-to-full forecasting."""
+
+    @staticmethod
+    def disk(used, free, mountpoint="C:\\"):
+        """Build a disk record like collect_disks() returns."""
+        return {
+            "device": mountpoint, "mountpoint": mountpoint,
+            "percent": 50.0, "used": used, "total": used + free,
+            "free": free,
+        }
+
+    def test_linear_growth_eta(self):
+        """Test ETA for a disk growing at a steady rate."""
+        from main import DiskForecaster
+
+        forecaster = DiskForecaster(spacing=10.0, min_points=3)
+        # 1 MB/s growth with 3600 MB left
+        for i in range(10):
+            used = 10**9 + i * 10 * 10**6
+            free = 3600 * 10**6 - i * 10 * 10**6
+            forecaster.observe([self.disk(used, free)], now=i * 10.0)
+
+        eta = forecaster.eta("C:\\")
+
+        assert eta == pytest.approx(3510.0)
+
+    def test_stable_disk_is_not_growing(self):
+        """Test a disk with flat usage has an infinite ETA."""
+        from math import inf
+        from main import DiskForecaster
+
+        forecaster = DiskForecaster(spacing=1.0, min_points=3)
+        for i in range(5):
+            forecaster.observe([self.disk(10**9, 10**9)], now=float(i))
+
+        assert forecaster.eta("C:\\") == inf
+        assert forecaster.alerts() == []
+
+    def test_not_enough_points(self):
+        """Test no ETA is given before min_points samples."""
+        from main import DiskForecaster
+
+        forecaster = DiskForecaster(spacing=1.0, min_points=6)
+        forecaster.observe([self.disk(10**9, 10**9)], now=0.0)
+
+        assert forecaster.eta("C:\\") is None
+        assert forecaster.eta("D:\\") is None
+
+    def test_window_is_bounded(self):
+        """Test old points are evicted and the fit follows recent data."""
+        from main import DiskForecaster
+
+        forecaster = DiskForecaster(spacing=1.0, window=5, min_points=3)
+        # Fast growth, then a flat stretch longer than the window
+        for i in range(5):
+            forecaster.observe([self.disk(i * 10**9, 10**12)], now=float(i))
+        for i in range(5, 12):
+            forecaster.observe([self.disk(4 * 10**9, 10**12)], now=float(i))
+
+        trend = forecaster.trends["C:\\"]
+        assert len(trend.points) == 5
+        assert trend.slope() == pytest.approx(0.0, abs=1e-6)
+
+    def test_spacing_limits_points(self):
+        """Test samples closer than spacing are not recorded."""
+        from main import DiskForecaster
+
+        forecaster = DiskForecaster(spacing=10.0)
+        for i in range(10):
+            forecaster.observe([self.disk(10**9, 10**9)], now=float(i))
+
+        assert len(forecaster.trends["C:\\"].points) == 1
+
+    def test_alert_on_eta(self):
+        """Test an alert fires when the ETA is under the threshold."""
+        from main import DiskForecaster, describe_anomaly
+
+        forecaster = DiskForecaster(
+            spacing=1.0, min_points=3, alert_eta=3600, min_span=4.0
+        )
+        for i in range(5):
+            forecaster.observe(
+                [self.disk(i * 10**6, 10**9 - i * 10**6)], now=float(i)
+            )
+
+        alerts = forecaster.alerts()
+
+        assert len(alerts) == 1
+        assert alerts[0].kind == "full"
+        assert describe_anomaly(alerts[0]).startswith("C:\\ full in")
+
+    def test_no_alert_before_min_span(self):
+        """Test a minute of growth shows an ETA but raises no alert."""
+        from main import DiskForecaster
+
+        forecaster = DiskForecaster(spacing=10.0, window=360)
+
+        def grow(steps):
+            for i in steps:
+                forecaster.observe(
+                    [self.disk(i * 10**6, 10**9 - i * 10**6)], now=i * 10.0
+                )
+
+        grow(range(6))
+        assert forecaster.eta("C:\\") is not None
+        assert forecaster.alerts() == []
+
+        # Once the fit covers half the hour-long window it is trusted
+        grow(range(6, 181))
+        assert len(forecaster.alerts()) == 1
+
+
+class TestMemoryPressure:
+    """Tests for the memory pressure collector and panel."""
+
+    @staticmethod
+    def make_swap(sin, sout):
+        """Create a swap_memory() result."""
+        swap = Mock()
+        swap.percent = 25.0
+        swap.used = 2 * 1024**3
+        swap.total = 8 * 1024**3
+        swap.sin = sin
+        swap.sout = sout
+        return swap
+
+    def test_read_psi(self, tmp_path):
+        """Test PSI avg10 values are parsed for some and full."""
+        from main import read_psi
+
+        (tmp_path / "memory").write_text(
+            "some avg10=12.50 avg60=3.00 avg300=1.00 total=100\n"
+            "full avg10=4.25 avg60=1.00 avg300=0.50 total=50\n"
+        )
+
+        assert read_psi("memory", str(tmp_path)) == {
+            "some": 12.5, "full": 4.25
+        }
+        assert read_psi("io", str(tmp_path)) == {"some": None, "full": None}
+
+    def test_rates_from_deltas(self, tmp_path):
+        """Test swap and major fault rates come from sample deltas."""
+        from main import MemoryPressureCollector
+
+        vmstat = tmp_path / "vmstat"
+        vmstat.write_text("pgfault 5000\npgmajfault 100\n")
+        collector = MemoryPressureCollector(
+            psi_root=str(tmp_path), vmstat=str(vmstat)
+        )
+
+        with patch(
+            "main.psutil.swap_memory", return_value=self.make_swap(0, 0)
+        ):
+            first = collector.sample(now=10.0)
+        vmstat.write_text("pgfault 9000\npgmajfault 300\n")
+        with patch(
+            "main.psutil.swap_memory",
+            return_value=self.make_swap(1024, 4 * 1024**2),
+        ):
+            second = collector.sample(now=12.0)
+
+        assert first["swap_out_rate"] is None
+        assert second["swap_in_rate"] == 512
+        assert second["swap_out_rate"] == 2 * 1024**2
+        assert second["major_fault_rate"] == 100
+        assert len(collector.history) == 2
+
+    def test_make_memory_pressure_returns_panel(self):
+        """Test that make_memory_pressure returns a Panel."""
+        from main import MEMORY_PRESSURE_FIELDS, make_memory_pressure
+
+        pressure = dict.fromkeys(MEMORY_PRESSURE_FIELDS)
+        pressure.update(
+            swap_percent=50.0, swap_used=1024**3, swap_total=2 * 1024**3,
+            swap_in_rate=0.0, swap_out_rate=2 * 1024**2,
+            psi_memory_some=30.0, psi_memory_full=5.0,
+            commit_total=12 * 1024**3, commit_limit=16 * 1024**3,
+        )
+
+        panel = make_memory_pressure(pressure)
+
+        assert isinstance(panel, Panel)
+        assert panel.title == "Memory Pressure"
+
+
 class TestMakeNetworkStats:
     """Tests for make_network_stats function."""
 
@@ -278,6 +464,255 @@ class TestMakeNetworkStats:
             assert panel.title == "Network Stats"
 
 
+class TestConnectionTracker:
+    """Tests for the connection table aggregation."""
+
+    @staticmethod
+    def conn(laddr, raddr=(), status="ESTABLISHED", pid=100, udp=False):
+        """Build a record shaped like psutil.net_connections() entries."""
+        import socket
+        from collections import namedtuple
+
+        sconn = namedtuple(
+            "sconn", "fd family type laddr raddr status pid"
+        )
+        kind = socket.SOCK_DGRAM if udp else socket.SOCK_STREAM
+        return sconn(-1, socket.AF_INET, kind, laddr, raddr, status, pid)
+
+    def test_aggregates_by_remote_state_and_listener(self):
+        """Test counts per remote and state plus the listening ports."""
+        from main import ConnectionTracker
+
+        tracker = ConnectionTracker()
+        tracker.names = {100: "curl", 200: "nginx"}
+        tracker.update([
+            self.conn(("10.0.0.2", 5001), ("1.1.1.1", 443)),
+            self.conn(("10.0.0.2", 5002), ("1.1.1.1", 443)),
+            self.conn(("10.0.0.2", 5003), ("1.1.1.1", 443),
+                      status="TIME_WAIT", pid=None),
+            self.conn(("0.0.0.0", 80), status="LISTEN", pid=200),
+            self.conn(("0.0.0.0", 53), status="NONE", pid=200, udp=True),
+        ])
+        summary = tracker.summary()
+
+        assert summary["total"] == 5
+        assert summary["states"] == {
+            "ESTABLISHED": 2, "TIME_WAIT": 1, "LISTEN": 1, "NONE": 1
+        }
+        assert summary["remotes"][0] == {
+            "host": "1.1.1.1", "port": 443, "status": "ESTABLISHED",
+            "count": 2, "processes": ["curl"],
+        }
+        assert [(item["port"], item["proto"], item["process"])
+                for item in summary["listening"]] == [
+            (53, "udp", "nginx"), (80, "tcp", "nginx")
+        ]
+        assert tracker.by_pid == {100: 2, 200: 2}
+
+    def test_incremental_diff_between_samples(self):
+        """Test only added and removed sockets change the counts."""
+        from main import ConnectionTracker
+
+        tracker = ConnectionTracker()
+        first = self.conn(("10.0.0.2", 5001), ("1.1.1.1", 443))
+        second = self.conn(("10.0.0.2", 5002), ("8.8.8.8", 53))
+        tracker.update([first])
+        tracker.update([first, second])
+        assert (tracker.added, tracker.removed) == (1, 0)
+
+        tracker.update([second])
+        assert (tracker.added, tracker.removed) == (0, 1)
+        assert tracker.remotes == {("8.8.8.8", 53, "ESTABLISHED"): 1}
+        assert tracker.states == {"ESTABLISHED": 1}
+
+    def test_sample_runs_on_its_own_cadence(self):
+        """Test net_connections is only called once per interval."""
+        from main import ConnectionTracker
+
+        tracker = ConnectionTracker(interval=10.0)
+        with patch("main.psutil.net_connections", return_value=[]) as calls:
+            first = tracker.sample(now=0.0)
+            assert tracker.sample(now=5.0) is first
+            tracker.sample(now=10.0)
+
+        assert calls.call_count == 2
+
+    def test_access_denied_is_reported(self):
+        """Test a permission error shows in the summary."""
+        import psutil
+        from main import ConnectionTracker
+
+        tracker = ConnectionTracker()
+        with patch("main.psutil.net_connections",
+                   side_effect=psutil.AccessDenied()):
+            summary = tracker.sample(now=0.0)
+
+        assert "Access denied" in summary["error"]
+        assert summary["total"] == 0
+
+    def test_make_connections(self):
+        """Test the panel title shows totals and churn."""
+        from main import ConnectionTracker, make_connections
+
+        tracker = ConnectionTracker()
+        tracker.update([self.conn(("::", 22), status="LISTEN", pid=None)])
+        panel = make_connections(tracker.summary())
+
+        assert isinstance(panel, Panel)
+        assert panel.title == "Connections (1, +1/-0)"
+
+
+class TestStatsBackends:
+    """Tests for the process and disk stats backends."""
+
+    @staticmethod
+    def process_buffer(processes):
+        """Lay processes out like a SystemProcessInformation query."""
+        import ctypes
+        from main import SystemProcessInformation
+
+        size = ctypes.sizeof(SystemProcessInformation)
+        buffer = ctypes.create_string_buffer(
+            (size + 64) * len(processes)
+        )
+        offset = 0
+        for i, (pid, name, cpu_time, working_set) in enumerate(processes):
+            info = SystemProcessInformation.from_buffer(buffer, offset)
+            encoded = name.encode("utf-16-le")
+            ctypes.memmove(ctypes.addressof(buffer) + offset + size,
+                           encoded, len(encoded))
+            info.ImageName.Length = len(encoded)
+            info.ImageName.Buffer = ctypes.addressof(buffer) + offset + size
+            info.UniqueProcessId = pid
+            info.InheritedFromUniqueProcessId = 4
+            info.CreateTime = 1000 + pid
+            info.UserTime = cpu_time
+            info.WorkingSetSize = working_set
+            info.ReadTransferCount = 10
+            info.WriteTransferCount = 5
+            if i < len(processes) - 1:
+                info.NextEntryOffset = size + 64
+            offset += size + 64
+        return buffer
+
+    def test_process_information_layout(self):
+        """Test the structure matches the 64-bit Windows layout."""
+        import ctypes
+        from main import SystemProcessInformation
+
+        if ctypes.sizeof(ctypes.c_void_p) != 8:
+            pytest.skip("layout is for 64-bit builds")
+        assert ctypes.sizeof(SystemProcessInformation) == 256
+        assert SystemProcessInformation.UniqueProcessId.offset == 80
+        assert SystemProcessInformation.WorkingSetSize.offset == 144
+        assert SystemProcessInformation.ReadTransferCount.offset == 232
+
+    def test_performance_information_layout(self):
+        """Test the psapi structure matches the 64-bit Windows layout."""
+        import ctypes
+        from main import PerformanceInformation
+
+        if ctypes.sizeof(ctypes.c_void_p) != 8:
+            pytest.skip("layout is for 64-bit builds")
+        assert ctypes.sizeof(PerformanceInformation) == 104
+        assert PerformanceInformation.CommitTotal.offset == 8
+        assert PerformanceInformation.PageSize.offset == 80
+
+    def test_parse_process_information(self):
+        """Test every entry in the chain is decoded."""
+        from main import parse_process_information
+
+        buffer = self.process_buffer([
+            (8, "svchost.exe", 500, 4096), (12, "explorer.exe", 0, 8192)
+        ])
+        entries = parse_process_information(buffer)
+
+        assert [(e.pid, e.ppid, e.name) for e in entries] == [
+            (8, 4, "svchost.exe"), (12, 4, "explorer.exe")
+        ]
+        assert entries[0].cpu_time == 500
+        assert entries[1].working_set == 8192
+        assert entries[1].io_bytes == 15
+
+    def test_bulk_backend_cpu_from_deltas(self):
+        """Test CPU percent comes from CPU time deltas between ticks."""
+        from main import NtQueryBackend, parse_process_information
+
+        backend = NtQueryBackend.__new__(NtQueryBackend)
+        backend.total_memory = 16384
+        backend.cpu_times = {}
+        backend.users = {}
+        backend.last_time = None
+        samples = [
+            [(0, "Idle", 0, 0), (8, "svchost.exe", 0, 4096)],
+            [(0, "Idle", 0, 0), (8, "svchost.exe", 5_000_000, 4096)],
+        ]
+        with patch.object(NtQueryBackend, "username", return_value="bob"):
+            results = []
+            for now, sample in zip((10.0, 12.0), samples):
+                buffer = self.process_buffer(sample)
+                backend.query = lambda: parse_process_information(buffer)
+                with patch("main.sample_time", return_value=now):
+                    results.append(backend.processes())
+
+        assert results[0][0]["cpu_percent"] == 0.0
+        assert results[1] == [{
+            "pid": 8, "name": "svchost.exe", "cpu_percent": 25.0,
+            "memory_percent": 25.0, "username": "bob", "ppid": 4,
+            "io_bytes": 15,
+        }]
+
+    def test_fixture_backend_replays_snapshots(self, tmp_path):
+        """Test recorded NDJSON snapshots are replayed in a cycle."""
+        import json
+        import main
+        from main import FixtureBackend
+
+        fixture = tmp_path / "recorded.ndjson"
+        fixture.write_text("\n".join(json.dumps({
+            "processes": [{"pid": pid, "name": "app"}],
+            "disks": [{"mountpoint": "/", "used": pid}],
+        }) for pid in (1, 2)))
+        backend = FixtureBackend(str(fixture))
+
+        with patch.object(main, "stats_backend", backend):
+            pids = [main.collect_processes()[0]["pid"] for _ in range(3)]
+            used = main.collect_disks()[0]["used"]
+
+        assert pids == [1, 2, 1]
+        assert used == 1
+
+    def test_fixture_backend_reads_json_documents(self, tmp_path):
+        """Test a single JSON snapshot works as a fixture."""
+        import json
+        from main import FixtureBackend
+
+        fixture = tmp_path / "recorded.json"
+        fixture.write_text(json.dumps({"processes": [{"pid": 7}]}))
+        backend = FixtureBackend(str(fixture))
+
+        assert backend.processes() == [{"pid": 7}]
+        assert backend.disks() == []
+
+    def test_select_backend(self, tmp_path):
+        """Test auto picks psutil off Windows and a fixture when given."""
+        from main import (
+            FixtureBackend, PsutilBackend, select_stats_backend,
+        )
+
+        fixture = tmp_path / "recorded.json"
+        fixture.write_text("[{}]")
+
+        with patch("main.platform.system", return_value="Linux"):
+            assert isinstance(select_stats_backend(), PsutilBackend)
+        assert isinstance(
+            select_stats_backend("auto", str(fixture)), FixtureBackend
+        )
+        with patch("main.platform.system", return_value="Windows"), \
+                patch("main.NtQueryBackend", side_effect=AttributeError):
+            assert isinstance(select_stats_backend(), PsutilBackend)
+
+
 class TestMakeTopProcesses:
     """Tests for make_top_processes function."""
 
@@ -311,6 +746,126 @@ class TestMakeTopProcesses:
             assert isinstance(panel, Panel)
 
 
+class TestProcessGroups:
+    """Tests for process group aggregation."""
+
+    @staticmethod
+    def proc(pid, name, cpu, mem, **extra):
+        """Build a process record like collect_processes() returns."""
+        record = {
+            "pid": pid, "name": name, "cpu_percent": cpu,
+            "memory_percent": mem, "username": "alice", "ppid": 1,
+            "io_bytes": None,
+        }
+        record.update(extra)
+        return record
+
+    def test_groups_by_name(self):
+        """Test processes with the same name are summed."""
+        from main import ProcessGroups
+
+        groups = ProcessGroups("name")
+        groups.update([
+            self.proc(10, "chrome", 2.0, 1.0),
+            self.proc(11, "chrome", 2.0, 1.5),
+            self.proc(12, "python", 3.0, 0.5),
+        ])
+
+        assert groups.top() == [
+            ("chrome", 2, 4.0, 2.5, 0.0),
+            ("python", 1, 3.0, 0.5, 0.0),
+        ]
+        assert groups.top(by_memory=True)[0][0] == "chrome"
+
+    def test_incremental_updates_as_processes_come_and_go(self):
+        """Test totals follow processes starting, changing and exiting."""
+        from main import ProcessGroups
+
+        groups = ProcessGroups("name")
+        groups.update([
+            self.proc(10, "chrome", 2.0, 1.0),
+            self.proc(11, "chrome", 2.0, 1.0),
+        ])
+        groups.update([
+            self.proc(11, "chrome", 5.0, 1.0),
+            self.proc(12, "python", 1.0, 1.0),
+        ])
+
+        assert groups.groups["chrome"][:3] == [1, 5.0, 1.0]
+        assert groups.groups["python"][:3] == [1, 1.0, 1.0]
+
+        groups.update([])
+
+        assert groups.groups == {}
+        assert groups.members == {}
+
+    def test_group_by_user_and_parent(self):
+        """Test user and parent-name grouping."""
+        from main import ProcessGroups
+
+        processes = [
+            self.proc(1, "services", 0.0, 0.1, username="SYSTEM", ppid=0),
+            self.proc(20, "svchost", 1.0, 0.2, username="SYSTEM"),
+            self.proc(21, "svchost", 1.0, 0.2, username="alice"),
+        ]
+        by_user = ProcessGroups("user")
+        by_user.update(processes)
+        by_parent = ProcessGroups("parent")
+        by_parent.update(processes)
+
+        assert by_user.groups["SYSTEM"][0] == 2
+        assert by_parent.groups["services"][0] == 2
+
+    def test_group_by_container(self, tmp_path):
+        """Test processes are grouped by their Docker cgroup."""
+        from main import ProcessGroups
+
+        container_id = "abcdef0123456789" * 4
+        (tmp_path / "30").mkdir()
+        (tmp_path / "30" / "cgroup").write_text(
+            f"0::/system.slice/docker-{container_id}.scope\n"
+        )
+        groups = ProcessGroups("container", proc_root=str(tmp_path))
+        groups.update([
+            self.proc(30, "nginx", 1.0, 1.0),
+            self.proc(31, "bash", 1.0, 1.0),
+        ])
+
+        assert set(groups.groups) == {"abcdef012345", "host"}
+
+    def test_io_rate_from_deltas(self):
+        """Test group IO is a rate computed from per-process deltas."""
+        from main import ProcessGroups
+
+        groups = ProcessGroups("name")
+        groups.update([self.proc(10, "db", 0.0, 0.0, io_bytes=1000)],
+                      now=0.0)
+        groups.update([self.proc(10, "db", 0.0, 0.0, io_bytes=5000)],
+                      now=2.0)
+
+        assert groups.groups["db"][3] == 2000.0
+
+    def test_grouped_panel_and_toggle(self):
+        """Test the 'g' key cycles grouping and the panel follows it."""
+        import main
+
+        main.group_by = "process"
+        with patch("main.msvcrt") as mock_msvcrt:
+            mock_msvcrt.kbhit.return_value = True
+            mock_msvcrt.getch.return_value = b"g"
+
+            main.handle_key()
+
+        try:
+            assert main.group_by == "name"
+            panel = main.make_top_processes([
+                self.proc(10, "chrome", 2.0, 1.0),
+            ])
+            assert panel.title == "Top Processes (by Name, CPU)"
+        finally:
+            main.group_by = "process"
+
+
 class TestMakeDockerStats:
     """Tests for make_docker_stats function."""
 
@@ -355,6 +910,1702 @@ class TestMakeDockerStats:
             assert isinstance(panel, Panel)
 
 
+class TestContainerStats:
+    """Tests for typed Docker stats parsing."""
+
+    def test_parse_size_units(self):
+        """Test decimal and binary Docker size suffixes."""
+        from main import parse_size
+
+        assert parse_size("200MiB") == 200 * 1024**2
+        assert parse_size("1.5kB") == 1500
+        assert parse_size("0B") == 0
+        assert parse_size("1GiB") == 1024**3
+        assert parse_size("--") is None
+
+    def test_parse_docker_stats_line(self):
+        """Test a full docker stats line becomes byte-exact fields."""
+        from main import parse_docker_stats_line
+
+        line = "web\t12.5%\t200MiB / 1GiB\t1.2kB / 3MB\t4MB / 0B"
+        stats = parse_docker_stats_line(line, "nginx", "Up 2 hours")
+
+        assert stats.name == "web"
+        assert stats.image == "nginx"
+        assert stats.cpu_percent == 12.5
+        assert stats.mem_usage == 200 * 1024**2
+        assert stats.mem_limit == 1024**3
+        assert stats.net_rx == 1200
+        assert stats.net_tx == 3 * 1000**2
+        assert stats.block_read == 4 * 1000**2
+        assert stats.block_write == 0
+
+    def test_container_stats_uses_slots(self):
+        """Test ContainerStats records have no per-instance dict."""
+        from main import parse_docker_stats_line
+
+        stats = parse_docker_stats_line("web\t1%\t1MiB / 2MiB")
+
+        assert not hasattr(stats, "__dict__")
+
+    def test_top_containers_and_totals(self):
+        """Test sorting by any field and host-wide totals."""
+        from main import (
+            container_totals, parse_docker_stats_line, top_containers
+        )
+
+        containers = [
+            parse_docker_stats_line("a\t5%\t300MiB / 1GiB"),
+            parse_docker_stats_line("b\t50%\t100MiB / 1GiB"),
+            parse_docker_stats_line("c\t--\t--"),
+        ]
+
+        by_cpu = top_containers(containers, "cpu_percent", 2)
+        by_mem = top_containers(containers, "mem_usage")
+        totals = container_totals(containers)
+
+        assert [c.name for c in by_cpu] == ["b", "a"]
+        assert [c.name for c in by_mem] == ["a", "b", "c"]
+        assert totals["cpu_percent"] == 55.0
+        assert totals["mem_usage"] == 400 * 1024**2
+
+    def test_collect_docker_stats_parses_once(self):
+        """Test collect_docker_stats returns typed records per container."""
+        from main import collect_docker_stats
+
+        ps_result = Mock()
+        ps_result.returncode = 0
+        ps_result.stdout = "web\tnginx\tUp 2 hours\tabc123\n"
+        stats_result = Mock()
+        stats_result.returncode = 0
+        stats_result.stdout = "web\t3.0%\t10MiB / 1GiB\t0B / 0B\t0B / 0B\n"
+
+        with patch("main.cgroup_collector.available", return_value=False), \
+                patch(
+                    "main.subprocess.run",
+                    side_effect=[ps_result, stats_result],
+                ):
+
+            containers = collect_docker_stats()
+
+        assert len(containers) == 1
+        assert containers[0].cpu_percent == 3.0
+        assert containers[0].mem_usage == 10 * 1024**2
+
+
+class TestCgroupCollector:
+    """Tests for CgroupCollector class."""
+
+    @staticmethod
+    def make_cgroup(root, container_id, usage_usec, memory):
+        """Create a fake cgroup v2 container directory."""
+        (root / "cgroup.controllers").write_text("cpu io memory\n")
+        path = root / "system.slice" / f"docker-{container_id}.scope"
+        path.mkdir(parents=True, exist_ok=True)
+        (path / "cpu.stat").write_text(
+            f"usage_usec {usage_usec}\nuser_usec 0\nsystem_usec 0\n"
+        )
+        (path / "memory.current").write_text(f"{memory}\n")
+        (path / "memory.max").write_text(f"{1024**3}\n")
+        (path / "io.stat").write_text(
+            "8:0 rbytes=1000 wbytes=2000 rios=1 wios=2\n"
+            "8:16 rbytes=500 wbytes=0 rios=1 wios=0\n"
+        )
+        return path
+
+    def test_sample_reads_cgroup_files(self, tmp_path):
+        """Test memory and IO counters are read from cgroup files."""
+        from main import CgroupCollector
+
+        self.make_cgroup(tmp_path, "abc123def456", 1000, 200 * 1024**2)
+        collector = CgroupCollector(root=str(tmp_path))
+
+        assert collector.available()
+        stats = collector.sample(["abc123"], now=100.0)["abc123"]
+        collector.close()
+
+        assert stats["memory"] == 200 * 1024**2
+        assert stats["memory_limit"] == 1024**3
+        assert stats["read_bytes"] == 1500
+        assert stats["write_bytes"] == 2000
+        assert stats["cpu_percent"] is None
+
+    def test_stats_match_docker_stats(self, tmp_path):
+        """Test page cache, long io.stat files and net IO are handled."""
+        from main import CgroupCollector
+
+        path = self.make_cgroup(tmp_path, "abc123", 0, 300 * 1024**2)
+        (path / "memory.stat").write_text(
+            f"anon 1\nactive_file 2\ninactive_file {100 * 1024**2}\n"
+        )
+        # Well past a single 4 KiB read
+        (path / "io.stat").write_text(
+            "".join(f"8:{i} rbytes=10 wbytes=1 rios=1 wios=1\n"
+                    for i in range(500))
+        )
+        (path / "cgroup.procs").write_text("4242\n4243\n")
+        net = tmp_path / "proc" / "4242" / "net"
+        net.mkdir(parents=True)
+        (net / "dev").write_text(
+            "Inter-|   Receive  |  Transmit\n"
+            " face |bytes packets errs drop fifo frame compressed multicast"
+            "|bytes packets\n"
+            "    lo:     999 1 0 0 0 0 0 0      999 1 0 0 0 0 0 0\n"
+            "  eth0:    1000 5 0 0 0 0 0 0     2000 7 0 0 0 0 0 0\n"
+        )
+        collector = CgroupCollector(
+            root=str(tmp_path), proc_root=str(tmp_path / "proc")
+        )
+
+        stats = collector.sample(["abc123"], now=1.0)["abc123"]
+        collector.close()
+
+        assert stats["memory"] == 200 * 1024**2
+        assert stats["read_bytes"] == 5000
+        assert stats["write_bytes"] == 500
+        assert (stats["net_rx"], stats["net_tx"]) == (1000, 2000)
+
+    def test_cpu_percent_from_deltas(self, tmp_path):
+        """Test CPU% is computed from usage deltas between samples."""
+        from main import CgroupCollector
+
+        path = self.make_cgroup(tmp_path, "abc123", 1_000_000, 0)
+        collector = CgroupCollector(root=str(tmp_path))
+        collector.sample(["abc123"], now=10.0)
+
+        # Half a core for two seconds
+        (path / "cpu.stat").write_text("usage_usec 2000000\n")
+        stats = collector.sample(["abc123"], now=12.0)["abc123"]
+
+        assert stats["cpu_percent"] == pytest.approx(50.0)
+        assert len(collector.history["abc123"]) == 2
+        collector.close()
+
+    def test_unknown_container_is_skipped(self, tmp_path):
+        """Test containers without a cgroup directory are skipped."""
+        from main import CgroupCollector
+
+        self.make_cgroup(tmp_path, "abc123", 0, 0)
+        collector = CgroupCollector(root=str(tmp_path))
+
+        assert collector.sample(["ffff"]) == {}
+
+    def test_stale_containers_are_forgotten(self, tmp_path):
+        """Test descriptors are closed for containers that went away."""
+        from main import CgroupCollector
+
+        self.make_cgroup(tmp_path, "abc123", 0, 0)
+        collector = CgroupCollector(root=str(tmp_path))
+        collector.sample(["abc123"], now=1.0)
+        assert collector.fds
+
+        collector.sample([], now=2.0)
+
+        assert collector.fds == {}
+        assert "abc123" not in collector.history
+
+    def test_docker_panel_skips_docker_stats(self, tmp_path):
+        """Test make_docker_stats uses cgroups instead of docker stats."""
+        from main import CgroupCollector, make_docker_stats
+
+        self.make_cgroup(tmp_path, "abc123", 0, 100 * 1024**2)
+        collector = CgroupCollector(root=str(tmp_path))
+
+        mock_result = Mock()
+        mock_result.returncode = 0
+        mock_result.stdout = "web\tnginx\tUp 2 hours\tabc123\n"
+
+        with patch("main.cgroup_collector", collector), patch(
+            "main.subprocess.run", return_value=mock_result
+        ) as mock_run:
+
+            panel = make_docker_stats()
+
+            assert isinstance(panel, Panel)
+            assert mock_run.call_count == 1
+        collector.close()
+
+
+class TestCollectorWorker:
+    """Tests for snapshot collection and the isolated collector worker."""
+
+    def test_collect_snapshot_runs_all_collectors(self):
+        """Test collect_snapshot returns one entry per collector."""
+        from main import collect_snapshot
+
+        collectors = {"a": lambda: 1, "b": lambda: [2]}
+        with patch.dict("main.COLLECTORS", collectors, clear=True):
+
+            snapshot = collect_snapshot()
+
+        assert snapshot == {"a": 1, "b": [2]}
+
+    def test_make_layout_renders_snapshot_without_sampling(self):
+        """Test make_layout only renders when given a snapshot."""
+        from main import MEMORY_PRESSURE_FIELDS, make_layout
+
+        snapshot = {
+            "cpu_ram": {
+                "cpu_percent": 10.0, "ram_percent": 20.0,
+                "ram_used": 1024**3, "ram_total": 4 * 1024**3,
+                "cpu_temp": None, "battery": None,
+            },
+            "disks": [],
+            "network": {
+                "bytes_sent": 1, "bytes_recv": 2,
+                "packets_sent": 3, "packets_recv": 4,
+            },
+            "memory_pressure": dict.fromkeys(MEMORY_PRESSURE_FIELDS),
+            "processes": [],
+            "docker": {"containers": [], "message": "No running containers"},
+        }
+
+        with patch("main.psutil.process_iter") as mock_iter, patch(
+            "main.subprocess.run"
+        ) as mock_run, patch("main.make_system_info", return_value=""):
+
+            layout = make_layout(snapshot)
+
+            assert isinstance(layout, Layout)
+            mock_iter.assert_not_called()
+            mock_run.assert_not_called()
+
+    def test_waiting_layout_does_not_sample(self):
+        """Test the placeholder before the first snapshot collects nothing."""
+        from rich.console import Console
+
+        from main import make_waiting_layout
+
+        console = Console(width=80, record=True)
+        with patch("main.psutil.process_iter") as mock_iter, patch(
+            "main.psutil.disk_partitions"
+        ) as mock_parts, patch("main.subprocess.run") as mock_run, patch(
+            "main.make_system_info", return_value=""
+        ):
+
+            console.print(make_waiting_layout(restarts=2))
+
+            mock_iter.assert_not_called()
+            mock_parts.assert_not_called()
+            mock_run.assert_not_called()
+        output = console.export_text()
+        assert "Waiting for the collector" in output
+        assert "restarted 2x" in output
+
+    def test_poll_keeps_newest_snapshot(self):
+        """Test poll drains the pipe and keeps the last snapshot."""
+        from main import CollectorWorker
+
+        worker = CollectorWorker()
+        worker.conn = Mock()
+        worker.conn.poll.side_effect = [True, True, False]
+        worker.conn.recv.side_effect = [(5.0, {"n": 1}), (7.0, {"n": 2})]
+
+        assert worker.poll() == {"n": 2}
+        assert worker.sampled_at == 7.0
+        assert worker.restarts == 0
+
+    def test_watchdog_restarts_overdue_worker(self):
+        """Test the worker is restarted when a sample overruns."""
+        from main import CollectorWorker
+
+        worker = CollectorWorker(deadline=5.0)
+        worker.conn = Mock()
+        worker.conn.poll.return_value = False
+        worker.last_seen = 0.0
+
+        with patch.object(worker, "stop"), patch.object(worker, "start"):
+
+            worker.poll()
+
+            assert worker.restarts == 1
+            worker.start.assert_called_once()
+
+    def test_worker_process_sends_snapshot(self):
+        """Test a real collector process delivers a snapshot."""
+        from main import CollectorWorker
+
+        worker = CollectorWorker(deadline=60.0)
+        worker.start()
+        try:
+            snapshot = worker.poll(timeout=60.0)
+        finally:
+            worker.stop()
+
+        assert "cpu_ram" in snapshot
+        assert "processes" in snapshot
+        assert worker.sampled_at <= worker.last_seen
+
+
+class TestSamplingCoordinator:
+    """Tests for shared-tick sampling and per-frame derived metrics."""
+
+    def test_collectors_share_one_timestamp(self):
+        """Test every collector in a snapshot sees the tick's time."""
+        import main
+        from main import collect_snapshot, sample_time
+
+        collectors = {"a": sample_time, "b": sample_time}
+        with patch.dict("main.COLLECTORS", collectors, clear=True):
+
+            snapshot = collect_snapshot(now=123.0)
+
+        assert snapshot == {"a": 123.0, "b": 123.0}
+        assert main.tick_time is None
+
+    def test_frames_carry_interval_and_rates(self):
+        """Test network rates use the interval between frames."""
+        from main import SamplingCoordinator
+
+        coordinator = SamplingCoordinator()
+        network = {"bytes_sent": 1000, "bytes_recv": 5000}
+        first = coordinator.frame({"network": network}, now=10.0)
+        second = coordinator.frame({"network": {
+            "bytes_sent": 3000, "bytes_recv": 5000,
+        }}, now=12.0)
+
+        assert first.interval == 0.0
+        assert first.derived["network_rates"]["bytes_sent"] is None
+        assert (second.seq, second.interval) == (2, 2.0)
+        assert second.derived["network_rates"] == {
+            "bytes_sent": 1000.0, "bytes_recv": 0.0,
+        }
+        assert second.get("network")["bytes_sent"] == 3000
+
+    def test_sums_and_shares(self):
+        """Test totals are computed once from the frame's sections."""
+        from main import ContainerStats, SamplingCoordinator
+
+        containers = [
+            ContainerStats("a", "img", "Up", 50.0, 100, None,
+                           None, None, None, None),
+            ContainerStats("b", "img", "Up", 30.0, 50, None,
+                           None, None, None, None),
+        ]
+        with patch("main.psutil.cpu_count", return_value=4):
+            frame = SamplingCoordinator().frame({
+                "processes": [
+                    {"pid": 1, "cpu_percent": 100.0},
+                    {"pid": 2, "cpu_percent": None},
+                    {"pid": 3, "cpu_percent": 60.0},
+                ],
+                "docker": {"containers": containers, "message": None},
+                "disks": [
+                    {"used": 10, "total": 40}, {"used": 5, "total": 60},
+                ],
+            }, now=0.0)
+
+        assert frame.derived["process_cpu"] == 40.0
+        assert frame.derived["container_totals"]["cpu_percent"] == 80.0
+        assert frame.derived["container_cpu_share"] == 20.0
+        assert frame.derived["disk_used"] == 15
+        assert frame.derived["disk_total"] == 100
+
+    def test_snapshot_command_exports_derived_metrics(self):
+        """Test snapshots carry their interval and derived metrics."""
+        import io
+        import json
+        from main import parse_args, run_snapshot
+
+        collectors = {
+            "network": lambda: {"bytes_sent": 0, "bytes_recv": 0},
+        }
+        out = io.StringIO()
+        with patch.dict("main.COLLECTORS", collectors, clear=True):
+            run_snapshot(parse_args([
+                "snapshot", "--window", "0", "--format", "ndjson",
+                "--count", "2", "--interval", "0",
+            ]), out)
+
+        second = json.loads(out.getvalue().splitlines()[1])
+        assert second["interval"] > 0
+        assert second["derived"]["network_rates"]["bytes_sent"] == 0.0
+
+    def test_network_panel_shows_rates(self):
+        """Test the network panel appends per-second rates."""
+        from rich.console import Console
+        from main import make_network_stats
+
+        network = {
+            "bytes_sent": 2048, "bytes_recv": 1024,
+            "packets_sent": 1, "packets_recv": 1,
+        }
+        console = Console(width=80, record=True)
+        console.print(make_network_stats(
+            network, {"bytes_sent": 1024.0, "bytes_recv": 0.0}
+        ))
+
+        assert "(1.00 KB/s)" in console.export_text()
+
+
+class TestSnapshotBuffer:
+    """Tests for the shared-memory snapshot buffer."""
+
+    @staticmethod
+    def make_snapshot():
+        """Build a snapshot shaped like collect_snapshot() output."""
+        from main import Battery, parse_docker_stats_line
+
+        container = parse_docker_stats_line(
+            "web\t12.5%\t200MiB / 1GiB\t1kB / 2kB\t--", "nginx", "Up 1h"
+        )
+        return {
+            "cpu_ram": {
+                "cpu_percent": 42.0, "ram_percent": 61.5,
+                "ram_used": 8 * 1024**3, "ram_total": 16 * 1024**3,
+                "cpu_temp": None, "battery": Battery(80.0, 3600, False),
+            },
+            "disks": [{
+                "device": "C:\\", "mountpoint": "C:\\", "percent": 50.0,
+                "used": 250, "total": 500, "free": 250,
+            }],
+            "network": {
+                "bytes_sent": 1, "bytes_recv": 2,
+                "packets_sent": 3, "packets_recv": 4,
+            },
+            "memory_pressure": {
+                "swap_percent": 10.0, "swap_used": 1024**3,
+                "swap_total": 8 * 1024**3, "swap_in_rate": 0.0,
+                "swap_out_rate": 4096.0, "major_fault_rate": None,
+                "psi_cpu_some": 1.5, "psi_memory_some": 0.0,
+                "psi_memory_full": 0.0, "psi_io_some": None,
+                "psi_io_full": None, "commit_total": None,
+                "commit_limit": None,
+            },
+            "processes": [
+                {"pid": 1, "name": "python", "cpu_percent": 5.0,
+                 "memory_percent": 1.5, "username": "root", "ppid": 0,
+                 "io_bytes": 4096},
+                {"pid": 2, "name": "python", "cpu_percent": 0.0,
+                 "memory_percent": 0.5, "username": "root", "ppid": 1,
+                 "io_bytes": None},
+                {"pid": 3, "name": None, "cpu_percent": 1.0,
+                 "memory_percent": 0.0, "username": None, "ppid": None,
+                 "io_bytes": 0},
+            ],
+            "docker": {"containers": [container], "message": None},
+            "connections": {
+                "total": 4,
+                "states": {"ESTABLISHED": 3, "LISTEN": 1},
+                "remotes": [
+                    {"host": "10.0.0.5", "port": 443,
+                     "status": "ESTABLISHED", "count": 2,
+                     "processes": ["nginx", "python"]},
+                    {"host": "::1", "port": 5432, "status": "ESTABLISHED",
+                     "count": 1, "processes": []},
+                ],
+                "listening": [
+                    {"proto": "tcp", "host": "0.0.0.0", "port": 80,
+                     "process": "nginx"},
+                ],
+                "added": 1,
+                "removed": 0,
+                "error": None,
+            },
+        }
+
+    def test_round_trip(self):
+        """Test a written snapshot reads back unchanged."""
+        from main import SnapshotBuffer
+
+        snapshot = self.make_snapshot()
+        buffer = SnapshotBuffer(create=True)
+        try:
+            assert buffer.read() is None
+            seq = buffer.write(snapshot)
+            frame = buffer.read()
+        finally:
+            buffer.close()
+
+        assert seq == 2
+        assert frame == snapshot
+        assert buffer.cached_time is None
+
+    def test_tick_time_travels_with_frame(self):
+        """Test the worker's tick time is read back with its frame."""
+        from main import SnapshotBuffer
+
+        writer = SnapshotBuffer(create=True)
+        reader = SnapshotBuffer(writer.name)
+        try:
+            writer.write(self.make_snapshot(), sampled_at=123.5)
+            reader.read()
+        finally:
+            reader.close()
+            writer.close()
+
+        assert reader.cached_time == 123.5
+
+    def test_round_trip_covers_every_collector(self):
+        """Test every COLLECTORS section survives the buffer."""
+        from main import COLLECTORS, SnapshotBuffer
+
+        snapshot = self.make_snapshot()
+        buffer = SnapshotBuffer(create=True)
+        try:
+            buffer.write(snapshot)
+            frame = buffer.read()
+        finally:
+            buffer.close()
+
+        assert set(snapshot) == set(COLLECTORS)
+        for name in COLLECTORS:
+            assert frame[name] == snapshot[name], name
+
+    def test_strings_are_interned(self):
+        """Test repeated strings share one string table entry."""
+        import struct
+        from main import SHM_SCALAR_FORMAT, SnapshotBuffer
+
+        buffer = SnapshotBuffer(create=True)
+        try:
+            buffer.write(self.make_snapshot())
+            frame = buffer.read()
+            n_strings = struct.unpack_from(
+                SHM_SCALAR_FORMAT, buffer.shm.buf, buffer.scalar_offset
+            )[-1]
+        finally:
+            buffer.close()
+
+        assert frame["processes"][1]["name"] == "python"
+        # C:\\, python, root, web, nginx, Up 1h, ESTABLISHED, LISTEN,
+        # 10.0.0.5, nginx\npython, ::1, tcp, 0.0.0.0
+        assert n_strings == 13
+
+    def test_reader_skips_frame_being_written(self):
+        """Test readers return the last complete frame during a write."""
+        import struct
+        from main import SnapshotBuffer
+
+        buffer = SnapshotBuffer(create=True)
+        try:
+            buffer.write(self.make_snapshot())
+            first = buffer.read()
+
+            # Simulate a writer that died mid-frame
+            struct.pack_into("<Q", buffer.shm.buf, 0, buffer.seq + 1)
+
+            assert buffer.read(retries=3) is first
+            assert buffer.write(self.make_snapshot()) % 2 == 0
+        finally:
+            buffer.close()
+
+    def test_reader_attaches_by_name(self):
+        """Test a second handle sees frames written by the first."""
+        from main import SnapshotBuffer
+
+        writer = SnapshotBuffer(create=True)
+        reader = SnapshotBuffer(writer.name)
+        try:
+            writer.write(self.make_snapshot())
+            frame = reader.read()
+        finally:
+            reader.close()
+            writer.close()
+
+        assert frame["cpu_ram"]["cpu_percent"] == 42.0
+
+    def test_full_process_table_keeps_busiest(self):
+        """Test overflow keeps the top processes by CPU and by memory."""
+        from main import SnapshotBuffer
+
+        processes = [
+            {
+                "pid": pid, "name": f"p{pid}", "username": None,
+                "cpu_percent": float(pid), "memory_percent": float(-pid),
+                "ppid": None, "io_bytes": None,
+            }
+            for pid in range(10)
+        ]
+        snapshot = dict(self.make_snapshot(), processes=processes)
+        writer = SnapshotBuffer(create=True, max_processes=4)
+        reader = SnapshotBuffer(writer.name)
+        try:
+            writer.write(snapshot)
+            frame = reader.read()
+        finally:
+            reader.close()
+            writer.close()
+
+        assert reader.max_processes == 4
+        pids = [proc["pid"] for proc in frame["processes"]]
+        assert pids == [9, 8, 0, 1]
+
+    def test_shared_memory_exit_is_clean(self, tmp_path):
+        """Test the resource tracker has nothing to complain about."""
+        import os
+        import subprocess
+        import sys
+
+        script = tmp_path / "shm_exit.py"
+        script.write_text(
+            "from main import CollectorWorker\n"
+            "if __name__ == '__main__':\n"
+            "    worker = CollectorWorker(deadline=60.0, shared=True)\n"
+            "    worker.start()\n"
+            "    assert worker.poll(timeout=60.0) is not None\n"
+            "    worker.close()\n"
+        )
+        result = subprocess.run(
+            [sys.executable, str(script)], capture_output=True, text=True,
+            timeout=120,
+            env=dict(os.environ, PYTHONPATH=os.path.dirname(__file__)),
+        )
+
+        assert result.returncode == 0
+        assert "Traceback" not in result.stderr
+
+    def test_worker_uses_shared_memory(self):
+        """Test the isolated worker can hand frames over shared memory."""
+        from main import CollectorWorker
+
+        worker = CollectorWorker(deadline=60.0, shared=True)
+        worker.start()
+        try:
+            snapshot = worker.poll(timeout=60.0)
+        finally:
+            worker.close()
+
+        assert "cpu_ram" in snapshot
+        assert "connections" in snapshot
+        assert worker.sampled_at <= worker.last_seen
+        assert isinstance(snapshot["processes"], list)
+
+
+class TestLineDiffRenderer:
+    """Tests for the low-bandwidth line-diff renderer."""
+
+    @staticmethod
+    def make_renderer(**kwargs):
+        """Create a renderer writing to a buffer at a fixed size."""
+        import io
+        from main import LineDiffRenderer
+
+        return LineDiffRenderer(
+            file=io.StringIO(), width=40, height=6, max_fps=0, **kwargs
+        )
+
+    def test_max_fps_does_not_change_sampling_rate(self):
+        """Test --max-fps caps drawing while sampling stays on the tick."""
+        import io
+        import time
+        from main import LineDiffRenderer, parse_args, run_ui
+
+        clock = [0.0]
+        fake_time = Mock(wraps=time)
+        fake_time.monotonic = lambda: clock[0]
+        fake_time.sleep = lambda seconds: clock.__setitem__(
+            0, clock[0] + seconds
+        )
+        renderer = LineDiffRenderer(
+            file=io.StringIO(), width=40, height=6, max_fps=10
+        )
+        # Quit after seven simulated seconds of 0.1 s loop iterations
+        keys = iter([False] * 70 + [True])
+        coordinator = Mock()
+        coordinator.tick.return_value.fresh_sections.return_value = {}
+
+        with patch("main.time", fake_time), patch(
+            "main.handle_key", side_effect=lambda: next(keys)
+        ), patch("main.LineDiffRenderer", return_value=renderer), patch(
+            "main.SamplingCoordinator", return_value=coordinator
+        ), patch("main.make_layout", return_value=Panel("x")), patch(
+            "main.self_monitor"
+        ), patch("main.anomaly_detector"):
+
+            run_ui(parse_args(["--diff-render", "--max-fps", "10"]), None)
+
+        assert coordinator.tick.call_count == 4
+        assert renderer.frames == 4
+
+    def test_unchanged_frame_writes_nothing(self):
+        """Test repeating a frame costs zero bytes."""
+        renderer = self.make_renderer()
+        panel = Panel("CPU: 10%", title="Stats")
+
+        renderer.draw(panel)
+        first_bytes = renderer.last_frame_bytes
+        renderer.draw(panel)
+
+        assert first_bytes > 0
+        assert renderer.last_frame_bytes == 0
+        assert renderer.frames == 2
+
+    def test_small_change_writes_only_changed_cells(self):
+        """Test a one-character change emits far less than a full frame."""
+        renderer = self.make_renderer()
+
+        renderer.draw(Panel("CPU: 10%", title="Stats"))
+        full_bytes = renderer.last_frame_bytes
+        renderer.draw(Panel("CPU: 19%", title="Stats"))
+
+        output = renderer.file.getvalue()
+        assert 0 < renderer.last_frame_bytes < full_bytes / 10
+        # Cursor moves straight to the changed column of row 2
+        assert "\x1b[2;9H" in output
+
+    def test_frame_rate_cap(self):
+        """Test frames inside the minimum interval are skipped."""
+        import io
+        from main import LineDiffRenderer
+
+        renderer = LineDiffRenderer(
+            file=io.StringIO(), width=20, height=3, max_fps=2.0
+        )
+
+        assert renderer.draw("a", now=10.0) is True
+        assert renderer.draw("b", now=10.2) is False
+        assert renderer.draw("b", now=10.6) is True
+
+    def test_monochrome_emits_no_colour(self):
+        """Test monochrome mode writes no SGR colour escapes."""
+        import re
+        from rich.text import Text
+
+        renderer = self.make_renderer(monochrome=True)
+
+        renderer.draw(Text("alert", style="bold red"))
+
+        output = renderer.file.getvalue()
+        assert "alert" in output
+        assert re.search(r"\x1b\[[0-9;]*m", output) is None
+
+
+class TestPlugins:
+    """Tests for the plugin API and scheduler."""
+
+    @staticmethod
+    def make_collector(name, collect, budget=1.0, schema=None):
+        """Create a collector plugin instance around a function."""
+        from main import CollectorPlugin
+
+        plugin = CollectorPlugin()
+        plugin.name = name
+        plugin.interval = 1.0
+        plugin.budget = budget
+        plugin.schema = schema or {"value": int}
+        plugin.collect = collect
+        return plugin
+
+    @staticmethod
+    def run(scheduler, now):
+        """Tick the scheduler and wait for started samples to finish."""
+        scheduler.tick(now)
+        for future, _, _ in list(scheduler.running.values()):
+            future.result(timeout=5)
+
+    def test_collector_values(self):
+        """Test samples are exposed as collector.field values."""
+        from main import PluginScheduler
+
+        plugin = self.make_collector("queue", lambda: {"value": 7})
+        scheduler = PluginScheduler([plugin])
+
+        self.run(scheduler, 0.0)
+        scheduler.tick(0.1)
+
+        assert scheduler.values() == {"queue.value": 7}
+        scheduler.shutdown()
+
+    def test_collector_respects_interval(self):
+        """Test a collector is not sampled again before its interval."""
+        from main import PluginScheduler
+
+        calls = []
+        plugin = self.make_collector(
+            "queue", lambda: calls.append(1) or {"value": 1}
+        )
+        scheduler = PluginScheduler([plugin])
+
+        self.run(scheduler, 0.0)
+        self.run(scheduler, 0.5)
+        self.run(scheduler, 0.6)
+        self.run(scheduler, 1.1)
+
+        assert len(calls) == 2
+        scheduler.shutdown()
+
+    def test_over_budget_plugin_is_disabled(self):
+        """Test a plugin that keeps timing out gets disabled."""
+        import threading
+        from main import PluginScheduler
+
+        release = threading.Event()
+        plugin = self.make_collector(
+            "slow", lambda: release.wait(5) and {"value": 1}, budget=0.5
+        )
+        scheduler = PluginScheduler([plugin], max_overruns=1)
+
+        scheduler.tick(0.0)
+        scheduler.tick(1.0)
+        release.set()
+
+        assert "slow" in scheduler.disabled
+        assert scheduler.disabled["slow"] == "timed out"
+        scheduler.shutdown()
+
+    def test_hung_plugin_keeps_counting_overruns(self):
+        """Test each interval a sample stays hung counts as an overrun."""
+        import threading
+        from main import PluginScheduler
+
+        release = threading.Event()
+        plugin = self.make_collector(
+            "hung", lambda: release.wait(5) and {"value": 1}, budget=0.5
+        )
+        scheduler = PluginScheduler([plugin], max_overruns=3)
+
+        scheduler.tick(0.0)
+        scheduler.tick(1.0)
+        scheduler.tick(1.2)
+        assert scheduler.overruns["hung"] == 1
+        scheduler.tick(1.6)
+        assert "hung" not in scheduler.disabled
+        scheduler.tick(2.6)
+        release.set()
+
+        assert scheduler.disabled["hung"] == "timed out"
+        scheduler.shutdown()
+
+    def test_hung_plugin_does_not_block_exit(self, tmp_path):
+        """Test the process exits while a plugin sample is still hung."""
+        import os
+        import subprocess
+        import sys
+        import time
+
+        script = tmp_path / "hung_plugin.py"
+        script.write_text(
+            "import time\n"
+            "from main import CollectorPlugin, PluginScheduler\n"
+            "plugin = CollectorPlugin()\n"
+            "plugin.name = 'hung'\n"
+            "plugin.collect = lambda: time.sleep(30)\n"
+            "scheduler = PluginScheduler([plugin])\n"
+            "scheduler.tick(0.0)\n"
+            "scheduler.shutdown()\n"
+        )
+        started = time.monotonic()
+        result = subprocess.run(
+            [sys.executable, str(script)], capture_output=True, timeout=60,
+            env=dict(os.environ, PYTHONPATH=os.path.dirname(__file__)),
+        )
+
+        assert result.returncode == 0
+        assert time.monotonic() - started < 10
+
+    def test_panels_see_core_snapshot_fields(self):
+        """Test panel values include the frame's own sections."""
+        from main import snapshot_values
+
+        values = snapshot_values({
+            "cpu_ram": {"cpu_percent": 12.5, "battery": None},
+            "disks": [{"percent": 1.0}],
+            "docker": {"containers": [], "message": None},
+        })
+
+        assert values == {
+            "cpu_ram.cpu_percent": 12.5, "cpu_ram.battery": None,
+            "docker.message": None,
+        }
+
+    def test_load_errors_are_listed_as_disabled(self):
+        """Test plugins that failed to load show as disabled."""
+        from main import PluginScheduler, make_plugin_status
+
+        scheduler = PluginScheduler([], errors=["bad: missing"])
+
+        assert scheduler.disabled == {"bad": "missing"}
+        assert isinstance(make_plugin_status(scheduler), Panel)
+        scheduler.shutdown()
+
+    def test_schema_mismatch_counts_as_overrun(self):
+        """Test samples that break their schema are rejected."""
+        from main import PluginScheduler
+
+        plugin = self.make_collector("bad", lambda: {"other": 1})
+        scheduler = PluginScheduler([plugin], max_overruns=2)
+
+        self.run(scheduler, 0.0)
+        self.run(scheduler, 1.0)
+        self.run(scheduler, 2.0)
+
+        assert scheduler.values() == {}
+        assert scheduler.disabled["bad"] == "output does not match schema"
+        scheduler.shutdown()
+
+    def test_load_plugins_from_entry_points(self):
+        """Test plugin classes are instantiated and bad ones reported."""
+        from main import CollectorPlugin, load_plugins
+
+        good = Mock()
+        good.name = "good"
+        good.load.return_value = CollectorPlugin
+        bad = Mock()
+        bad.name = "bad"
+        bad.load.side_effect = ImportError("missing")
+
+        eps = Mock()
+        eps.select.return_value = [good, bad]
+        with patch("importlib.metadata.entry_points", return_value=eps):
+
+            plugins, errors = load_plugins()
+
+        assert len(plugins) == 1
+        assert isinstance(plugins[0], CollectorPlugin)
+        assert errors == ["bad: missing"]
+
+    def test_plugin_panel_rendering_errors_are_contained(self):
+        """Test a failing panel renders an error instead of raising."""
+        from main import PanelPlugin, make_plugin_panel
+
+        panel = PanelPlugin()
+        panel.fields = ("queue.value",)
+        panel.render = Mock(side_effect=RuntimeError("boom"))
+
+        result = make_plugin_panel(panel, {"queue.value": 1})
+
+        assert isinstance(result, Panel)
+        assert "boom" in str(result.renderable)
+
+
+class TestAnomalyDetector:
+    """Tests for streaming anomaly detection."""
+
+    def test_running_stats_matches_batch(self):
+        """Test Welford mean and std match the batch formulas."""
+        import statistics
+        from main import RunningStats
+
+        values = [2.0, 4.0, 4.0, 4.0, 5.0, 5.0, 7.0, 9.0]
+        stats = RunningStats()
+        for value in values:
+            stats.update(value)
+
+        assert stats.mean == pytest.approx(statistics.mean(values))
+        assert stats.std == pytest.approx(statistics.stdev(values))
+
+    def test_spike_is_flagged(self):
+        """Test a value far from the EWMA baseline is a spike."""
+        from main import AnomalyDetector
+
+        detector = AnomalyDetector(warmup=10, season_length=0)
+        for i in range(50):
+            assert detector.observe("cpu", 20.0 + (i % 3), 10.0) == []
+
+        found = detector.observe("cpu", 95.0, 10.0)
+
+        assert [a.kind for a in found] == ["spike"]
+        assert found[0].score > 0
+
+    def test_floor_suppresses_small_wobbles(self):
+        """Test deviations under the floor are not reported."""
+        from main import AnomalyDetector
+
+        detector = AnomalyDetector(warmup=10, season_length=0)
+        for _ in range(50):
+            detector.observe("cpu", 1.0, 10.0)
+
+        assert detector.observe("cpu", 5.0, 10.0) == []
+
+    def test_steady_trend_is_flagged(self):
+        """Test a steady climb is reported as a trend."""
+        import random
+        from main import AnomalyDetector
+
+        rng = random.Random(1)
+        detector = AnomalyDetector(warmup=10, season_length=0)
+        kinds = set()
+        for i in range(200):
+            value = 100.0 + i * 2 + rng.uniform(-1, 1)
+            kinds.update(a.kind for a in detector.observe("mem", value))
+
+        assert "trend" in kinds
+
+    def test_seasonal_break_is_flagged(self):
+        """Test a break from the usual change over one season."""
+        from main import AnomalyDetector
+
+        detector = AnomalyDetector(warmup=10, season_length=4)
+        pattern = [10.0, 50.0, 10.0, 50.0]
+        for i in range(80):
+            detector.observe("load", pattern[i % 4], 5.0)
+
+        found = detector.observe("load", 90.0, 5.0)
+
+        assert "seasonal" in [a.kind for a in found]
+
+    def test_growing_rss_is_a_leak(self):
+        """Test a process whose RSS only grows is flagged as leaking."""
+        from main import AnomalyDetector
+
+        detector = AnomalyDetector(leak_samples=5, leak_growth=0.2)
+        leak = None
+        for i in range(10):
+            leak = detector.observe_rss(42, "app", 100 * 1024**2 + i * 10**7)
+
+        assert leak is not None
+        assert leak.kind == "leak"
+        assert leak.key == "process:42:app"
+
+    def test_shrinking_rss_resets_leak(self):
+        """Test a process that frees memory is not flagged."""
+        from main import AnomalyDetector
+
+        detector = AnomalyDetector(leak_samples=5, leak_growth=0.2)
+        for i in range(10):
+            rss = 100 * 1024**2 + (i % 4) * 10**7
+            assert detector.observe_rss(42, "app", rss) is None
+
+    def test_observe_snapshot_forgets_exited_processes(self):
+        """Test leak state is dropped for processes that exited."""
+        from main import AnomalyDetector
+
+        detector = AnomalyDetector()
+        snapshot = {
+            "cpu_ram": {
+                "cpu_percent": 5.0, "ram_percent": 50.0,
+                "ram_total": 16 * 1024**3,
+            },
+            "processes": [
+                {"pid": 1, "name": "a", "memory_percent": 1.0},
+            ],
+        }
+        detector.observe_snapshot(snapshot)
+        snapshot["processes"] = []
+        detector.observe_snapshot(snapshot)
+
+        assert detector.leaks == {}
+        assert "host:cpu" in detector.series
+
+    def test_unfed_sections_keep_their_anomalies(self):
+        """Test anomalies stay active until their section is fed again."""
+        from main import Anomaly, AnomalyDetector
+
+        detector = AnomalyDetector()
+        cpu = Anomaly("host:cpu", "spike", 90.0, 10.0, 8.0)
+        swap = Anomaly("host:swap_out", "spike", 1e9, 0.0, 9.0)
+        detector.active = [cpu, swap]
+
+        found = detector.observe_snapshot({"memory_pressure": {}})
+
+        assert found == [cpu]
+        assert detector.active == [cpu]
+
+    def test_make_alerts_returns_panel(self):
+        """Test that make_alerts returns a Panel."""
+        from main import Anomaly, make_alerts
+
+        anomalies = [
+            Anomaly("host:cpu", "spike", 95.0, 20.0, 8.0),
+            Anomaly("process:42:app", "leak", 2 * 1024**3, 1024**3, 1.0),
+        ]
+
+        assert make_alerts([]).title == "Alerts"
+        assert make_alerts(anomalies).title == "Alerts (2)"
+
+
+class TestSnapshotCommand:
+    """Tests for the one-shot snapshot command."""
+
+    COLLECTORS = {
+        "cpu_ram": lambda: {"cpu_percent": 12.5, "battery": None},
+        "disks": lambda: [{
+            "device": "C:\\", "mountpoint": "C:\\", "percent": 50.0,
+            "used": 1, "total": 2, "free": 1,
+        }],
+        "processes": lambda: [{"pid": 1}, {"pid": 2}],
+    }
+
+    @staticmethod
+    def run(argv):
+        """Run the snapshot command and return (exit code, output)."""
+        import io
+        from main import parse_args, run_snapshot
+
+        out = io.StringIO()
+        code = run_snapshot(parse_args(["snapshot", "--window", "0"] + argv),
+                            out)
+        return code, out.getvalue()
+
+    def test_deadline_skips_hung_collectors(self):
+        """Test a hung collector is reported missing, not waited for."""
+        import threading
+        from main import collect_snapshot_parallel
+
+        hang = threading.Event()
+        collectors = {"fast": lambda: 1, "hung": lambda: hang.wait(10)}
+        with patch.dict("main.COLLECTORS", collectors, clear=True):
+
+            snapshot = collect_snapshot_parallel(deadline=0.2)
+
+        hang.set()
+        assert snapshot == {"fast": 1, "missing": ["hung"]}
+
+    def test_deadline_options_are_separate(self):
+        """Test the top-level --deadline does not override the snapshot's."""
+        from main import parse_args
+
+        args = parse_args(["--deadline", "3", "snapshot"])
+        assert args.deadline == 3.0
+        assert args.snapshot_deadline == 5.0
+
+        args = parse_args(["snapshot", "--deadline", "1"])
+        assert args.deadline == 10.0
+        assert args.snapshot_deadline == 1.0
+
+    def test_collector_errors_are_reported(self):
+        """Test a failing collector does not break the snapshot."""
+        from main import collect_snapshot_parallel
+
+        collectors = {"bad": Mock(side_effect=OSError("gone"))}
+        with patch.dict("main.COLLECTORS", collectors, clear=True):
+
+            snapshot = collect_snapshot_parallel()
+
+        assert snapshot == {"bad": {"error": "gone"}}
+
+    def test_json_output(self):
+        """Test a single JSON snapshot is written."""
+        import json
+
+        with patch.dict("main.COLLECTORS", self.COLLECTORS, clear=True):
+
+            code, output = self.run(["--format", "json"])
+
+        data = json.loads(output)
+        assert code == 0
+        assert data["cpu_ram"]["cpu_percent"] == 12.5
+        assert "timestamp" in data
+
+    def test_ndjson_streams_one_line_per_snapshot(self):
+        """Test --count writes one NDJSON line per snapshot."""
+        import json
+
+        with patch.dict("main.COLLECTORS", self.COLLECTORS, clear=True):
+
+            code, output = self.run(
+                ["--format", "ndjson", "--count", "3", "--interval", "0"]
+            )
+
+        lines = output.splitlines()
+        assert len(lines) == 3
+        assert all(json.loads(line)["processes"] for line in lines)
+
+    def test_json_count_streams_an_array(self):
+        """Test JSON with --count is a valid array."""
+        import json
+
+        with patch.dict("main.COLLECTORS", self.COLLECTORS, clear=True):
+
+            _, output = self.run(["--count", "2", "--interval", "0"])
+
+        assert len(json.loads(output)) == 2
+
+    def test_csv_output_flattens_sections(self):
+        """Test CSV has a header and flattened scalar columns."""
+        import csv
+        import io
+
+        with patch.dict("main.COLLECTORS", self.COLLECTORS, clear=True):
+
+            _, output = self.run(
+                ["--format", "csv", "--count", "2", "--interval", "0"]
+            )
+
+        rows = list(csv.DictReader(io.StringIO(output)))
+        assert len(rows) == 2
+        assert rows[0]["cpu_ram.cpu_percent"] == "12.5"
+        assert rows[0]["disk.C:\\.percent"] == "50.0"
+        assert rows[0]["processes.count"] == "2"
+
+    def test_startup_skips_tui_only_imports(self):
+        """Test importing main leaves asyncio and the worker unloaded."""
+        import os
+        import subprocess
+        import sys
+
+        code = (
+            "import sys, main\n"
+            "print(' '.join(m for m in ('asyncio', 'concurrent.futures',"
+            " 'multiprocessing.shared_memory', 'rich.live')"
+            " if m in sys.modules))\n"
+        )
+        result = subprocess.run(
+            [sys.executable, "-c", code], capture_output=True, text=True,
+            env=dict(os.environ, PYTHONPATH=os.path.dirname(__file__)),
+        )
+
+        assert result.returncode == 0
+        assert result.stdout.strip() == ""
+
+    def test_window_primes_processes_only_when_collected(self):
+        """Test a cpu_ram-only snapshot doesn't walk every process."""
+        with patch.dict("main.COLLECTORS", self.COLLECTORS, clear=True), patch(
+            "main.psutil.process_iter"
+        ) as mock_iter, patch("main.time.sleep"):
+
+            self.run(["--collectors", "cpu_ram", "--window", "0.25"])
+            mock_iter.assert_not_called()
+            self.run(["--collectors", "processes", "--window", "0.25"])
+            mock_iter.assert_called_once()
+
+    def test_csv_output_reports_failed_collectors(self):
+        """Test failed collectors become error columns, not crashes."""
+        import csv
+        import io
+
+        def fail():
+            raise OSError("gone")
+
+        collectors = {
+            "cpu_ram": self.COLLECTORS["cpu_ram"],
+            "disks": fail, "processes": fail, "connections": fail,
+        }
+        with patch.dict("main.COLLECTORS", collectors, clear=True):
+
+            code, output = self.run(["--format", "csv"])
+
+        row = next(csv.DictReader(io.StringIO(output)))
+        assert code == 0
+        assert row["cpu_ram.cpu_percent"] == "12.5"
+        assert row["disks.error"] == "gone"
+        assert row["processes.error"] == "gone"
+        assert row["connections.error"] == "gone"
+        assert "processes.count" not in row
+
+    def test_unknown_collector(self):
+        """Test an unknown --collectors name is rejected."""
+        code, output = self.run(["--collectors", "nope"])
+
+        assert code == 2
+        assert output == ""
+
+
+class TestLogTail:
+    """Tests for the log tail index and pipeline."""
+
+    def test_detect_severity(self):
+        """Test level words map onto the four severities."""
+        from main import detect_severity
+
+        assert detect_severity("2024 ERROR disk failed") == "error"
+        assert detect_severity("[warn] slow request") == "warning"
+        assert detect_severity("FATAL: out of memory") == "error"
+        assert detect_severity("request served") == "info"
+
+    def test_parse_journal_export(self):
+        """Test text and binary fields, leaving a partial record."""
+        import struct
+        from main import parse_journal_export
+
+        data = (
+            b"PRIORITY=3\nSYSLOG_IDENTIFIER=sshd\nMESSAGE=bad login\n\n"
+            b"MESSAGE\n" + struct.pack("<Q", 10) + b"two\n\nlines\n"
+            b"PRIORITY=6\n\n"
+            b"MESSAGE=partial"
+        )
+        records, rest = parse_journal_export(data)
+
+        assert records[0]["MESSAGE"] == b"bad login"
+        assert records[0]["PRIORITY"] == b"3"
+        assert records[1]["MESSAGE"] == b"two\n\nlines"
+        assert rest == b"MESSAGE=partial"
+
+    def test_index_filters_by_severity_and_keyword(self):
+        """Test queries use the severity and keyword indexes."""
+        from main import LogIndex
+
+        index = LogIndex()
+        index.add("app", "info", "GET /health ok", now=100.0)
+        index.add("app", "error", "database timeout", now=100.0)
+        index.add("app", "warning", "database slow", now=100.0)
+        index.add("app", "debug", "cache hit", now=100.0)
+
+        errors = index.query("error")
+        assert [entry[4] for entry in errors] == ["database timeout"]
+        warnings = index.query("warning")
+        assert [entry[4] for entry in warnings] == [
+            "database timeout", "database slow"
+        ]
+        matches = index.query(keyword="Database", limit=1)
+        assert [entry[4] for entry in matches] == ["database slow"]
+        assert len(index.query(limit=3)) == 3
+
+    def test_index_evicts_oldest_from_postings(self):
+        """Test a full buffer drops old lines from every index."""
+        from main import LogIndex
+
+        index = LogIndex(capacity=3)
+        for i in range(5):
+            index.add("app", "error" if i % 2 else "info", f"line{i} text")
+
+        assert [entry[4] for entry in index.entries] == [
+            "line2 text", "line3 text", "line4 text"
+        ]
+        assert "line0" not in index.by_token
+        assert list(index.by_token["text"]) == [2, 3, 4]
+        assert list(index.by_severity["error"]) == [3]
+        assert index.query(keyword="line1") == []
+
+    def test_rate(self):
+        """Test lines per second over a recent window."""
+        from main import LogIndex
+
+        index = LogIndex()
+        for _ in range(30):
+            index.add("app", "info", "x", now=100.5)
+        index.add("app", "info", "x", now=80.0)
+
+        assert index.rate(seconds=10, now=101.0) == 3.0
+
+    def test_tailer_follows_file_and_journal(self, tmp_path):
+        """Test appended lines reach the index through the pipeline."""
+        import time
+        from main import LogTailer
+
+        log_file = tmp_path / "app.log"
+        log_file.write_text("old line before start\n")
+        journal = tmp_path / "journal.export"
+        journal.write_bytes(b"")
+
+        tailer = LogTailer(poll_interval=0.01)
+        tailer.add_file(str(log_file))
+        tailer.add_journal_export(str(journal))
+        tailer.start()
+        try:
+            time.sleep(0.1)
+            with open(log_file, "a") as f:
+                f.write("ERROR worker crashed\nrequest ok\n")
+            with open(journal, "ab") as f:
+                f.write(b"PRIORITY=4\nSYSLOG_IDENTIFIER=kernel\n"
+                        b"MESSAGE=thermal throttle\n\n")
+            deadline = time.monotonic() + 2
+            while (len(tailer.query()) < 3
+                   and time.monotonic() < deadline):
+                time.sleep(0.01)
+        finally:
+            tailer.stop()
+
+        lines = {(entry[2], entry[3], entry[4]) for entry in tailer.query()}
+        assert lines == {
+            ("app.log", "error", "ERROR worker crashed"),
+            ("app.log", "info", "request ok"),
+            ("kernel", "warning", "thermal throttle"),
+        }
+        assert tailer.loop.is_closed()
+
+    def test_file_tail_caps_unterminated_line(self, tmp_path):
+        """Test a file write with no newline is split at the line cap."""
+        import time
+        from main import LOG_MAX_LINE, LogTailer
+
+        log_file = tmp_path / "app.log"
+        log_file.write_bytes(b"")
+
+        tailer = LogTailer(poll_interval=0.01)
+        tailer.add_file(str(log_file))
+        tailer.start()
+        try:
+            time.sleep(0.1)
+            with open(log_file, "ab") as f:
+                f.write(b"x" * (2 * LOG_MAX_LINE + 10))
+            deadline = time.monotonic() + 2
+            while (len(tailer.query()) < 2
+                   and time.monotonic() < deadline):
+                time.sleep(0.01)
+        finally:
+            tailer.stop()
+
+        assert [len(entry[4]) for entry in tailer.query()] == [
+            LOG_MAX_LINE, LOG_MAX_LINE
+        ]
+
+    def test_pump_splits_overlong_lines(self):
+        """Test a line past the stream limit is split, not fatal."""
+        import asyncio
+        from main import LOG_MAX_LINE, LogTailer
+
+        async def pump():
+            stream = asyncio.StreamReader()
+            stream.feed_data(b"x" * (LOG_MAX_LINE + 10) + b"\nERROR next\n")
+            stream.feed_data(b"tail")
+            stream.feed_eof()
+            queue = asyncio.Queue()
+            await LogTailer()._pump("web", stream, "warning", queue)
+            return [queue.get_nowait() for _ in range(queue.qsize())]
+
+        lines = asyncio.run(pump())
+
+        assert [len(text) for _, _, text in lines[:2]] == [LOG_MAX_LINE, 10]
+        assert lines[2:] == [
+            ("web", "error", "ERROR next"), ("web", "warning", "tail")
+        ]
+
+    def test_failed_source_does_not_stop_others(self):
+        """Test a source that raises is reported and the rest go on."""
+        import asyncio
+        from main import LogTailer
+
+        tailer = LogTailer()
+
+        async def broken(target, queue):
+            raise ValueError("line too long")
+
+        async def working(target, queue):
+            await queue.put(("app", "info", "still here"))
+
+        async def run():
+            queue = asyncio.Queue()
+            await asyncio.gather(
+                tailer._source(broken, "web", queue),
+                tailer._source(working, "app.log", queue),
+            )
+            return queue.get_nowait()
+
+        assert asyncio.run(run()) == ("app", "info", "still here")
+        assert tailer.errors == {"web": "stopped: line too long"}
+
+    def test_make_log_panel(self):
+        """Test the panel title shows rate and filters."""
+        from main import LogTailer, make_log_panel
+
+        tailer = LogTailer()
+        tailer.index.add("app", "error", "boom")
+        panel = make_log_panel(tailer, "warning", "boom")
+
+        assert isinstance(panel, Panel)
+        assert "warning+" in panel.title
+        assert "'boom'" in panel.title
+
+
+class TestSelfMonitor:
+    """Tests for the dashboard's own resource accounting."""
+
+    def test_collector_cpu_time(self):
+        """Test collector runs keep last, mean and total CPU time."""
+        from main import SelfMonitor
+
+        monitor = SelfMonitor()
+        monitor.record("processes", 0.010)
+        monitor.record("processes", 0.030)
+        usage = monitor.sample()
+
+        assert usage["collectors"]["processes"] == pytest.approx({
+            "last_ms": 30.0, "mean_ms": 20.0, "cpu_seconds": 0.04,
+        })
+
+    def test_cpu_percent_and_budget(self):
+        """Test CPU use over the window is checked against the budget."""
+        from main import SelfMonitor
+
+        with patch.object(SelfMonitor, "cpu_seconds", return_value=1.0), \
+                patch.object(SelfMonitor, "io_ops", return_value=100):
+            monitor = SelfMonitor(budget=5.0)
+            monitor.reset(now=0.0)
+        with patch.object(SelfMonitor, "cpu_seconds", return_value=1.5), \
+                patch.object(SelfMonitor, "io_ops", return_value=400):
+            usage = monitor.sample(now=10.0)
+
+        assert usage["cpu_percent"] == pytest.approx(5.0)
+        assert usage["over_budget"] is False
+        assert usage["io_ops_per_min"] == pytest.approx(1800.0)
+
+        with patch.object(SelfMonitor, "cpu_seconds", return_value=2.5), \
+                patch.object(SelfMonitor, "io_ops", return_value=400):
+            usage = monitor.sample(now=20.0)
+
+        assert usage["cpu_percent"] == pytest.approx(7.5)
+        assert usage["over_budget"] is True
+
+    def test_spawns_per_minute(self):
+        """Test only spawns from the last minute are counted."""
+        from main import SelfMonitor
+
+        monitor = SelfMonitor()
+        for when in (0.0, 50.0, 70.0, 80.0):
+            monitor.spawned(now=when)
+
+        assert monitor.sample(now=100.0)["spawns_per_min"] == 3
+
+    def test_snapshot_records_collector_costs(self):
+        """Test collect_snapshot reports each collector's CPU time."""
+        import main
+        from main import SelfMonitor, collect_snapshot
+
+        monitor = SelfMonitor()
+        with patch.dict("main.COLLECTORS", {"a": lambda: 1}, clear=True), \
+                patch.object(main, "self_monitor", monitor):
+            collect_snapshot()
+
+        assert list(monitor.collectors) == ["a"]
+        assert monitor.collectors["a"][1] == 1
+
+    def test_footer_shows_status_line(self):
+        """Test the footer adds the overhead line once sampled."""
+        import main
+        from main import SelfMonitor, make_footer
+
+        monitor = SelfMonitor(budget=2.0)
+        monitor.sample()
+        with patch.object(main, "self_monitor", monitor):
+            footer = make_footer()
+
+        assert "Self: CPU" in footer.renderable.plain
+        assert "/ 2% budget" in footer.renderable.plain
+
+    def test_status_names_what_is_measured(self):
+        """Test I/O operations and net block changes are labelled as such."""
+        from main import SelfMonitor, make_self_status
+
+        with patch.object(SelfMonitor, "io_ops", return_value=100):
+            monitor = SelfMonitor()
+            monitor.reset(now=0.0)
+        with patch.object(SelfMonitor, "io_ops", return_value=160):
+            usage = monitor.sample(now=60.0)
+        usage["net_blocks_per_frame"] = -12
+        status = make_self_status(usage).plain
+
+        assert "I/O ops 60/min" in status
+        assert "net blocks -12/frame" in status
+        assert "syscalls" not in status and "allocs" not in status
+
+
+class TestViews:
+    """Tests for tabbed views, zoom and per-view sampling cadence."""
+
+    @pytest.fixture(autouse=True)
+    def reset_view(self):
+        """Put the overview back after each test."""
+        import main
+
+        yield
+        main.current_view = "overview"
+        main.zoomed_panel = None
+
+    @staticmethod
+    def press(key):
+        """Feed one key press through handle_key()."""
+        from main import handle_key
+
+        keyboard = Mock()
+        keyboard.kbhit.return_value = True
+        keyboard.getch.return_value = key.encode()
+        with patch("main.msvcrt", keyboard):
+            return handle_key()
+
+    def test_keys_switch_views_and_zoom(self):
+        """Test number keys and Tab pick views and z cycles zoom."""
+        import main
+
+        self.press("4")
+        assert main.current_view == "network"
+        self.press("\t")
+        assert main.current_view == "disks"
+        self.press("\t")
+        assert main.current_view == "overview"
+
+        self.press("2")
+        zooms = []
+        for _ in range(4):
+            self.press("z")
+            zooms.append(main.zoomed_panel)
+        assert zooms == ["processes", "cpu_ram", "memory_pressure", None]
+
+    def test_key_toggles_change_ui_state(self):
+        """Test every toggle key changes the state the UI redraws on."""
+        import main
+        from main import ui_state
+
+        for key in ("m", "g", "l", "3", "z"):
+            before = ui_state()
+            self.press(key)
+            assert ui_state() != before, key
+        self.press("m")
+        main.group_by = "process"
+        main.log_severity = main.LOG_SEVERITIES[0]
+
+    def test_visible_collectors(self):
+        """Test only the visible panels' collectors are active."""
+        import main
+        from main import visible_collectors
+
+        assert visible_collectors() is None
+        main.current_view = "network"
+        assert visible_collectors() == {"network", "connections"}
+        main.zoomed_panel = "network"
+        assert visible_collectors() == {"network"}
+        main.current_view, main.zoomed_panel = "disks", "alerts"
+        assert visible_collectors() == set()
+
+    def test_hidden_collectors_run_on_background_cadence(self):
+        """Test hidden sections are carried over between slow samples."""
+        from main import SamplingCoordinator
+
+        calls = {"a": 0, "b": 0}
+
+        def counter(name):
+            def collect():
+                calls[name] += 1
+                return calls[name]
+            return collect
+
+        collectors = {"a": counter("a"), "b": counter("b")}
+        coordinator = SamplingCoordinator(background_interval=10.0)
+        with patch.dict("main.COLLECTORS", collectors, clear=True):
+            coordinator.tick(now=0.0, active={"a"})
+            frame = coordinator.tick(now=2.0, active={"a"})
+            assert frame.sections == {"a": 2, "b": 1}
+            assert frame.sampled == {"a": 2.0, "b": 0.0}
+            assert frame.fresh_sections() == {"a": 2}
+
+            frame = coordinator.tick(now=10.0, active={"a"})
+
+        assert frame.sections == {"a": 3, "b": 2}
+        assert calls == {"a": 3, "b": 2}
+
+    def test_rates_use_section_sample_times(self):
+        """Test carried network sections keep their last rates."""
+        from main import SamplingCoordinator
+
+        readings = iter([0, 1000, 5000])
+
+        def network():
+            sent = next(readings)
+            return {"bytes_sent": sent, "bytes_recv": 0}
+
+        coordinator = SamplingCoordinator(background_interval=4.0)
+        with patch.dict("main.COLLECTORS", {"network": network},
+                        clear=True):
+            coordinator.tick(now=0.0, active=set())
+            rates = coordinator.tick(now=4.0, active=set()).derived
+            carried = coordinator.tick(now=6.0, active=set()).derived
+            later = coordinator.tick(now=8.0, active=set()).derived
+
+        assert rates["network_rates"]["bytes_sent"] == 250.0
+        assert carried["network_rates"]["bytes_sent"] == 250.0
+        assert later["network_rates"]["bytes_sent"] == 1000.0
+
+    def test_view_layout_fills_the_terminal(self):
+        """Test a view lists as many rows as the terminal allows."""
+        import main
+        from main import make_layout
+
+        processes = [
+            {"pid": pid, "name": f"proc{pid}", "cpu_percent": pid,
+             "memory_percent": 0.1}
+            for pid in range(100)
+        ]
+        main.current_view = "processes"
+        main.zoomed_panel = "processes"
+        with patch("main.psutil.boot_time", return_value=0):
+            layout = make_layout({"processes": processes}, rows=50)
+
+        table = layout["body"].renderable.renderable
+        assert table.row_count == 40
+        assert "proc99" in str(table.columns[1]._cells[0])
+
+
 class TestMakeLayout:
     """Tests for make_layout function."""
 